@@ -0,0 +1,145 @@
+"""benchmarks for seleniumqt, run offline against a local stdlib http server.
+
+# Usage
+```
+python -m benchmarks run -o results.json          # every benchmark.
+python -m benchmarks run -o results.json --quick  # fewer iterations and smaller pages.
+python -m benchmarks compare base.json results.json --threshold 0.1
+```
+
+every result is saved with the direction that is better, so compare can
+flag a regression of any benchmark, without knowing what it measures.
+"""
+
+# ---------------------------------------------------
+# author: Ansh Mathur
+# gtihub: https://github.com/Fakesum
+# repo: https://github.com/Fakesum/ TODO: THIS
+# ---------------------------------------------------
+
+# import python std library
+import json as _json
+import time as _time
+import typing as _typing
+import platform as _platform
+import statistics as _statistics
+
+KB = 1024
+MB = 1024 * KB
+
+
+def size_label(size: int) -> str:
+    """Give a short label for a number of bytes, ex: 64KB."""
+    for unit, factor in (("MB", MB), ("KB", KB)):
+        if size >= factor and size % factor == 0:
+            return f"{size // factor}{unit}"
+    return f"{size}B"
+
+
+def summarize(
+    samples: list[float],
+    unit: str = "s",
+    better: _typing.Literal["lower", "higher"] = "lower",
+    **extra,
+) -> dict:
+    """Summarize the samples of one benchmark, its "value" is what compare looks at.
+
+    Args:
+    ----
+        samples (list[float]): one measurement per iteration.
+        unit (str, optional): unit of the samples, ex: s, msg/s, MB/s. Defaults to "s".
+        better (str, optional): "lower" for latencies, "higher" for throughputs. Defaults to "lower".
+        extra: added to the summary as is, ex: payload size.
+
+    Returns:
+    -------
+        dict: the summary.
+
+    """
+    ordered = sorted(samples)
+    return {
+        "unit": unit,
+        "better": better,
+        "samples": len(ordered),
+        # the median is used, a single slow iteration should not flag a regression.
+        "value": _statistics.median(ordered),
+        "min": ordered[0],
+        "mean": _statistics.fmean(ordered),
+        "p90": ordered[min(int(len(ordered) * 0.9), len(ordered) - 1)],
+        "max": ordered[-1],
+        **extra,
+    }
+
+
+def save(results: dict[str, dict], path: str) -> None:
+    """Write results to a json file, along with the machine they were taken on."""
+    with open(path, "w") as f:
+        _json.dump(
+            {
+                "meta": {
+                    "time": _time.strftime("%Y-%m-%dT%H:%M:%S"),
+                    "python": _platform.python_version(),
+                    "platform": _platform.platform(),
+                    "machine": _platform.machine(),
+                },
+                "results": results,
+            },
+            f,
+            indent=2,
+        )
+
+
+def load(path: str) -> dict[str, dict]:
+    """Read the results of a json file written by save."""
+    with open(path) as f:
+        return _json.load(f)["results"]
+
+
+def compare(
+    base: dict[str, dict], new: dict[str, dict], threshold: float = 0.1
+) -> list[dict]:
+    """Compare two sets of results.
+
+    Args:
+    ----
+        base (dict[str, dict]): the results compared against.
+        new (dict[str, dict]): the results of the change.
+        threshold (float, optional): relative change that counts as a regression. Defaults to 0.1.
+
+    Returns:
+    -------
+        list[dict]: one row per benchmark in both, with its "change" (positive is better) and "status",
+        which is one of regression, improvement, same.
+
+    """
+    rows = []
+    for name in sorted(set(base) & set(new)):
+        before, after = base[name]["value"], new[name]["value"]
+        if before == 0:
+            change = 0.0
+        elif new[name]["better"] == "lower":
+            change = (before - after) / before
+        else:
+            change = (after - before) / before
+
+        if change < -threshold:
+            status = "regression"
+        elif change > threshold:
+            status = "improvement"
+        else:
+            status = "same"
+
+        rows.append(
+            {
+                "name": name,
+                "unit": new[name]["unit"],
+                "base": before,
+                "new": after,
+                "change": change,
+                "status": status,
+            }
+        )
+    return rows
+
+
+__all__ = ["KB", "MB", "size_label", "summarize", "save", "load", "compare"]
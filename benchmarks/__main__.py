@@ -0,0 +1,105 @@
+"""__main__.py for benchmarks, run them or compare two result files.
+
+python -m benchmarks run -o results.json [--quick] [--suite comms] [--only current_url page_html]
+python -m benchmarks compare base.json results.json [--threshold 0.1]
+"""
+
+import sys
+import pathlib
+import argparse
+
+
+# Access seleniumqt in a external manner, as seleniumqt/__main__.py does.
+def __external_import():
+    sys.path.append(pathlib.Path(__file__).parent.parent.absolute().__str__())
+
+
+__external_import()
+
+from benchmarks import save, load, compare
+
+
+def run(args: argparse.Namespace) -> int:
+    """Run the benchmarks, and save their results."""
+    results: dict[str, dict] = {}
+
+    if args.suite in ("comms", "all"):
+        from benchmarks.comms import CommsHarness
+
+        results.update(CommsHarness(quick=args.quick, seed=args.seed).run())
+
+    if args.suite in ("e2e", "all"):
+        from benchmarks.e2e import EndToEnd
+
+        results.update(EndToEnd(quick=args.quick).run(args.only))
+
+    save(results, args.output)
+
+    for name, result in results.items():
+        print(f"{name:<28} {result['value']:>14.6f} {result['unit']}")
+    print(f"saved {len(results)} results to {args.output}")
+    return 0
+
+
+def compare_files(args: argparse.Namespace) -> int:
+    """Compare two result files, exit with 1 if there is a regression."""
+    rows = compare(load(args.base), load(args.new), args.threshold)
+
+    for row in rows:
+        print(
+            f"{row['name']:<28} {row['base']:>14.6f} -> {row['new']:>14.6f} {row['unit']:<4}"
+            f" {row['change']:>+8.1%}  {row['status']}"
+        )
+
+    regressions = [row["name"] for row in rows if row["status"] == "regression"]
+    if regressions:
+        print(f"{len(regressions)} regression(s): {', '.join(regressions)}")
+        return 1
+    print("no regressions.")
+    return 0
+
+
+def main() -> int:
+    """Parse the command line."""
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the benchmarks.")
+    run_parser.add_argument("-o", "--output", default="benchmark-results.json")
+    run_parser.add_argument(
+        "--quick", action="store_true", help="fewer iterations and sizes."
+    )
+    run_parser.add_argument(
+        "--suite",
+        choices=("all", "e2e", "comms"),
+        default="all",
+        help="e2e runs a real driver, comms only DriverComs over sockets.",
+    )
+    run_parser.add_argument(
+        "--only", nargs="+", help="names of the e2e benchmarks to run."
+    )
+    run_parser.add_argument(
+        "--seed", type=int, default=0, help="seed of the comms payloads and faults."
+    )
+    run_parser.set_defaults(function=run)
+
+    compare_parser = commands.add_parser(
+        "compare", help="compare two result files."
+    )
+    compare_parser.add_argument("base")
+    compare_parser.add_argument("new")
+    compare_parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="relative change counted as a regression. Defaults to 0.1",
+    )
+    compare_parser.set_defaults(function=compare_files)
+
+    args = parser.parse_args()
+    return args.function(args)
+
+
+# multi-processing requires this to be bounded, see seleniumqt/__main__.py.
+if __name__ == "__main__":
+    sys.exit(main())
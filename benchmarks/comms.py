@@ -0,0 +1,302 @@
+"""module containing the DriverComs harness, framing conformance under injected faults and wire throughput."""
+
+# ---------------------------------------------------
+# author: Ansh Mathur
+# gtihub: https://github.com/Fakesum
+# repo: https://github.com/Fakesum/ TODO: THIS
+# ---------------------------------------------------
+
+# import python std library
+import time as _time
+import random as _random
+import socket as _socket
+import typing as _typing
+import hashlib as _hashlib
+import threading as _threading
+
+# import seleniumqt
+from seleniumqt.comms import DriverComs
+from seleniumqt.logger import logger
+
+# import benchmark utilities
+from . import KB, MB, size_label, summarize
+
+# edges of the framing, ex: a length that fills a recv chunk exactly, and one past it.
+SIZES = (
+    0,
+    1,
+    KB - 1,
+    KB,
+    KB + 1,
+    64 * KB,
+    DriverComs.RECV_CHUNK_SIZE - 1,
+    DriverComs.RECV_CHUNK_SIZE + 1,
+    16 * MB,
+    100 * MB,
+)
+QUICK_SIZES = tuple(size for size in SIZES if size <= 2 * MB)
+
+
+class FaultySocket:
+    """Wrap a socket, so DriverComs sees partial reads, fragmented writes and a slow peer.
+
+    Args:
+    ----
+        sock (socket): the socket wrapped.
+        max_read (int | None): every recv_into gives between 1 and max_read bytes.
+        max_write (int | None): every sendall is split into writes of 1 to max_write bytes.
+        delay (float): seconds slept before every write, a slow peer.
+        seed (int): seed of the random sizes, so a failure can be reproduced.
+    """
+
+    def __init__(
+        self,
+        sock: _socket.socket,
+        max_read: int | None = None,
+        max_write: int | None = None,
+        delay: float = 0.0,
+        seed: int = 0,
+    ) -> None:
+        """Construct FaultySocket."""
+        self.sock = sock
+        self.max_read = max_read
+        self.max_write = max_write
+        self.delay = delay
+        self._random = _random.Random(seed)
+
+    def recv_into(self, buffer: memoryview, nbytes: int = 0) -> int:
+        nbytes = nbytes or len(buffer)
+        if self.max_read is not None:
+            nbytes = self._random.randint(1, min(nbytes, self.max_read))
+        return self.sock.recv_into(buffer, nbytes)
+
+    def sendall(self, data: bytes) -> None:
+        view = memoryview(data)
+        while True:
+            if self.delay:
+                _time.sleep(self.delay)
+            if self.max_write is None:
+                self.sock.sendall(view)
+                return
+            size = self._random.randint(1, self.max_write)
+            self.sock.sendall(view[:size])
+            view = view[size:]
+            if not len(view):
+                return
+
+    def __getattr__(self, name: str) -> _typing.Any:
+        return getattr(self.sock, name)
+
+
+# fault profiles, each one is applied to both ends of the connection.
+FAULTS: dict[str, dict] = {
+    "none": {},
+    "partial_reads": {"max_read": 7},
+    "fragmented_writes": {"max_write": 13},
+    "partial_and_fragmented": {"max_read": 1500, "max_write": 3000},
+    "slow_peer": {"max_write": 64 * KB, "delay": 0.001},
+}
+
+
+def socketpair() -> tuple[_socket.socket, _socket.socket]:
+    """Give both ends of a unix socketpair."""
+    return _socket.socketpair()
+
+
+def tcp_pair() -> tuple[_socket.socket, _socket.socket]:
+    """Give both ends of a loopback tcp connection, as Driver and Remote use."""
+    with _socket.socket(_socket.AF_INET, _socket.SOCK_STREAM) as server:
+        server.bind(("localhost", 0))
+        server.listen()
+        client = _socket.create_connection(server.getsockname())
+        conn, _ = server.accept()
+    return client, conn
+
+
+TRANSPORTS: dict[str, _typing.Callable[[], tuple[_socket.socket, _socket.socket]]] = {
+    "socketpair": socketpair,
+    "tcp": tcp_pair,
+}
+
+
+def payload(size: int, seed: int = 0) -> bytes:
+    """Give size bytes which are not repetitive, so a shifted or merged frame can't match."""
+    block = _random.Random(seed).randbytes(min(size, MB))
+    return (block * (size // MB + 1))[:size] if size > MB else block
+
+
+class Echo(_threading.Thread):
+    """Reply to every message with the same header and payload, until the connection closes."""
+
+    def __init__(self, coms: DriverComs) -> None:
+        super().__init__(daemon=True)
+        self.name = "comms-echo"
+        self.coms = coms
+        self.start()
+
+    def run(self) -> None:
+        try:
+            while True:
+                header, data = self.coms.recv_message()
+                self.coms.send_message(header, data)
+        except (ConnectionError, OSError):
+            pass
+
+
+class CommsHarness:
+    """Conformance and throughput of DriverComs, over each transport.
+
+    # Conformance
+    every size in SIZES is echoed over every transport with every fault in
+    FAULTS, one at a time and then as a burst sent before anything is read,
+    each reply must be byte exact. a mismatch raises AssertionError, naming the
+    transport, fault, size and seed needed to reproduce it.
+
+    # Throughput
+    frames are streamed one way over each transport with no faults, messages/s and
+    MB/s are measured per size.
+    """
+
+    def __init__(self, quick: bool = False, seed: int = 0) -> None:
+        """Construct CommsHarness.
+
+        Args:
+        ----
+            quick (bool, optional): only sizes up to 2MB, and less data per measurement. Defaults to False.
+            seed (int, optional): seed of the payloads and injected faults. Defaults to 0.
+
+        """
+        self.quick = quick
+        self.seed = seed
+        self.sizes = QUICK_SIZES if quick else SIZES
+        self.results: dict[str, dict] = {}
+
+    def __connect(
+        self, transport: str, faults: dict | None = None
+    ) -> tuple[DriverComs, DriverComs]:
+        driver_end, remote_end = TRANSPORTS[transport]()
+        if faults:
+            driver_end = FaultySocket(driver_end, seed=self.seed, **faults)
+            remote_end = FaultySocket(remote_end, seed=self.seed + 1, **faults)
+        return DriverComs(driver_end), DriverComs(remote_end)
+
+    @staticmethod
+    def __close(*ends: DriverComs) -> None:
+        for end in ends:
+            end.conn.close()
+
+    # --------------------------------------------conformance---------------------------------------------
+    def conformance(self) -> int:
+        """Check that every frame round trips byte exact, give the number of frames checked."""
+        checked = 0
+        for transport in TRANSPORTS:
+            for fault, faults in FAULTS.items():
+                sizes = [
+                    size
+                    for size in self.sizes
+                    # byte sized reads of a huge frame would take minutes, and prove nothing new.
+                    if (size <= 2 * MB) or not faults
+                ]
+                driver, remote = self.__connect(transport, faults)
+                Echo(remote)
+                try:
+                    checked += self.__check(transport, fault, driver, sizes)
+                finally:
+                    self.__close(driver, remote)
+                logger.info(f"DriverComs conformance passed {transport=} {fault=}")
+        return checked
+
+    def __check(
+        self, transport: str, fault: str, driver: DriverComs, sizes: list[int]
+    ) -> int:
+        expected = {size: payload(size, self.seed + size) for size in sizes}
+
+        def verify(header: dict, data: bytearray, size: int, mode: str) -> None:
+            if (header.get("size") != size) or (data != expected[size]):
+                raise AssertionError(
+                    f"DriverComs frame mismatch, {transport=} {fault=} {mode=} {size=}"
+                    f" {self.seed=}, got {header=} {len(data)=}"
+                    f" {_hashlib.sha1(data).hexdigest()=}"
+                )
+
+        # one at a time.
+        for size in sizes:
+            driver.send_message({"size": size}, expected[size])
+            verify(*driver.recv_message(), size, "single")
+
+        # a burst of small frames, written before any is read, so they share socket buffers.
+        burst = [size for size in sizes if size <= 64 * KB] * 8
+        sender = _threading.Thread(
+            target=lambda: [
+                driver.send_message({"size": size}, expected[size]) for size in burst
+            ],
+            daemon=True,
+        )
+        sender.start()
+        for size in burst:
+            verify(*driver.recv_message(), size, "burst")
+        sender.join()
+
+        return len(sizes) + len(burst)
+
+    # ---------------------------------------------throughput---------------------------------------------
+    def throughput(self) -> dict[str, dict]:
+        """Measure one way messages/s and MB/s of each size over each transport."""
+        budget = (32 if self.quick else 512) * MB
+        for transport in TRANSPORTS:
+            for size in self.sizes:
+                count = max(2, min(20_000, budget // max(size, 1)))
+                data = payload(size, self.seed)
+                samples = [
+                    self.__stream(transport, data, count) for _ in range(3)
+                ]
+                seconds = sorted(samples)[1]
+                self.results[f"comms.{transport}[{size_label(size)}]"] = summarize(
+                    samples,
+                    bytes=size,
+                    messages=count,
+                    messages_per_s=count / seconds,
+                    mb_per_s=(count * size / MB) / seconds,
+                )
+        return self.results
+
+    def __stream(self, transport: str, data: bytes, count: int) -> float:
+        """Send count frames from one end, give the seconds until the other end has read the last."""
+        sender, receiver = self.__connect(transport)
+        digest = _hashlib.sha1(data).digest()
+
+        def send():
+            for _ in range(count):
+                sender.send(data)
+
+        thread = _threading.Thread(target=send, daemon=True)
+        try:
+            start = _time.perf_counter()
+            thread.start()
+            for _ in range(count):
+                received = receiver.recv()
+            seconds = _time.perf_counter() - start
+            thread.join()
+        finally:
+            self.__close(sender, receiver)
+
+        # checked after the clock stopped, only the last frame is hashed.
+        if _hashlib.sha1(received).digest() != digest:
+            raise AssertionError(f"DriverComs throughput frame mismatch, {transport=} {len(data)=}")
+        return seconds
+
+    # ------------------------------------------------run-------------------------------------------------
+    def run(self) -> dict[str, dict]:
+        """Check conformance, then measure throughput.
+
+        Returns:
+        -------
+            dict[str, dict]: summary of every throughput result, see benchmarks.summarize.
+
+        """
+        checked = self.conformance()
+        logger.info(f"DriverComs conformance passed, {checked=} frames byte exact.")
+        return self.throughput()
+
+
+__all__ = ["FaultySocket", "FAULTS", "TRANSPORTS", "CommsHarness", "payload"]
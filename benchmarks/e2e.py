@@ -0,0 +1,171 @@
+"""module containing the end to end benchmarks, which measure a real Driver and Remote."""
+
+# ---------------------------------------------------
+# author: Ansh Mathur
+# gtihub: https://github.com/Fakesum
+# repo: https://github.com/Fakesum/ TODO: THIS
+# ---------------------------------------------------
+
+# import python std library
+import time as _time
+import typing as _typing
+
+# import seleniumqt
+from seleniumqt import Driver
+from seleniumqt.logger import logger
+
+# import benchmark utilities
+from . import KB, MB, size_label, summarize
+from .server import BenchmarkServer
+
+
+def timed(function: _typing.Callable[[], _typing.Any], iterations: int) -> list[float]:
+    """Run function iterations times, give the seconds taken by each run."""
+    samples = []
+    for _ in range(iterations):
+        start = _time.perf_counter()
+        function()
+        samples.append(_time.perf_counter() - start)
+    return samples
+
+
+class EndToEnd:
+    """Benchmarks of every layer together, driver, comms, remote and qt.
+
+    # Benchmarks
+    - startup: Driver() until the first command has returned.
+    - current_url: round trip of the smallest command.
+    - execute_script[size]: a script returning size bytes.
+    - page_html[size]: transfer of a size bytes dom.
+    - click, click_delivered: until click returns, and until the page's request for it arrived.
+    - page_load[page]: Driver.open of a page.
+    """
+
+    NAMES = (
+        "startup",
+        "current_url",
+        "execute_script",
+        "page_html",
+        "click",
+        "page_load",
+    )
+
+    def __init__(self, quick: bool = False, config: dict | None = None) -> None:
+        """Construct EndToEnd.
+
+        Args:
+        ----
+            quick (bool, optional): fewer iterations and sizes, for a fast check. Defaults to False.
+            config (dict | None, optional): extra Driver config, ex: {"metrics_file": ...}. Defaults to None.
+
+        """
+        self.quick = quick
+        self.config = config or {}
+        self.results: dict[str, dict] = {}
+
+    def __iterations(self, full: int) -> int:
+        return max(full // 10, 2) if self.quick else full
+
+    def __driver(self, server: BenchmarkServer) -> Driver:
+        return Driver(
+            {"starting_url": server.url("/"), **self.config}
+        )
+
+    # ---------------------------------------------benchmarks---------------------------------------------
+    def startup(self, server: BenchmarkServer, driver: Driver) -> None:
+        samples = []
+        for _ in range(1 if self.quick else 5):
+            start = _time.perf_counter()
+            started = self.__driver(server)
+            started.current_url()
+            samples.append(_time.perf_counter() - start)
+            started.close()
+        self.results["startup"] = summarize(samples)
+
+    def current_url(self, server: BenchmarkServer, driver: Driver) -> None:
+        samples = timed(driver.current_url, self.__iterations(500))
+        self.results["current_url"] = summarize(samples)
+
+    def execute_script(self, server: BenchmarkServer, driver: Driver) -> None:
+        sizes = [0, KB, 64 * KB, MB] + ([] if self.quick else [16 * MB])
+        for size in sizes:
+            script = f'return "x".repeat({size});'
+            samples = timed(
+                lambda: driver.execute_script(script),
+                self.__iterations(100 if size < MB else 10),
+            )
+            self.results[f"execute_script[{size_label(size)}]"] = summarize(
+                samples,
+                bytes=size,
+                calls_per_s=1 / (sum(samples) / len(samples)),
+                mb_per_s=(size / MB) / (sum(samples) / len(samples)),
+            )
+
+    def page_html(self, server: BenchmarkServer, driver: Driver) -> None:
+        sizes = [KB, 100 * KB, MB] + ([] if self.quick else [10 * MB, 50 * MB])
+        for size in sizes:
+            driver.open(server.url(f"/page?size={size}"))
+            html = driver.page_html()
+            if len(html) < size * 0.9:
+                logger.warning(f"page_html gave {len(html)=}, expected about {size=}")
+
+            samples = timed(
+                driver.page_html, self.__iterations(50 if size < 10 * MB else 5)
+            )
+            self.results[f"page_html[{size_label(size)}]"] = summarize(
+                samples,
+                bytes=len(html),
+                mb_per_s=(len(html) / MB) / (sum(samples) / len(samples)),
+            )
+
+    def click(self, server: BenchmarkServer, driver: Driver) -> None:
+        driver.open(server.url("/"))
+        returned, delivered = [], []
+        for _ in range(self.__iterations(50)):
+            server.clicked.clear()
+            start = _time.perf_counter()
+            driver.click(".only-button")
+            returned.append(_time.perf_counter() - start)
+            if not server.clicked.wait(10):
+                logger.warning("click did not reach the server within 10 seconds.")
+                continue
+            delivered.append(_time.perf_counter() - start)
+
+        self.results["click"] = summarize(returned)
+        if delivered:
+            self.results["click_delivered"] = summarize(delivered)
+
+    def page_load(self, server: BenchmarkServer, driver: Driver) -> None:
+        for label, path in (("small", "/"), ("1MB", f"/page?size={MB}")):
+            url = server.url(path)
+            samples = timed(lambda: driver.open(url), self.__iterations(20))
+            self.results[f"page_load[{label}]"] = summarize(samples)
+
+    # ------------------------------------------------run-------------------------------------------------
+    def run(self, only: _typing.Iterable[str] | None = None) -> dict[str, dict]:
+        """Run the benchmarks, all of them unless only is given.
+
+        Args:
+        ----
+            only (Iterable[str] | None, optional): names of the benchmarks to run, see NAMES. Defaults to None.
+
+        Returns:
+        -------
+            dict[str, dict]: summary of every result, see benchmarks.summarize.
+
+        """
+        names = [name for name in self.NAMES if (only is None) or (name in only)]
+
+        with BenchmarkServer() as server:
+            driver = self.__driver(server)
+            try:
+                for name in names:
+                    logger.info(f"Running benchmark {name}")
+                    getattr(self, name)(server, driver)
+            finally:
+                driver.close()
+
+        return self.results
+
+
+__all__ = ["EndToEnd"]
@@ -0,0 +1,119 @@
+"""module containing the local http server which the benchmarks open pages from."""
+
+# ---------------------------------------------------
+# author: Ansh Mathur
+# gtihub: https://github.com/Fakesum
+# repo: https://github.com/Fakesum/ TODO: THIS
+# ---------------------------------------------------
+
+# import python std library
+import threading as _threading
+import functools as _functools
+import http.server as _http_server
+import urllib.parse as _urllib_parse
+
+# import logger
+from seleniumqt.logger import logger
+
+
+BUTTON_PAGE = b"""<html>
+    <body>
+        <button class="only-button">The Only Button</button>
+        <script>
+            document.querySelector(".only-button").onclick = (() => {
+                fetch("/clicked");
+            });
+        </script>
+    </body>
+</html>"""
+
+# one element of a generated page, repeated until the page is as large as asked.
+PAGE_CHUNK = b"<p>" + b"seleniumqt " * 9 + b"</p>\n"
+
+
+@_functools.lru_cache(maxsize=8)
+def generated_page(size: int) -> bytes:
+    """Give a html page of about size bytes, most of which is dom."""
+    count = max(size - 26, 0) // len(PAGE_CHUNK)
+    return b"<html><body>\n" + PAGE_CHUNK * count + b"</body></html>"
+
+
+class BenchmarkServer:
+    """Serve the benchmark pages on localhost, from a background thread.
+
+    # Routes
+    - `/` a page with one button, clicking it requests `/clicked`.
+    - `/page?size=N` a page with about N bytes of dom.
+    - `/clicked` sets `clicked`, which click benchmarks wait for.
+
+    # Usage
+    ```python
+    with BenchmarkServer() as server:
+        driver.open(server.url("/page?size=1024"))
+    ```
+    """
+
+    def __init__(self) -> None:
+        """Construct BenchmarkServer, it starts serving immediately."""
+        self.clicked = _threading.Event()
+        self._server = _http_server.ThreadingHTTPServer(
+            ("localhost", 0), self.__handler()
+        )
+        self._server.daemon_threads = True
+        self.__thread = _threading.Thread(
+            target=self._server.serve_forever, daemon=True
+        )
+        self.__thread.name = "benchmark-server"
+        self.__thread.start()
+        logger.info(f"Benchmark server on {self.url('/')}")
+
+    def url(self, path: str = "/") -> str:
+        """Give the full url of a path on the server."""
+        return f"http://localhost:{self._server.server_address[1]}{path}"
+
+    def __handler(self) -> type[_http_server.BaseHTTPRequestHandler]:
+        server = self
+
+        class BenchmarkHandler(_http_server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = _urllib_parse.urlsplit(self.path)
+                match url.path:
+                    case "/":
+                        body = BUTTON_PAGE
+                    case "/page":
+                        query = dict(_urllib_parse.parse_qsl(url.query))
+                        body = generated_page(int(query.get("size", 1024)))
+                    case "/clicked":
+                        server.clicked.set()
+                        body = b"clicked"
+                    case _:
+                        self.send_error(404)
+                        return
+
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("Cache-Control", "no-store")
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                logger.trace(format % args)
+
+        return BenchmarkHandler
+
+    def close(self) -> None:
+        """Stop serving."""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "BenchmarkServer":
+        """Enter context manager."""
+        return self
+
+    def __exit__(self, *exc) -> None:
+        """Stop serving."""
+        self.close()
+
+
+__all__ = ["BenchmarkServer", "generated_page"]
@@ -1,6 +1,49 @@
-"""__init__.py for seleniumqt."""
+"""__init__.py for seleniumqt.
 
-from .remote import Remote
-from .driver import Driver
+the names are imported on first use, so the modules which don't need qt, ex: the
+pytest plugin seleniumqt.testing, the broker and the workers, import without it.
+"""
 
-__all__ = ["Remote", "Driver"]
+import typing as _typing
+import importlib as _importlib
+
+# the module of every name, imported by __getattr__ once the name is used.
+_EXPORTS: dict[str, str] = {
+    "Remote": ".remote",
+    "Driver": ".driver",
+    "Archive": ".archive",
+    "crawl": ".crawler",
+    "CrawlResult": ".crawler",
+    "Scheduler": ".politeness",
+    "HostPolicy": ".politeness",
+}
+
+if _typing.TYPE_CHECKING:
+    from .remote import Remote
+    from .driver import Driver
+    from .archive import Archive
+    from .crawler import crawl, CrawlResult
+    from .politeness import Scheduler, HostPolicy
+
+
+def __getattr__(name: str) -> _typing.Any:
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(_importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted([*globals(), *_EXPORTS])
+
+
+__all__ = [
+    "Remote",
+    "Driver",
+    "Archive",
+    "crawl",
+    "CrawlResult",
+    "Scheduler",
+    "HostPolicy",
+]
@@ -0,0 +1,272 @@
+"""module containing the network archive used to record and replay pages."""
+
+# ---------------------------------------------------
+# author: Ansh Mathur
+# gtihub: https://github.com/Fakesum
+# repo: https://github.com/Fakesum/ TODO: THIS
+# ---------------------------------------------------
+
+# import python std library
+import os as _os
+import mmap as _mmap
+import json as _json
+import struct as _struct
+import typing as _typing
+import threading as _threading
+
+# import logger
+from .logger import logger
+
+# import exceptions
+from .exception import InvalidArchive
+
+
+class ArchiveEntry(_typing.NamedTuple):
+    """One recorded response, as stored in the archive."""
+
+    status: int
+    content_type: str
+    headers: dict[str, str]
+    body: memoryview | bytes
+
+
+class Archive:
+    """Indexed network archive file, keyed by request method and url.
+
+    # Layout
+    ```
+    | MAGIC | body | body | ... | index (json) | index offset (u64) | MAGIC |
+    ```
+
+    The bodies are written back to back as they are recorded, the index maps
+    every key to the (offset, length) of its body, and is only written on
+    `flush`/`close`. When opened for reading the file is memory-mapped, so
+    a replayed body is a slice of the map and is never copied into python
+    until qt asks for it.
+
+    # Usage
+    ```python
+    with Archive("run.sqtarc", "w") as archive:
+        archive.add("GET", "https://example.com/", 200, "text/html", {}, b"...")
+
+    with Archive("run.sqtarc") as archive:
+        entry = archive.get("GET", "https://example.com/")
+    ```
+    """
+
+    MAGIC = b"SQTARC01"
+    FOOTER = _struct.Struct("!Q8s")
+
+    # -----------------------------------------utility functions------------------------------------------
+    @staticmethod
+    def key(method: str, url: str) -> str:
+        """Build the lookup key of a request, the url fragment is never sent so it is ignored.
+
+        Args:
+        ----
+            method (str): http method of the request, ex: GET
+            url (str): full url of the request.
+
+        Returns:
+        -------
+            str: the key the request is stored under.
+
+        """
+        return f"{method.upper()} {url.split('#', 1)[0]}"
+
+    # -------------------------------------------initialization-------------------------------------------
+    def __init__(
+        self, path: str, mode: _typing.Literal["r", "w", "a"] = "r"
+    ) -> None:
+        """Construct Archive.
+
+        Args:
+        ----
+            path (str): path of the archive file.
+            mode (str, optional): "r" to replay, "w" to record into a new archive,
+            "a" to add recordings to an existing archive. Defaults to "r".
+
+        """
+        self.path = _os.path.abspath(path)
+        self.mode = mode
+        self._lock = _threading.Lock()
+        self._index: dict[str, list] = {}
+        self._map: _mmap.mmap | None = None
+        self._file: _typing.BinaryIO | _typing.Any = None
+        self._data_end = len(self.MAGIC)
+
+        match mode:
+            case "r":
+                self._file = open(self.path, "rb")
+                self._load()
+            case "w":
+                self._file = open(self.path, "w+b")
+                self._file.write(self.MAGIC)
+            case "a":
+                if not _os.path.exists(self.path):
+                    open(self.path, "wb").write(self.MAGIC)
+                self._file = open(self.path, "r+b")
+                self._load()
+                # new bodies overwrite the old index, it is rewritten on flush.
+                if self._map is not None:
+                    self._map.close()
+                    self._map = None
+            case _:
+                raise ValueError(f"{mode=} is not one of 'r', 'w', 'a'.")
+
+        logger.debug(f"Opened archive {self.path=} {mode=} {len(self)=}")
+
+    def _load(self) -> None:
+        """Read the footer and index of an existing archive, and map it."""
+        size = _os.fstat(self._file.fileno()).st_size
+
+        if size == len(self.MAGIC):
+            # nothing has been recorded yet.
+            return
+
+        if size < len(self.MAGIC) + self.FOOTER.size:
+            raise InvalidArchive(f"{self.path=} is too small, {size=}")
+
+        self._map = _mmap.mmap(
+            self._file.fileno(), 0, access=_mmap.ACCESS_READ
+        )
+
+        index_offset, magic = self.FOOTER.unpack_from(
+            self._map, size - self.FOOTER.size
+        )
+        if (self._map[: len(self.MAGIC)] != self.MAGIC) or (
+            magic != self.MAGIC
+        ):
+            raise InvalidArchive(
+                f"{self.path=} is not an archive, or was not closed."
+            )
+
+        try:
+            self._index = _json.loads(
+                self._map[index_offset : size - self.FOOTER.size]
+            )
+        except ValueError as e:
+            raise InvalidArchive(f"{self.path=} has a corrupt index.") from e
+
+        self._data_end = index_offset
+
+    # ----------------------------------------------commands----------------------------------------------
+    def get(self, method: str, url: str) -> ArchiveEntry | None:
+        """Get the recorded response for a request.
+
+        Args:
+        ----
+            method (str): http method of the request.
+            url (str): full url of the request.
+
+        Returns:
+        -------
+            ArchiveEntry | None: the recording, None if the request was never recorded.
+
+        """
+        record = self._index.get(self.key(method, url))
+        if record is None:
+            return None
+
+        offset, length, status, content_type, headers = record
+
+        if self._map is not None:
+            body: memoryview | bytes = memoryview(self._map)[
+                offset : offset + length
+            ]
+        else:
+            # archive is being written to, read the body back from disk.
+            with self._lock:
+                self._file.seek(offset)
+                body = self._file.read(length)
+
+        return ArchiveEntry(status, content_type, headers, body)
+
+    def add(
+        self,
+        method: str,
+        url: str,
+        status: int,
+        content_type: str,
+        headers: dict[str, str],
+        body: bytes,
+    ) -> None:
+        """Record a response, replacing any earlier recording of the same request.
+
+        Args:
+        ----
+            method (str): http method of the request.
+            url (str): full url of the request.
+            status (int): http status code of the response.
+            content_type (str): Content-Type of the response.
+            headers (dict[str, str]): response headers to replay, ex: Location.
+            body (bytes): the response body.
+
+        """
+        if self.mode == "r":
+            raise InvalidArchive(f"{self.path=} was opened for reading.")
+
+        with self._lock:
+            self._file.seek(self._data_end)
+            self._file.write(body)
+            self._index[self.key(method, url)] = [
+                self._data_end,
+                len(body),
+                status,
+                content_type,
+                headers,
+            ]
+            self._data_end += len(body)
+
+    def flush(self) -> None:
+        """Write the index and footer, after this the archive on disk is complete."""
+        if self.mode == "r":
+            return
+
+        with self._lock:
+            self._file.seek(self._data_end)
+            self._file.write(
+                _json.dumps(self._index, separators=(",", ":")).encode(
+                    "utf-8"
+                )
+            )
+            self._file.write(self.FOOTER.pack(self._data_end, self.MAGIC))
+            self._file.truncate()
+            self._file.flush()
+
+    def close(self) -> None:
+        """Flush the archive if it is being written, and release the file."""
+        if self._file is None:
+            return
+
+        self.flush()
+
+        if self._map is not None:
+            try:
+                self._map.close()
+            except BufferError:
+                # a replayed body is still referenced, the map is released with it.
+                pass
+            self._map = None
+        self._file.close()
+        self._file = None
+        logger.debug(f"Closed archive {self.path=}")
+
+    def __len__(self) -> int:
+        """Give the number of recorded requests."""
+        return len(self._index)
+
+    def __contains__(self, key: str) -> bool:
+        """Check whether a key, as given by Archive.key, is recorded."""
+        return key in self._index
+
+    def __enter__(self) -> "Archive":
+        """Enter context manager."""
+        return self
+
+    def __exit__(self, *exc) -> None:
+        """Close the archive."""
+        self.close()
+
+
+__all__ = ["Archive", "ArchiveEntry"]
@@ -0,0 +1,165 @@
+"""module containing the command queue, which bounds the commands waiting for remote, and applies backpressure."""
+
+# ---------------------------------------------------
+# author: Ansh Mathur
+# gtihub: https://github.com/Fakesum
+# repo: https://github.com/Fakesum/ TODO: THIS
+# ---------------------------------------------------
+
+# import python std library
+import time as _time
+import typing as _typing
+import threading as _threading
+import collections as _collections
+
+# import exceptions
+from .exception import CommandTimeout, QueueFull, RemoteExited
+
+
+# what is done with a command given while the queue is full.
+# - block: the caller waits for space, until its timeout.
+# - fail: the command is refused with QueueFull.
+# - shed: the oldest queued command is dropped with QueueFull, the new one is queued.
+POLICIES: tuple[str, ...] = ("block", "fail", "shed")
+
+
+class QueueStats(_typing.NamedTuple):
+    """The depth of a driver's command path, given by Driver.queue_stats."""
+
+    depth: int  # commands queued, not yet sent.
+    in_flight: int  # commands sent to remote, not yet replied to.
+    capacity: int
+    high_water: int  # most commands queued at once.
+    waiting: int  # callers waiting for space, with the block policy.
+    rejected: int  # commands refused, or which timed out waiting for space.
+    shed: int  # queued commands dropped for newer ones, with the shed policy.
+
+
+class CommandQueue:
+    """The commands waiting to be sent, at most capacity of them, oldest first.
+
+    it is guarded by the driver's lock, which must be held for every method, put
+    waits on it for space with the block policy.
+    """
+
+    def __init__(
+        self, lock: _threading.Condition, capacity: int, policy: str = "block"
+    ) -> None:
+        """Construct CommandQueue.
+
+        Raises:
+        ------
+            ValueError: capacity is less than 1, or policy is not one of POLICIES.
+
+        Args:
+        ----
+            lock (Condition): the driver's lock, notified once there is space.
+            capacity (int): commands queued at most.
+            policy (str, optional): one of POLICIES. Defaults to "block".
+
+        """
+        if capacity < 1:
+            raise ValueError(f"{capacity=} must be at least 1.")
+        if policy not in POLICIES:
+            raise ValueError(f"{policy=} is not one of {POLICIES}.")
+
+        self._lock = lock
+        self.capacity = capacity
+        self.policy = policy
+        self._items: _collections.deque = _collections.deque()
+        self._closed = False
+
+        self.high_water = 0
+        self.waiting = 0
+        self.rejected = 0
+        self.shed = 0
+
+    def put(self, item: _typing.Any, deadline: float | None = None) -> _typing.Any | None:
+        """Queue item, as the policy says if the queue is full.
+
+        Raises:
+        ------
+            QueueFull: the queue is full, with the fail policy.
+            CommandTimeout: there was no space before deadline, with the block policy.
+            RemoteExited: the queue was closed.
+
+        Args:
+        ----
+            item (Any): the command.
+            deadline (float | None, optional): time.monotonic to wait for space until. Defaults to None.
+
+        Returns:
+        -------
+            Any | None: the command dropped for it, with the shed policy.
+
+        """
+        shed = None
+        if self._closed:
+            raise RemoteExited("the driver was closed.")
+
+        if len(self._items) >= self.capacity:
+            match self.policy:
+                case "fail":
+                    self.rejected += 1
+                    raise QueueFull(f"{self.capacity} commands are already queued.")
+                case "shed":
+                    shed = self._items.popleft()
+                    self.shed += 1
+                case "block":
+                    self.waiting += 1
+                    try:
+                        while len(self._items) >= self.capacity:
+                            if self._closed:
+                                raise RemoteExited("the driver was closed.")
+                            remaining = (
+                                None if deadline is None else deadline - _time.monotonic()
+                            )
+                            if (remaining is not None) and (remaining <= 0):
+                                self.rejected += 1
+                                raise CommandTimeout(
+                                    f"{self.capacity} commands stayed queued, there was no space in time."
+                                )
+                            self._lock.wait(remaining)
+                    finally:
+                        self.waiting -= 1
+
+        self._items.append(item)
+        self.high_water = max(self.high_water, len(self._items))
+        return shed
+
+    def get(self) -> _typing.Any:
+        """Take the oldest command, and wake the callers waiting for space."""
+        item = self._items.popleft()
+        self._lock.notify_all()
+        return item
+
+    def remove(self, item: _typing.Any) -> bool:
+        """Take a command out of the queue, ex: once its caller gave up on it, give whether it was queued."""
+        try:
+            self._items.remove(item)
+        except ValueError:
+            return False
+        self._lock.notify_all()
+        return True
+
+    def close(self) -> None:
+        """Refuse every command from now on, the callers waiting for space raise RemoteExited."""
+        self._closed = True
+        self._lock.notify_all()
+
+    def stats(self, in_flight: int = 0) -> QueueStats:
+        return QueueStats(
+            len(self._items),
+            in_flight,
+            self.capacity,
+            self.high_water,
+            self.waiting,
+            self.rejected,
+            self.shed,
+        )
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+__all__ = ["POLICIES", "QueueStats", "CommandQueue"]
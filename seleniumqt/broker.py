@@ -0,0 +1,471 @@
+"""module containing the broker, which hands drivers remotes started by seleniumqt-remote workers on other machines."""
+
+# ---------------------------------------------------
+# author: Ansh Mathur
+# gtihub: https://github.com/Fakesum
+# repo: https://github.com/Fakesum/ TODO: THIS
+# ---------------------------------------------------
+
+# import python std library
+import os as _os
+import hmac as _hmac
+import base64 as _base64
+import json as _json
+import time as _time
+import socket as _socket
+import typing as _typing
+import argparse as _argparse
+import itertools as _itertools
+import threading as _threading
+
+# import logger
+from .logger import logger
+
+# import exceptions
+from .exception import BrokerError, BrokerRefused
+
+# import driver-remote communication class
+from .comms import DriverComs
+
+
+# the token is read from here when it is not given, by the broker, the workers and the drivers.
+TOKEN_ENV = "SELENIUMQT_TOKEN"
+
+# seconds a connection has to say who it is, before it is dropped.
+HELLO_TIMEOUT: float = 10.0
+
+# key of a config sent by dumps_config, with the keys whose values were bytes.
+BYTES_KEY = "__bytes__"
+
+
+def parse_address(address: str | tuple[str, int]) -> tuple[str, int]:
+    """Give (host, port) of an address given as "host:port", or as (host, port)."""
+    if isinstance(address, str):
+        host, _, port = address.rpartition(":")
+        return (host or "localhost"), int(port)
+    return address[0], int(address[1])
+
+
+def dumps_config(config: dict) -> bytes:
+    """Give a remote's config as json, bytes values, ex: the "session" of a recycled remote, as base64."""
+    encoded = {
+        key: _base64.b64encode(value).decode("ascii") if isinstance(value, bytes) else value
+        for key, value in config.items()
+    }
+    encoded[BYTES_KEY] = [key for key, value in config.items() if isinstance(value, bytes)]
+    return _json.dumps(encoded).encode("utf-8")
+
+
+def loads_config(payload: bytes) -> dict:
+    """Give a remote's config sent by dumps_config."""
+    config = _json.loads(payload)
+    for key in config.pop(BYTES_KEY, []):
+        config[key] = _base64.b64decode(config[key])
+    return config
+
+
+def _token(token: str | None) -> str:
+    return token if token is not None else _os.environ.get(TOKEN_ENV, "")
+
+
+def connect(
+    address: str | tuple[str, int], role: str, token: str | None = None, **hello
+) -> DriverComs:
+    """Connect to a broker, and say who this is, as a "worker" or a "driver".
+
+    Raises:
+    ------
+        BrokerRefused: the broker refused the connection, ex: the token is wrong.
+        BrokerError: the connection was lost before the broker answered.
+
+    Returns:
+    -------
+        DriverComs: the connection, once the broker accepted it.
+
+    """
+    conn = _socket.create_connection(parse_address(address), timeout=HELLO_TIMEOUT)
+    comms = DriverComs(conn)
+    try:
+        comms.send_message({"op": "hello", "role": role, "token": _token(token), **hello})
+        reply, _ = comms.recv_message()
+    except (ConnectionError, OSError, ValueError) as e:
+        conn.close()
+        raise BrokerError(f"broker at {address=} closed the connection, {e!r}") from None
+    if reply.get("op") != "welcome":
+        conn.close()
+        raise BrokerRefused(f"broker at {address=} refused the connection, {reply.get('error')}")
+    conn.settimeout(None)
+    return comms
+
+
+class _Peer:
+    """A connection to the broker, sent to by several of its threads."""
+
+    def __init__(self, comms: DriverComs, name: str) -> None:
+        self.comms = comms
+        self.name = name
+        self._send_lock = _threading.Lock()
+
+    def send(self, header: dict, payload: bytes | str = b"") -> bool:
+        """Send a message, give False if the connection is lost."""
+        try:
+            with self._send_lock:
+                self.comms.send_message(header, payload)
+            return True
+        except (ConnectionError, OSError):
+            return False
+
+    def close(self) -> None:
+        try:
+            self.comms.conn.shutdown(_socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.comms.conn.close()
+
+
+class _Worker(_Peer):
+    def __init__(self, comms: DriverComs, name: str, slots: int) -> None:
+        super().__init__(comms, name)
+        self.slots = slots
+        self.leases: set[int] = set()
+
+
+class _Lease(_typing.NamedTuple):
+    driver: _Peer
+    worker: _Worker
+
+
+class Broker:
+    """Accept seleniumqt-remote workers, and start a remote on one of them for every driver which asks.
+
+    the remote connects straight to the driver, which listens on its "driver_host",
+    the broker only passes on the start, the exit, and kills of the remote. a remote
+    runs on the worker with the most free slots, and is killed if its driver's
+    connection to the broker is lost.
+
+    # Usage
+        ```sh
+        $ seleniumqt-broker --host 0.0.0.0 --port 7700 --token secret
+        $ seleniumqt-remote --host broker.local --port 7700 --token secret --slots 4 # on every machine.
+        ```
+        ```python
+        >>> driver = Driver({"starting_url": ..., "broker": "broker.local:7700", "broker_token": "secret", "driver_host": "10.0.0.5"})
+        ```
+
+    # Protocol
+        DriverComs messages, a json header, then a payload.
+        - everyone: `{"op": "hello", "role": "worker" or "driver", "token": ...}`, answered
+          `{"op": "welcome"}`, or `{"op": "error", "error": ...}` before the broker closes.
+        - worker hello: with `"name"` and `"slots"`, remotes it runs at once.
+        - driver: `{"op": "lease"}` with the remote's config as payload, see dumps_config, answered
+          `{"op": "started", "lease": ..., "worker": ..., "pid": ...}`, then
+          `{"op": "exited", "exitcode": ..., "error": ...}` once the remote exits.
+          `{"op": "kill"}` kills it, a connection has one lease.
+        - to workers: `{"op": "start", "lease": ...}` with the config, and
+          `{"op": "kill", "lease": ...}`, workers answer with started and exited, with the lease.
+    """
+
+    # seconds a driver waits for a worker with a free slot.
+    LEASE_TIMEOUT: float = 30.0
+
+    def __init__(
+        self,
+        host: str = "localhost",
+        port: int = 0,
+        token: str | None = None,
+    ) -> None:
+        """Construct Broker, it listens at once, start or serve_forever accept the connections.
+
+        Args:
+        ----
+            host (str, optional): the address to listen on, "0.0.0.0" for every one. Defaults to "localhost".
+            port (int, optional): the port to listen on, 0 for any free one, see address. Defaults to 0.
+            token (str | None, optional): the token every connection must give. Defaults to SELENIUMQT_TOKEN.
+
+        """
+        self.token = _token(token)
+        if not self.token:
+            logger.warning("Broker has no token, anyone who can reach it can start remotes.")
+
+        self.sock = _socket.create_server((host, port))
+        self.address: tuple[str, int] = self.sock.getsockname()[:2]
+
+        self._lock = _threading.Condition()
+        self._workers: list[_Worker] = []
+        self._leases: dict[int, _Lease] = {}
+        self._lease_ids = _itertools.count(1)
+        self._closed = False
+
+    # --------------------------------------------connections---------------------------------------------
+    def serve_forever(self) -> None:
+        """Accept connections until close is called."""
+        logger.info(f"Broker listening on {self.address=}")
+        while not self._closed:
+            try:
+                conn, peer = self.sock.accept()
+            except OSError:
+                break
+            thread = _threading.Thread(
+                target=self.__connection, args=(conn, peer), daemon=True
+            )
+            thread.name = f"broker-{peer[0]}:{peer[1]}"
+            thread.start()
+
+    def start(self) -> "Broker":
+        """Accept connections in a thread, give self."""
+        thread = _threading.Thread(target=self.serve_forever, daemon=True)
+        thread.name = "broker"
+        thread.start()
+        return self
+
+    def __connection(self, conn: _socket.socket, peer: tuple) -> None:
+        comms = DriverComs(conn)
+        conn.settimeout(HELLO_TIMEOUT)
+        try:
+            hello, _ = comms.recv_message()
+        except (ConnectionError, OSError, ValueError):
+            conn.close()
+            return
+
+        if (hello.get("op") != "hello") or not _hmac.compare_digest(
+            str(hello.get("token", "")).encode(), self.token.encode()
+        ):
+            logger.warning(f"Broker refused {peer=}, wrong token.")
+            _Peer(comms, "").send({"op": "error", "error": "wrong token"})
+            conn.close()
+            return
+        conn.settimeout(None)
+
+        if hello.get("role") == "worker":
+            worker = _Worker(
+                comms, hello.get("name") or f"{peer[0]}:{peer[1]}", int(hello.get("slots") or 1)
+            )
+            worker.send({"op": "welcome"})
+            self.__serve_worker(worker)
+        elif hello.get("role") == "driver":
+            driver = _Peer(comms, f"{peer[0]}:{peer[1]}")
+            driver.send({"op": "welcome"})
+            self.__serve_driver(driver)
+        else:
+            _Peer(comms, "").send({"op": "error", "error": f"unknown role {hello.get('role')!r}"})
+            conn.close()
+
+    def __serve_worker(self, worker: _Worker) -> None:
+        logger.info(f"Worker {worker.name} connected, {worker.slots=}")
+        with self._lock:
+            self._workers.append(worker)
+            self._lock.notify_all()
+
+        try:
+            while True:
+                message, _ = worker.comms.recv_message()
+                with self._lock:
+                    lease = self._leases.get(message.get("lease"))
+                if lease is None:
+                    continue  # its driver already left.
+
+                if message.get("op") == "started":
+                    lease.driver.send(
+                        {
+                            "op": "started",
+                            "lease": message["lease"],
+                            "worker": worker.name,
+                            "pid": message.get("pid"),
+                        }
+                    )
+                elif message.get("op") == "exited":
+                    self.__end(message["lease"], message.get("exitcode"), message.get("error"))
+        except (ConnectionError, OSError, ValueError) as e:
+            logger.warning(f"Worker {worker.name} was lost, {e!r}")
+        finally:
+            with self._lock:
+                self._workers.remove(worker)
+            for lease_id in list(worker.leases):
+                self.__end(lease_id, None, f"worker {worker.name} was lost")
+            worker.close()
+
+    def __serve_driver(self, driver: _Peer) -> None:
+        lease_id: int | None = None
+        try:
+            while True:
+                message, payload = driver.comms.recv_message()
+                if message.get("op") == "lease":
+                    if lease_id in self._leases:
+                        driver.send({"op": "error", "error": "this connection already has a remote"})
+                        continue
+                    lease_id = self.__lease(driver, bytes(payload), message.get("timeout"))
+                elif message.get("op") == "kill":
+                    with self._lock:
+                        lease = self._leases.get(lease_id)
+                    if lease is not None:
+                        lease.worker.send({"op": "kill", "lease": lease_id})
+        except (ConnectionError, OSError, ValueError):
+            pass
+        finally:
+            with self._lock:
+                lease = self._leases.get(lease_id)
+            if lease is not None:
+                # nobody is left to use the remote.
+                lease.worker.send({"op": "kill", "lease": lease_id})
+            driver.close()
+
+    # ----------------------------------------------leases------------------------------------------------
+    def __lease(self, driver: _Peer, config: bytes, timeout: float | None) -> int | None:
+        """Start a remote for driver on the worker with the most free slots, waiting for one to have a slot."""
+        deadline = _time.monotonic() + (timeout or self.LEASE_TIMEOUT)
+        with self._lock:
+            while True:
+                free = [worker for worker in self._workers if len(worker.leases) < worker.slots]
+                if free:
+                    break
+                if (remaining := deadline - _time.monotonic()) <= 0:
+                    driver.send({"op": "error", "error": f"no worker has a free slot, {len(self._workers)} connected"})
+                    return None
+                self._lock.wait(remaining)
+
+            worker = max(free, key=lambda worker: worker.slots - len(worker.leases))
+            lease_id = next(self._lease_ids)
+            worker.leases.add(lease_id)
+            self._leases[lease_id] = _Lease(driver, worker)
+
+        logger.info(f"Starting remote {lease_id=} on {worker.name} for {driver.name}")
+        if not worker.send({"op": "start", "lease": lease_id}, config):
+            self.__end(lease_id, None, f"worker {worker.name} was lost")
+        return lease_id
+
+    def __end(self, lease_id: int, exitcode: int | None, error: str | None) -> None:
+        """Tell the driver its remote exited, and free the worker's slot."""
+        with self._lock:
+            lease = self._leases.pop(lease_id, None)
+            if lease is None:
+                return
+            lease.worker.leases.discard(lease_id)
+            self._lock.notify_all()
+        logger.info(f"Remote {lease_id=} exited, {exitcode=} {error=}")
+        lease.driver.send({"op": "exited", "lease": lease_id, "exitcode": exitcode, "error": error})
+
+    def workers(self) -> list[dict]:
+        """Give the workers connected, with their slots, and remotes running."""
+        with self._lock:
+            return [
+                {"name": worker.name, "slots": worker.slots, "running": len(worker.leases)}
+                for worker in self._workers
+            ]
+
+    def close(self) -> None:
+        """Stop accepting connections, and drop every one, the workers kill their remotes."""
+        self._closed = True
+        try:
+            # close alone doesn't wake a thread blocked in accept on linux.
+            self.sock.shutdown(_socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.sock.close()
+        with self._lock:
+            peers = [*self._workers, *(lease.driver for lease in self._leases.values())]
+        for peer in peers:
+            peer.close()
+
+
+class RemoteLease:
+    """A remote started on a worker by a broker, the driver uses it in place of the remote's multiprocessing.Process."""
+
+    def __init__(
+        self,
+        address: str | tuple[str, int],
+        token: str | None,
+        config: dict,
+        timeout: float | None = None,
+    ) -> None:
+        """Ask the broker for a remote with config, and wait until a worker started it.
+
+        Raises:
+        ------
+            BrokerError: the broker refused, or no worker could start it.
+
+        Args:
+        ----
+            address (str | tuple[str, int]): the broker, "host:port".
+            token (str | None): the broker's token. None for SELENIUMQT_TOKEN.
+            config (dict): the remote's config, its "connection_host" must be reachable from the workers.
+            timeout (float | None, optional): seconds to wait for a worker with a free slot. Defaults to Broker.LEASE_TIMEOUT.
+
+        """
+        self._peer = _Peer(connect(address, "driver", token), f"{address}")
+        self._exited = _threading.Event()
+        self.exitcode: int | None = None
+        self.error: str | None = None
+
+        self._peer.send({"op": "lease", "timeout": timeout}, dumps_config(config))
+        try:
+            reply, _ = self._peer.comms.recv_message()
+        except (ConnectionError, OSError, ValueError) as e:
+            self._peer.close()
+            raise BrokerError(f"broker closed the connection, {e!r}") from None
+        if reply.get("op") != "started":
+            self._peer.close()
+            raise BrokerError(f"broker could not start a remote, {reply.get('error')}")
+
+        self.lease: int = reply["lease"]
+        self.worker: str = reply["worker"]
+        self.pid: int | None = reply.get("pid")  # on the worker's machine.
+        self.name = f"Remote-{self.worker}-{self.pid}"
+        logger.info(f"Leased {self.name}")
+
+        watcher = _threading.Thread(target=self.__watch, daemon=True)
+        watcher.name = "driver-lease"
+        watcher.start()
+
+    def __watch(self) -> None:
+        """Wait for the broker to say the remote exited, losing the broker counts as an exit as well."""
+        try:
+            while True:
+                message, _ = self._peer.comms.recv_message()
+                if message.get("op") == "exited":
+                    self.exitcode = message.get("exitcode")
+                    self.error = message.get("error")
+                    break
+        except (ConnectionError, OSError, ValueError) as e:
+            self.error = f"broker connection lost, {e!r}"
+        self._exited.set()
+        self._peer.close()
+
+    def is_alive(self) -> bool:
+        return not self._exited.is_set()
+
+    def kill(self) -> None:
+        self._peer.send({"op": "kill"})
+
+    def join(self, timeout: float | None = None) -> None:
+        self._exited.wait(timeout)
+
+
+def main() -> None:
+    """Run a broker, entry point of seleniumqt-broker."""
+    parser = _argparse.ArgumentParser(
+        prog="seleniumqt-broker",
+        description="hand drivers remotes started by seleniumqt-remote workers.",
+    )
+    parser.add_argument("--host", default="0.0.0.0", help="address to listen on.")
+    parser.add_argument("--port", type=int, default=7700)
+    parser.add_argument("--token", default=None, help=f"defaults to ${TOKEN_ENV}.")
+    args = parser.parse_args()
+
+    broker = Broker(args.host, args.port, args.token)
+    try:
+        broker.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        broker.close()
+
+
+__all__ = [
+    "Broker",
+    "RemoteLease",
+    "connect",
+    "parse_address",
+    "dumps_config",
+    "loads_config",
+    "TOKEN_ENV",
+]
@@ -0,0 +1,99 @@
+"""module containing the query cache, which keeps the results of idempotent driver queries until the page changes."""
+
+# ---------------------------------------------------
+# author: Ansh Mathur
+# gtihub: https://github.com/Fakesum
+# repo: https://github.com/Fakesum/ TODO: THIS
+# ---------------------------------------------------
+
+# import python std library
+import typing as _typing
+import threading as _threading
+import collections as _collections
+
+
+# the commands which never change the page, they don't invalidate the cache.
+READ_ONLY_COMMANDS: tuple[str, ...] = (
+    "current_url",
+    "trace",
+    "timings",
+    "frames",
+    "export_session",
+    "dom_changes",
+)
+
+
+class CacheStats(_typing.NamedTuple):
+    """Counters of a query cache, given by Driver.query_cache_stats."""
+
+    hits: int  # queries answered from the cache, without a round trip.
+    misses: int  # queries sent to remote.
+    invalidations: int  # times the cache was emptied, ex: by a navigation.
+    entries: int  # results cached now.
+
+
+class QueryCache:
+    """The results of idempotent queries by key, the least recently used dropped first.
+
+    every invalidation starts a new generation, a result is only kept if no
+    invalidation happened since its query was sent, so a query which raced a
+    navigation is not cached with the old page's result.
+    """
+
+    # results kept, unless the "query_cache_size" config is given.
+    MAX_ENTRIES: int = 256
+
+    def __init__(self, max_entries: int = MAX_ENTRIES) -> None:
+        """Construct QueryCache.
+
+        Args:
+        ----
+            max_entries (int, optional): results kept. Defaults to MAX_ENTRIES.
+
+        """
+        self.max_entries = max_entries
+        self._entries: _collections.OrderedDict[_typing.Hashable, _typing.Any] = (
+            _collections.OrderedDict()
+        )
+        self._lock = _threading.Lock()
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, key: _typing.Hashable) -> tuple[bool, _typing.Any, int]:
+        """Give whether key is cached, its result, and the generation to put a new result with."""
+        with self._lock:
+            if key in self._entries:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return True, self._entries[key], self.generation
+            self.misses += 1
+            return False, None, self.generation
+
+    def put(self, key: _typing.Hashable, value: _typing.Any, generation: int) -> bool:
+        """Cache a result, unless the cache was invalidated since generation, give whether it was."""
+        with self._lock:
+            if generation != self.generation:
+                return False
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return True
+
+    def invalidate(self) -> None:
+        """Drop every result, and the results of the queries in flight."""
+        with self._lock:
+            self._entries.clear()
+            self.generation += 1
+            self.invalidations += 1
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                self.hits, self.misses, self.invalidations, len(self._entries)
+            )
+
+
+__all__ = ["READ_ONLY_COMMANDS", "CacheStats", "QueryCache"]
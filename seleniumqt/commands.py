@@ -0,0 +1,178 @@
+"""module containing the command registry, which adds commands that run inside remote, next to the page."""
+
+# ---------------------------------------------------
+# author: Ansh Mathur
+# gtihub: https://github.com/Fakesum
+# repo: https://github.com/Fakesum/ TODO: THIS
+# ---------------------------------------------------
+
+# import python std library
+import json as _json
+import typing as _typing
+import importlib as _importlib
+
+# import logger
+from .logger import logger
+
+
+# the commands of every remote, the opcode of each is its position, so they never change.
+BUILTIN_COMMANDS: tuple[str, ...] = (
+    "js",
+    "url",
+    "click",
+    "hide",
+    "show",
+    "page",
+    "close",
+    "current_url",
+    "trace",
+    "init_script",
+    "export_session",
+    "import_session",
+    "frames",
+    "timings",
+    "dom_changes",
+    "clear_cookies",
+)
+
+# opcodes are sent as two digits, see Driver.COMMAND_RESERVED_LENGTH.
+MAX_COMMANDS: int = 100
+
+# returned by a handler which resolves its command later, with CommandContext.resolve.
+PENDING = object()
+
+
+class CommandContext:
+    """What a command handler is given, remote, its page, and the frame the command runs in.
+
+    a handler runs in the qt thread of remote, it must not block, anything slow is
+    done with qt's callbacks, and the command resolved from them.
+    """
+
+    def __init__(
+        self,
+        remote: _typing.Any,
+        page: _typing.Any,
+        frame: _typing.Any,
+        resolve: _typing.Callable[[_typing.Any], None],
+        run_javascript: _typing.Callable[..., None],
+    ) -> None:
+        """Construct CommandContext, remote gives one to each command.
+
+        Args:
+        ----
+            remote (Remote): the remote, a QWebEngineView.
+            page (QWebEnginePage): its page.
+            frame (QWebEngineFrame | None): the frame the command was given for, None for the page.
+            resolve (Callable[[Any], None]): gives the driver the command's result.
+            run_javascript (Callable[..., None]): runs javascript in the frame, or the page.
+
+        """
+        self.remote = remote
+        self.page = page
+        self.frame = frame
+        self._resolve = resolve
+        self._run_javascript = run_javascript
+
+    def resolve(self, result: _typing.Any = None) -> None:
+        """Complete the command, a str is given to the driver as is, an Exception raised there, anything else as json."""
+        if not isinstance(result, (str, BaseException, type(None))):
+            result = _json.dumps(result)
+        self._resolve(result)
+
+    def run_javascript(
+        self,
+        script: str,
+        callback: _typing.Callable[[_typing.Any], None],
+        world: str = "main",
+    ) -> None:
+        """Run javascript where the command runs, callback is given its result.
+
+        Args:
+        ----
+            script (str): the javascript, an expression, its value is the result.
+            callback (Callable[[Any], None]): given the result, in the qt thread.
+            world (str, optional): one of seleniumqt.page.WORLDS. Defaults to "main".
+
+        """
+        self._run_javascript(script, callback, world)
+
+
+class Command(_typing.NamedTuple):
+    """A command added to remote with the command decorator."""
+
+    name: str
+    handler: _typing.Callable[[CommandContext, str], _typing.Any]
+    concurrent: bool  # runs alongside other commands, like js, instead of one at a time.
+
+
+# every command registered in this process, by name.
+COMMANDS: dict[str, Command] = {}
+
+
+def command(
+    name: str, concurrent: bool = False
+) -> _typing.Callable[[_typing.Callable], _typing.Callable]:
+    """Register a handler as a command of remote, it is called with a CommandContext and the command's argument.
+
+    # Usage
+        ```python
+        # my_plugin.py, given to the driver as {"plugins": ["my_plugin"]}.
+        from seleniumqt.commands import command, PENDING
+
+        @command("title")
+        def title(context, arg):
+            return context.page.title() # sent to the driver once it returns.
+
+        @command("scroll_and_count", concurrent=True)
+        def scroll_and_count(context, arg):
+            def counted(result):
+                context.resolve({"count": result}) # anything other than a str is sent as json.
+            context.run_javascript(f"window.scrollBy(0, {int(arg)}); document.querySelectorAll('a').length", counted)
+            return PENDING # resolved later, by counted.
+        ```
+        ```python
+        >>> driver.command("title")
+        'Example Domain'
+        ```
+
+    # Raises:
+        ValueError: name is a builtin command.
+
+    # Args:
+        name (str): the name the driver calls it by.
+        concurrent (bool, optional): run alongside other commands, the handler must not navigate. Defaults to False.
+    """
+    if name in BUILTIN_COMMANDS:
+        raise ValueError(f"{name=} is a builtin command.")
+
+    def register(handler: _typing.Callable) -> _typing.Callable:
+        if name in COMMANDS:
+            logger.warning(f"Replacing command {name=}")
+        COMMANDS[name] = Command(name, handler, concurrent)
+        return handler
+
+    return register
+
+
+def load(modules: _typing.Iterable[str]) -> None:
+    """Import the plugin modules, which register their commands as they are imported."""
+    for module in modules:
+        _importlib.import_module(module)
+
+
+def opcodes() -> dict[str, int]:
+    """Give the opcode of every command, the builtins first, then the registered ones by name.
+
+    Raises:
+    ------
+        ValueError: there are more than MAX_COMMANDS commands.
+
+    """
+    names = [*BUILTIN_COMMANDS, *sorted(COMMANDS)]
+    if len(names) > MAX_COMMANDS:
+        raise ValueError(f"{len(names)} commands, at most {MAX_COMMANDS=} can be sent.")
+    return {name: opcode for opcode, name in enumerate(names)}
+
+
+__all__ = ["Command", "CommandContext", "PENDING", "command", "load", "opcodes"]
@@ -3,27 +3,92 @@ Author: Ansh Mathur
 repo: https://www.github.com/Fakesum/seleniumqt
 """
 import socket as _socket
-import math as _math
+import struct as _struct
+import json as _json
 
 class DriverComs:
-    MAX_PACKET_SIZE = 1024
+    """Length prefixed frames over a stream socket.
+
+    every frame is an 8 byte big endian length, followed by that many bytes.
+    the length is read whole before the frame, and the frame is read until it is
+    complete, so partial reads and fragmented writes can't split or merge frames.
+    """
+
+    # a frame may be sent right after the last one, there is no acknowledgement.
+    LENGTH = _struct.Struct("!Q")
+
+    # most bytes asked of the socket in one recv_into.
+    RECV_CHUNK_SIZE = 1024 * 1024
+
+    # a length larger than this can only be a corrupted stream.
+    MAX_FRAME_SIZE = 1 << 34
+
+    # payloads smaller than this are copied into one write with the header.
+    COALESCE_SIZE = 64 * 1024
 
     def __init__(self, conn: _socket.socket) -> None:
         """Construct DriverComs."""
         self.conn = conn
-    
-    def send(self, data: bytes) -> None:
+        try:
+            # a frame is written at once, waiting for more data only adds latency.
+            conn.setsockopt(_socket.IPPROTO_TCP, _socket.TCP_NODELAY, 1)
+        except (OSError, AttributeError):
+            pass  # not a tcp socket, ex: a socketpair.
+
+    def recv_exactly(self, size: int) -> bytearray:
+        """Read exactly size bytes, raise ConnectionResetError if the peer closes first."""
+        data = bytearray(size)
+        view = memoryview(data)
+        received = 0
+        while received < size:
+            n = self.conn.recv_into(
+                view[received:], min(size - received, self.RECV_CHUNK_SIZE)
+            )
+            if n == 0:
+                # an empty read means the other end closed the connection.
+                raise ConnectionResetError(
+                    "DriverComs peer closed the connection."
+                    + (f" {received=} of {size=} bytes." if received else "")
+                )
+            received += n
+        return data
+
+    def send(self, data: bytes | str) -> None:
         if isinstance(data, str):
             data = data.encode('utf-8')
-        self.conn.send(str(_math.ceil(len(data)/self.MAX_PACKET_SIZE)).encode('utf-8'))
-        self.conn.recv(1)
-        self.conn.send(data)
-    
-    def recv(self) -> bytes:
-        n_packets = int(self.conn.recv(self.MAX_PACKET_SIZE).decode('utf-8'))
-        self.conn.send(b'1')
-        
-        packet = b''
-        for _ in range(n_packets):
-            packet += self.conn.recv(self.MAX_PACKET_SIZE)
-        return packet
\ No newline at end of file
+        self.__send_frame(data)
+
+    def recv(self) -> bytearray:
+        (size,) = self.LENGTH.unpack(self.recv_exactly(self.LENGTH.size))
+        if size > self.MAX_FRAME_SIZE:
+            raise ValueError(f"DriverComs frame length {size=} is corrupt.")
+        return self.recv_exactly(size)
+
+    def __send_frame(self, *parts: bytes) -> None:
+        size = sum(len(part) for part in parts)
+        pending = self.LENGTH.pack(size)
+        for part in parts:
+            if len(part) < self.COALESCE_SIZE:
+                pending += part
+                continue
+            # large parts are sent from memory as they are, not copied.
+            self.conn.sendall(pending)
+            self.conn.sendall(part)
+            pending = b''
+        if pending:
+            self.conn.sendall(pending)
+
+    def send_message(self, header: dict, payload: bytes | str = b'') -> None:
+        """Send a json header, followed by a raw payload in the same frame."""
+        if isinstance(payload, str):
+            payload = payload.encode('utf-8')
+        self.__send_frame(_json.dumps(header).encode('utf-8') + b'\n', payload)
+
+    def recv_message(self) -> tuple[dict, bytearray]:
+        """Receive a frame sent by send_message, and split it into (header, payload)."""
+        frame = self.recv()
+        end = frame.index(b'\n')
+        header = _json.loads(frame[:end])
+        # the header is removed in place, so the payload is not copied.
+        del frame[: end + 1]
+        return header, frame
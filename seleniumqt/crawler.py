@@ -0,0 +1,250 @@
+"""module containing crawl, which opens many urls with a pool of drivers and streams the extracted results."""
+
+# ---------------------------------------------------
+# author: Ansh Mathur
+# gtihub: https://github.com/Fakesum
+# repo: https://github.com/Fakesum/ TODO: THIS
+# ---------------------------------------------------
+
+# import python std library
+import os as _os
+import json as _json
+import queue as _queue
+import typing as _typing
+import threading as _threading
+
+# import logger
+from .logger import logger
+
+# import the Driver
+from .driver import Driver
+
+# import the politeness scheduler
+from .politeness import Scheduler
+
+
+class CrawlResult(_typing.NamedTuple):
+    """The outcome of one url given to crawl."""
+
+    index: int  # position of the url in the input.
+    url: str
+    result: str | None  # what the extractor returned, None if it failed.
+    error: Exception | None  # why it failed, None if it did not.
+
+
+# put in the queues to tell the other side there is nothing more.
+_DONE = object()
+
+# urls each driver may look ahead at for one whose host is not throttled, with a scheduler.
+LOOKAHEAD: int = 8
+
+
+class _Checkpoint:
+    """Append only file of the input positions already given to the caller, one json line each."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.done: set[int] = set()
+        if _os.path.exists(path):
+            with open(path) as f:
+                for line in f:
+                    try:
+                        self.done.add(_json.loads(line)["index"])
+                    except (ValueError, KeyError):
+                        # a line cut short when the last run was killed.
+                        logger.warning(f"Ignoring checkpoint line {line=}")
+        self._file = open(path, "a")
+
+    def add(self, result: CrawlResult) -> None:
+        self._file.write(
+            _json.dumps({"index": result.index, "url": result.url}) + "\n"
+        )
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def crawl(
+    urls: _typing.Iterable[str],
+    extractor: str,
+    concurrency: int = 4,
+    config: dict | None = None,
+    wait_until: str = "load",
+    timeout: float | None = None,
+    checkpoint: str | None = None,
+    scheduler: Scheduler | None = None,
+) -> _typing.Iterator[CrawlResult]:
+    """Open every url, run the extractor javascript on it, and yield the results as they complete.
+
+    concurrency drivers are started, each keeps one page busy. the urls are read
+    lazily, and the queues between the input, the drivers and the caller hold
+    at most a few urls per driver, so memory stays flat for any number of urls,
+    and a caller which stops reading stops the crawl.
+
+    # Usage
+        ```python
+        >>> for result in seleniumqt.crawl(open("urls.txt"), "return document.title;", concurrency=8, checkpoint="crawl.ckpt"):
+        ...     if result.error is None:
+        ...         print(result.url, result.result)
+        ```
+
+    # Politeness
+        with scheduler, every open waits until its host's policy allows it. a driver
+        takes the first of the next LOOKAHEAD urls per driver whose host is not throttled,
+        so results come out of order, and drivers stay busy while some hosts wait.
+
+    # Resume
+        with checkpoint, the position of every result the caller has taken is recorded
+        in that file, a result is recorded once the caller asks for the next one. giving
+        the same urls and checkpoint again skips them, the urls must be in the same order.
+
+    # Args:
+        urls (Iterable[str]): the urls, can be a lazy iterable, ex: a file or generator.
+        extractor (str): javascript run on every page, its return value is the result, see Driver.execute_script.
+        concurrency (int, optional): number of drivers, and pages open at once. Defaults to 4.
+        config (dict | None, optional): config of the drivers, they are always supervised. Defaults to None.
+        wait_until (str, optional): state a page must reach before the extractor runs, see Driver.open. Defaults to "load".
+        timeout (float | None, optional): seconds for each open and extractor, see Driver.execute. Defaults to None.
+        checkpoint (str | None, optional): file to record finished urls in, and resume from. Defaults to None.
+        scheduler (Scheduler | None, optional): limits the opens of each host, see seleniumqt.politeness. Defaults to None.
+
+    # Yields:
+        CrawlResult: (index, url, result, error) in the order they complete.
+    """
+    if concurrency < 1:
+        raise ValueError(f"{concurrency=} must be at least 1.")
+
+    config = {**(config or {}), "supervised": True}
+    config.setdefault("starting_url", "about:blank")
+
+    progress = _Checkpoint(checkpoint) if checkpoint else None
+    skip = progress.done if progress else set()
+
+    pending: _queue.Queue = _queue.Queue(maxsize=concurrency)
+    results: _queue.Queue = _queue.Queue(maxsize=concurrency)
+    stop = _threading.Event()
+
+    # the urls taken from pending, which the drivers pick from, see take.
+    window: list[tuple[int, str]] = []
+    window_lock = _threading.Lock()
+    fed = _threading.Event()  # every url is in pending, or window.
+
+    def put(q: _queue.Queue, item: _typing.Any) -> bool:
+        # gives up once the crawl is stopped, so no thread blocks forever on a full queue.
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except _queue.Full:
+                continue
+        return False
+
+    def feed() -> None:
+        try:
+            for index, url in enumerate(urls):
+                if index in skip:
+                    continue
+                if not put(pending, (index, url.strip())):
+                    return
+        except Exception as e:
+            logger.exception(f"crawl input failed: {e}")
+            put(results, e)
+        finally:
+            put(pending, _DONE)
+
+    def take() -> tuple[int, str] | object:
+        """Give the next url a driver may open, with a scheduler its host's open is started."""
+        while not stop.is_set():
+            wait = 0.1
+            with window_lock:
+                while (len(window) < (LOOKAHEAD * concurrency if scheduler else 1)) and (
+                    not fed.is_set()
+                ):
+                    try:
+                        item = pending.get_nowait()
+                    except _queue.Empty:
+                        break
+                    if item is _DONE:
+                        fed.set()
+                        break
+                    window.append(item)
+
+                if window:
+                    if scheduler is None:
+                        return window.pop(0)
+                    position, wait = scheduler.try_acquire_any([url for _, url in window])
+                    if position is not None:
+                        return window.pop(position)
+                elif fed.is_set():
+                    return _DONE
+            # nothing could be taken, wait for a url, or a host.
+            stop.wait(min(wait, 0.1) if window else 0.01)
+        return _DONE
+
+    def work() -> None:
+        driver: Driver | None = None
+        try:
+            while not stop.is_set():
+                item = take()
+                if item is _DONE:
+                    return
+                index, url = item
+
+                try:
+                    try:
+                        if (driver is None) or driver.is_closed:
+                            driver = Driver(dict(config))
+                        driver.open(url, wait_until=wait_until, timeout=timeout)
+                    finally:
+                        if scheduler is not None:
+                            scheduler.release(url)
+                    result = CrawlResult(
+                        index,
+                        url,
+                        driver.execute_script(extractor, timeout=timeout),
+                        None,
+                    )
+                except Exception as e:
+                    logger.warning(f"crawl failed {url=}: {e!r}")
+                    result = CrawlResult(index, url, None, e)
+
+                if not put(results, result):
+                    return
+        finally:
+            put(results, _DONE)
+            if driver is not None:
+                try:
+                    driver.close(timeout=10)
+                except Exception:
+                    pass
+
+    threads = [_threading.Thread(target=feed, daemon=True, name="crawl-feed")] + [
+        _threading.Thread(target=work, daemon=True, name=f"crawl-{i}")
+        for i in range(concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+
+    running = concurrency
+    try:
+        while running:
+            item = results.get()
+            if item is _DONE:
+                running -= 1
+                continue
+            if isinstance(item, Exception):
+                raise item
+            yield item
+            # the caller asked for the next result, so it is done with this one.
+            if progress:
+                progress.add(item)
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join(timeout=30)
+        if progress:
+            progress.close()
+
+
+__all__ = ["crawl", "CrawlResult"]
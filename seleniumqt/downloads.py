@@ -0,0 +1,169 @@
+"""module containing the download manager, which saves the downloads of remote's pages straight to disk."""
+
+# ---------------------------------------------------
+# author: Ansh Mathur
+# gtihub: https://github.com/Fakesum
+# repo: https://github.com/Fakesum/ TODO: THIS
+# ---------------------------------------------------
+
+# import python std library
+import os as _os
+import typing as _typing
+
+# import Qt
+from PyQt6 import (
+    QtCore as _QtCore,
+    QtWebEngineCore as _QtWebEngineCore,
+)
+
+# import logger
+from .logger import logger
+
+# clock shared with the metrics.
+from .metrics import now as _now
+
+
+_DownloadRequest = _QtWebEngineCore.QWebEngineDownloadRequest
+
+# the state given in the events of a download which is done, by qt's state.
+FINAL_STATES: dict[_DownloadRequest.DownloadState, str] = {
+    _DownloadRequest.DownloadState.DownloadCompleted: "completed",
+    _DownloadRequest.DownloadState.DownloadCancelled: "cancelled",
+    _DownloadRequest.DownloadState.DownloadInterrupted: "interrupted",
+}
+
+
+class DownloadManager(_QtCore.QObject):
+    """Accept every download of a profile into a directory, a few at once, and report each as events.
+
+    chromium writes the file itself, its bytes never pass through python. a
+    download over max_parallel is accepted and paused, and resumed once one
+    before it is done.
+
+    # Event
+    ```python
+    {
+        "id": ..., # the download's id, unique in remote.
+        "url": ...,
+        "path": ..., # where the file is, once it is completed.
+        "state": ..., # queued, in_progress, completed, cancelled or interrupted.
+        "received": ..., # bytes.
+        "total": ..., # bytes, -1 if unknown.
+        "error": ..., # why it was interrupted, else None.
+    }
+    ```
+    """
+
+    # seconds between progress events of a download.
+    PROGRESS_INTERVAL: float = 0.5
+
+    def __init__(
+        self,
+        profile: _QtWebEngineCore.QWebEngineProfile,
+        directory: str,
+        max_parallel: int,
+        emit: _typing.Callable[[dict], None],
+        parent: _QtCore.QObject | None = None,
+    ) -> None:
+        """Construct DownloadManager, it accepts downloads from now on.
+
+        Args:
+        ----
+            profile (QWebEngineProfile): the profile, of remote's page.
+            directory (str): where the files are saved, it is created if needed.
+            max_parallel (int): downloads running at once.
+            emit (Callable[[dict], None]): given every event, see the Event section of the class.
+            parent (QObject, optional): qt parent. Defaults to None.
+
+        """
+        super().__init__(parent)
+        self.directory = directory
+        self.max_parallel = max_parallel
+        self.emit = emit
+        _os.makedirs(directory, exist_ok=True)
+
+        self._running: dict[int, _DownloadRequest] = {}
+        self._queued: list[_DownloadRequest] = []
+        # names given to downloads which may not have created their file yet.
+        self._reserved: set[str] = set()
+        self._last_progress: dict[int, float] = {}
+
+        profile.downloadRequested.connect(self.__requested)
+
+    def __unique_name(self, name: str) -> str:
+        """Give a file name in directory which no file, or other download, has, ex: report (1).csv"""
+        base, extension = _os.path.splitext(name or "download")
+        candidate, n = base + extension, 0
+        while (candidate in self._reserved) or _os.path.exists(
+            _os.path.join(self.directory, candidate)
+        ):
+            n += 1
+            candidate = f"{base} ({n}){extension}"
+        self._reserved.add(candidate)
+        return candidate
+
+    def __event(self, download: _DownloadRequest, state: str) -> None:
+        self.emit(
+            {
+                "id": download.id(),
+                "url": download.url().toString(),
+                "path": _os.path.join(
+                    download.downloadDirectory(), download.downloadFileName()
+                ),
+                "state": state,
+                "received": download.receivedBytes(),
+                "total": download.totalBytes(),
+                "error": (
+                    download.interruptReasonString()
+                    if state == "interrupted"
+                    else None
+                ),
+            }
+        )
+
+    def __requested(self, download: _DownloadRequest) -> None:
+        download.setDownloadDirectory(self.directory)
+        download.setDownloadFileName(self.__unique_name(download.downloadFileName()))
+        download.receivedBytesChanged.connect(lambda: self.__progress(download))
+        download.stateChanged.connect(lambda state: self.__state_changed(download, state))
+        download.accept()
+
+        logger.info(f"Downloading {download.url().toString()} to {download.downloadFileName()}")
+        if len(self._running) >= self.max_parallel:
+            download.pause()
+            self._queued.append(download)
+            self.__event(download, "queued")
+        else:
+            self._running[download.id()] = download
+            self.__event(download, "in_progress")
+
+    def __progress(self, download: _DownloadRequest) -> None:
+        now = _now()
+        if (now - self._last_progress.get(download.id(), 0.0)) < self.PROGRESS_INTERVAL:
+            return
+        self._last_progress[download.id()] = now
+        self.__event(download, "in_progress")
+
+    def __state_changed(
+        self, download: _DownloadRequest, state: _DownloadRequest.DownloadState
+    ) -> None:
+        if state not in FINAL_STATES:
+            return
+
+        self._running.pop(download.id(), None)
+        if download in self._queued:
+            self._queued.remove(download)
+        self._reserved.discard(download.downloadFileName())
+        self._last_progress.pop(download.id(), None)
+
+        logger.info(f"Download {download.downloadFileName()} {FINAL_STATES[state]}.")
+        self.__event(download, FINAL_STATES[state])
+
+        while self._queued and (len(self._running) < self.max_parallel):
+            waiting = self._queued.pop(0)
+            self._running[waiting.id()] = waiting
+            waiting.resume()
+            self.__event(waiting, "in_progress")
+
+
+__all__ = ["DownloadManager"]
@@ -8,12 +8,15 @@
 
 # -------------------------------------import std library python--------------------------------------
 import threading as _threading
-import random as _random
 import os as _os
 import typing as _typing
 import time as _time
 import contextlib as _contextlib
 import math as _math
+import itertools as _itertools
+import json as _json
+import secrets as _secrets
+import collections as _collections
 
 # import _socket for communication with remote
 import socket as _socket
@@ -28,11 +31,115 @@ from .remote import Remote as _Remote
 from .logger import logger
 
 # import exceptions
-from .exception import RemoteExited, InvalidUrl
+from . import exception as _exception
+from .exception import (
+    RemoteExited,
+    InvalidUrl,
+    CommandTimeout,
+    CommandFailed,
+    DownloadFailed,
+    QueueFull,
+)
 
 # import driver-remote communication class
 from .comms import DriverComs
 
+# import command metrics
+from .metrics import (
+    CommandMetrics as _CommandMetrics,
+    PrometheusExporter as _PrometheusExporter,
+    now as _now,
+)
+
+# import tracer
+from .tracing import Tracer
+
+# import the session blob format.
+from . import session as _session
+
+# import the memory watchdog.
+from . import memory as _memory
+from .memory import MemorySample, MemoryWatchdog as _MemoryWatchdog
+
+# import the command registry.
+from . import commands as _commands
+
+# import the performance timings.
+from .timings import PerformanceTimings
+
+# import the broker's client side, for remotes on other machines.
+from .broker import RemoteLease as _RemoteLease
+
+# import the bounded command queue.
+from .backpressure import CommandQueue as _CommandQueue, QueueStats
+
+# import the query cache.
+from .cache import (
+    QueryCache as _QueryCache,
+    CacheStats,
+    READ_ONLY_COMMANDS as _READ_ONLY_COMMANDS,
+)
+
+
+class _Request(_typing.NamedTuple):
+    """A command waiting in Driver._commands, see seleniumqt.backpressure.CommandQueue."""
+
+    id: int
+    name: str  # command name, its opcode is looked up in COMMAND_TO_ID when it is sent.
+    arg: str
+    deadline: float | None
+    queued_at: float
+    frame: int | None  # handle of the frame the command runs in, None for the page.
+
+
+class Frame(_typing.NamedTuple):
+    """A frame in the page, given by Driver.frames."""
+
+    handle: int  # given to switch_to_frame, valid until the frame is detached.
+    name: str  # the frame's window name.
+    html_name: str  # name attribute of its iframe element.
+    url: str
+    parent: int | None  # handle of the frame it is in, None for the page.
+
+
+class Download(_typing.NamedTuple):
+    """A download of the page, as last reported by remote, see seleniumqt.downloads."""
+
+    id: int
+    url: str
+    path: str  # where the file is, once it is completed.
+    state: str  # queued, in_progress, completed, cancelled or interrupted.
+    received: int  # bytes.
+    total: int  # bytes, -1 if unknown.
+    error: str | None  # why it was interrupted.
+
+
+class DomChanges(_typing.NamedTuple):
+    """The dom changes under a watched element, given by Driver.watch_dom and Driver.dom_changes.
+
+    nodes are given as `[id, "#text" or "#comment", value]`, or as
+    `[id, tag, {attribute: value}, [child, ...]]` for elements. ids are kept
+    until the next resync.
+    """
+
+    cursor: str  # give it as since, for the changes after these.
+    resync: bool  # the changes could not be given, snapshot is the whole element instead.
+    snapshot: list | None  # the element, on a resync, None if there is no such element yet.
+    # {"type": "attributes", "target": id, "name": ..., "value": ... or None}
+    # {"type": "characterData", "target": id, "value": ...}
+    # {"type": "childList", "target": id, "removed": [id, ...], "added": [[index, node], ...]}
+    changes: list[dict]
+
+
+class RestartEvent(_typing.NamedTuple):
+    """Given to restart listeners when a supervised driver restarts remote, or when remote is recycled."""
+
+    count: int  # restarts so far, including this one.
+    reason: str  # why the old remote was lost.
+    exitcode: int | None  # exit code of the old remote process.
+    url: str | None  # url the new remote starts at.
+
+
 # Driver Class.
 class Driver:
     """Driver Class, allows for multithreaded control of remote class.
@@ -45,6 +152,87 @@ class Driver:
     })
     ```
 
+    ## Metrics
+    `driver.stats()` gives per-command latency histograms. with `"metrics_file": path`
+    and/or `"metrics_port": port` in the config they are also exported in the
+    prometheus text format.
+
+    ## Tracing
+    with `"trace_file": path` in the config, driver and remote record every command,
+    javascript call, qt signal and event loop stall, `driver.export_trace()` (also done
+    on close) writes them to one chrome trace file, open it in https://ui.perfetto.dev.
+
+    ## Supervised mode
+    with `"supervised": True` in the config, a remote which crashes or exits is
+    restarted with the same config at the last opened url. the commands that
+    were running fail with RemoteCrashed, which can be retried.
+
+    ## Concurrent commands
+    commands given from several threads are all sent at once, remote runs up to
+    `"max_concurrent_scripts"` (default 8) scripts together, and current_url
+    alongside them, so a slow script does not hold up the quick commands.
+    navigation, clicks and window commands still run one at a time, in order.
+
+    ## Backpressure
+    at most `"max_in_flight"` (default 32) commands are sent to remote and not yet
+    replied to, the others wait in a queue of `"queue_capacity"` (default 1000)
+    commands. once it is full, `"queue_policy"` says what happens to a new command:
+    "block" (default) waits for space until its timeout, "fail" raises QueueFull, and
+    "shed" drops the oldest queued command, which raises QueueFull, for the new one.
+    `driver.queue_stats()` gives the depth of the queue, and how much was refused.
+
+    ## Query cache
+    with `"query_cache": True` in the config, current_url, and the scripts given
+    `execute_script(script, cache=True)`, are answered from a cache after their first
+    run, without a round trip. it is emptied once remote reports a navigation, any
+    other command is given, which could change the page, or remote is restarted.
+    with `"query_cache_dom": True` it is also emptied once the dom changes, see
+    query_cache_stats.
+
+    ## Frames
+    ```python
+    with driver.frame("payment"): # or a Frame from driver.frames().
+        driver.click("#pay") # runs in the frame, not the page.
+    ```
+    the frame is remembered per thread, until switch_to_frame or default_context.
+
+    ## Sessions
+    `driver.export_session()` gives the cookies and storage as a compact blob, a new
+    driver given `"session": blob` in the config starts with them, before its
+    starting_url is opened, ex: to skip logging in again, see export_session.
+
+    ## Memory
+    with `"memory_limit_mb"` and/or `"max_pages"` in the config, the memory of remote and
+    its qtwebengine processes is sampled every `"memory_interval"` (default 5) seconds,
+    see `driver.memory()`. once remote uses more, or has opened that many pages, it is
+    recycled between two commands: a new remote is started at the last opened url
+    with the session of the old one, see recycle.
+
+    ## Downloads
+    downloads the page starts are saved by remote straight to `"download_dir"`, up to
+    `"max_parallel_downloads"` (default 4) at once.
+    ```python
+    driver.click("#export")
+    path = driver.wait_for_download(timeout=math.inf)
+    ```
+    their progress is also given to event listeners, see add_event_listener.
+
+    ## Plugins
+    with `"plugins": [module, ...]` in the config, remote imports those modules, and
+    runs the commands they register next to the page, see seleniumqt.commands and
+    `driver.command(name, arg)`. remote gives the driver every command's opcode when
+    it connects.
+
+    ## Multi-node
+    with `"broker": "host:port"` in the config, remote is started by a seleniumqt-remote
+    worker of that broker, maybe on another machine, instead of in a child process, see
+    seleniumqt.broker.Broker. `"broker_token"` is the broker's shared token, and
+    `"driver_host"` the address of this machine the workers reach, which the driver
+    listens on (default localhost). remote must give the driver a token of its own when
+    it connects, so nothing else on the network can take its place. remote's memory is
+    not sampled, it is on another machine. scripts are sent to remote as their source,
+    files on this machine are read here.
+
     ## how to give command to remote.
 
     ```python
@@ -56,6 +244,34 @@ class Driver:
     # that indicate which command is being given.
     COMMAND_RESERVED_LENGTH = 2
 
+    # seconds a command may take before CommandTimeout is raised, unless
+    # "command_timeout" is given in the config, or timeout is given to the command.
+    DEFAULT_COMMAND_TIMEOUT: float = 60.0
+
+    # supervised mode, how often the remote process is checked, and the least
+    # number of seconds between two restarts.
+    SUPERVISOR_POLL_INTERVAL: float = 0.5
+    RESTART_BACKOFF: float = 1.0
+
+    # commands sent to remote and not replied to, and commands queued, at most, see Backpressure.
+    MAX_IN_FLIGHT: int = 32
+    QUEUE_CAPACITY: int = 1000
+
+    # mutation records the page keeps between two dom_changes, more is a resync.
+    DOM_CHANGES_LIMIT: int = 10_000
+
+    # finished downloads kept, for downloads and wait_for_download, the oldest are dropped.
+    DOWNLOAD_HISTORY: int = 1000
+
+    # seconds remote has to give its hello once it connected.
+    HELLO_TIMEOUT: float = 30.0
+
+    # seconds between memory samples, if a memory limit is given, see recycle.
+    MEMORY_INTERVAL: float = 5.0
+
+    # states of the page open can wait for, see seleniumqt.page.Lifecycle.
+    WAIT_UNTIL = ("commit", "domcontentloaded", "load", "networkidle")
+
     JAVASCRIPT_GET_HTML = '''return document.querySelector("html").outerHTML;'''
 
     # -----------------------------------------utility constants------------------------------------------
@@ -64,45 +280,431 @@ class Driver:
     CSS = "css "
 
     # -----------------------------------------utility functions------------------------------------------
-    @_contextlib.contextmanager
-    def __temp_file(self, file_name=None):
-        if file_name == None:
-            file_name = "".join(
-                _random.sample("qwertyuiopasdfghjklzxcvbnm1234567890", 20)
+    # -------------------------------------------initialization-------------------------------------------
+    def __accept(self) -> tuple[DriverComs, dict] | None:
+        """Wait for remote to connect, and give its hello, connections without remote's token are refused.
+
+        Returns
+        -------
+            tuple[DriverComs, dict] | None: the connection and hello, None if remote exited before connecting.
+
+        """
+        while True:
+            try:
+                conn, peer = self.conn_sock.accept()
+            except _socket.timeout:
+                if not self._remote_proc.is_alive():
+                    return None
+                continue
+
+            # remote first gives the opcodes of its commands, with those of its plugins.
+            _conn = DriverComs(conn)
+            conn.settimeout(self.HELLO_TIMEOUT)
+            try:
+                hello, _ = _conn.recv_message()
+            except (ConnectionError, OSError, ValueError) as e:
+                logger.warning(f"Connection from {peer=} gave no hello, {e!r}")
+                conn.close()
+                continue
+            if (hello.get("status") != "hello") or (
+                hello.get("token") != self._connection_token
+            ):
+                logger.warning(f"Refused connection from {peer=}, it is not remote.")
+                conn.close()
+                continue
+
+            conn.settimeout(None)
+            return _conn, hello
+
+    def __serve(self, _conn: DriverComs, hello: dict) -> str:
+        """Give commands to one remote, until its connection is lost.
+
+        commands are sent without waiting for the replies of earlier ones, remote
+        runs them concurrently where it can, and driver-receiver takes the
+        replies in whatever order they come.
+
+        Args:
+        ----
+            _conn (DriverComs): connection to remote.
+            hello (dict): remote's first message, with the opcodes of its commands.
+
+        Returns:
+        -------
+            str: the reason the connection was lost.
+
+        """
+        with self._lock:
+            self.COMMAND_TO_ID = hello["commands"]
+        logger.debug(f"{self.COMMAND_TO_ID=}")
+
+        # commands sent and not yet replied to, and why the connection was lost.
+        in_flight: dict[int, tuple[_Request, float]] = {}
+        self._in_flight = in_flight
+        lost: list[str] = []
+
+        receiver = _threading.Thread(
+            target=self.__receive, args=(_conn, in_flight, lost), daemon=True
+        )
+        receiver.name = "driver-receiver"
+        receiver.start()
+
+        while True:
+            with self._lock:
+                # while a recycle is pending no command is sent, until in_flight is empty.
+                while not (
+                    lost
+                    or self._restart_needed
+                    or ((self._recycle is not None) and (not in_flight))
+                    or (
+                        self._commands
+                        and (self._recycle is None)
+                        and (len(in_flight) < self._max_in_flight)
+                    )
+                ):
+                    self._lock.wait()
+
+                if lost:
+                    reason = lost[0]
+                    break
+                if self._restart_needed:
+                    reason = f"remote exited, {self._remote_proc.exitcode=}"
+                    break
+                if self._recycle is not None:
+                    # nothing is in flight, so no command is lost with remote.
+                    reason = f"recycled, {self._recycle}"
+                    break
+
+                request = self._commands.get()
+                request_id, command = request.id, request.name
+
+                op = self.COMMAND_TO_ID.get(command)
+                if op is None:
+                    self.metrics.count(command, "error")
+                    self._results[request_id] = (
+                        {"id": request_id, "status": "error", "error": "UnknownCommand"},
+                        f"remote has no {command=}, see seleniumqt.commands.".encode(
+                            "utf-8"
+                        ),
+                    )
+                    self._lock.notify_all()
+                    continue
+
+                # remote is given what is left of the deadline, so it abandons
+                # the command at the same time as the caller.
+                sent_at = _now()
+                in_flight[request_id] = (request, sent_at)
+
+            timeout = (
+                None if request.deadline is None else request.deadline - sent_at
             )
-        path = _os.path.abspath(file_name)
-        open(path, "w").write("")
+            try:
+                _conn.send_message(
+                    {
+                        "id": request_id,
+                        "op": op,
+                        "timeout": timeout,
+                        "frame": request.frame,
+                    },
+                    request.arg,
+                )
+            except (ConnectionError, OSError) as e:
+                reason = str(e)
+                break
+
+        # wake driver-receiver, and wait for it, so no reply is stored after this.
         try:
-            yield path
-        finally:
-            _os.remove(path)
+            _conn.conn.shutdown(_socket.SHUT_RDWR)
+        except OSError:
+            pass
+        receiver.join()
+
+        with self._lock:
+            for request, _ in in_flight.values():
+                if self.__closing and (request.name == "close"):
+                    # remote exits on close without replying, that is its result.
+                    reply = {"id": request.id, "status": "ok"}
+                else:
+                    # fail the commands in flight now, instead of at their deadline.
+                    reply = {
+                        "id": request.id,
+                        "status": "error",
+                        "error": (
+                            "RemoteCrashed"
+                            if self.config.get("supervised")
+                            else "RemoteExited"
+                        ),
+                    }
+                self.metrics.count(request.name, reply["status"])
+                if request.id in self._abandoned:
+                    self._abandoned.discard(request.id)
+                    continue
+                self._results[request.id] = (
+                    reply,
+                    f"remote was lost during {request.name=}: {reason}".encode(
+                        "utf-8"
+                    ),
+                )
+            in_flight.clear()
+
+            # the downloads of the lost remote can't complete.
+            for download in self._downloads.values():
+                self.__finish_download(
+                    download._replace(
+                        state="interrupted", error=f"remote was lost: {reason}"
+                    )
+                )
+            self._downloads.clear()
+            self._lock.notify_all()
+
+        if self._query_cache is not None:
+            self._query_cache.invalidate()  # the next remote's page is another one.
+
+        if self._recycle is not None:
+            logger.info(f"Connection to remote closed, {reason=}")
+        elif not self.__closing:
+            logger.error(f"Connection to remote lost, {reason=}")
+        return reason
+
+    def __receive(
+        self,
+        _conn: DriverComs,
+        in_flight: dict[int, tuple[_Request, float]],
+        lost: list[str],
+    ) -> None:
+        """Store the replies of one remote as they arrive, run in the driver-receiver thread.
+
+        Args:
+        ----
+            _conn (DriverComs): connection to remote.
+            in_flight (dict[int, tuple[_Request, float]]): commands sent by __serve, and when.
+            lost (list[str]): the reason is added to it once the connection is lost.
+
+        """
+        while True:
+            try:
+                reply, payload = _conn.recv_message()
+            except (ConnectionError, OSError, ValueError) as e:
+                with self._lock:
+                    lost.append(str(e) or type(e).__name__)
+                    self._lock.notify_all()
+                return
+
+            if reply.get("status") == "event":
+                self.__event(reply["event"], _json.loads(payload))
+                continue
+
+            received_at = _now()
+            with self._lock:
+                request, sent_at = in_flight.pop(reply["id"], (None, None))
+                # a pending recycle waits for in_flight to empty.
+                self._lock.notify_all()
+            if request is None:
+                logger.warning(f"Dropping reply to a command not in flight {reply=}")
+                continue
+
+            self.__observe(request, sent_at, received_at, reply)
+            self.tracer.complete(
+                f"send {request.name}",
+                sent_at,
+                received_at,
+                args={"id": request.id, "status": reply["status"]},
+            )
+
+            with self._lock:
+                if reply["id"] in self._abandoned:
+                    logger.debug(f"Dropping result of abandoned {reply=}")
+                    self._abandoned.discard(reply["id"])
+                    continue
+                self._results[reply["id"]] = (reply, payload)
+                self._lock.notify_all()
+
+    def __event(self, name: str, data: dict) -> None:
+        """Keep track of an event of remote, and give it to the event listeners, see add_event_listener."""
+        if (name in ("navigation", "dom_mutated")) and (self._query_cache is not None):
+            self._query_cache.invalidate()
+
+        if name == "download":
+            download = Download(**data)
+            with self._lock:
+                if download.state in ("completed", "cancelled", "interrupted"):
+                    self._downloads.pop(download.id, None)
+                    self.__finish_download(download)
+                    self._lock.notify_all()
+                else:
+                    self._downloads[download.id] = download
+
+        for listener in self._event_listeners:
+            try:
+                listener(name, data)
+            except Exception:
+                logger.exception(f"Event listener {listener=} failed.")
+
+    def __observe(
+        self, request: _Request, sent_at: float, received_at: float, reply: dict
+    ) -> None:
+        """Record how long each phase of a command took, from the driver's and remote's timestamps.
+
+        Args:
+        ----
+            request (_Request): the command.
+            sent_at (float): when the driver-server started sending it.
+            received_at (float): when the driver-server had received its reply.
+            reply (dict): reply header, with remote's "timings".
+
+        """
+        name = request.name
+        self.metrics.count(name, reply["status"])
+        self.metrics.observe(name, "queue", sent_at - request.queued_at)
+        self.metrics.observe(name, "total", received_at - request.queued_at)
+
+        timings = reply.get("timings", {})
+        # a command abandoned before it was dispatched has no started/finished.
+        if "received" in timings:
+            self.metrics.observe(name, "request", timings["received"] - sent_at)
+        if "started" in timings:
+            self.metrics.observe(
+                name, "wait", timings["started"] - timings["received"]
+            )
+        if "finished" in timings:
+            self.metrics.observe(
+                name,
+                "execute",
+                timings["finished"] - timings.get("started", timings["received"]),
+            )
+            self.metrics.observe(
+                name, "response", received_at - timings["finished"]
+            )
 
-    # -------------------------------------------initialization-------------------------------------------
     def __conn_server(self) -> None:
-        """Server which gives commands to remote."""
-        self.conn_sock.listen()
-        conn, _ = self.conn_sock.accept()
-
-        _conn: DriverComs | _typing.Any = DriverComs(conn)
-
-        while conn:
-            
-            while self._commands == []:
-                _time.sleep(1)
-            for command in self._commands:
-                _conn.send(command)
-                try:
-                    self._results.update(
-                        {command: _conn.recv().decode("utf-8")}
-                    )
-                except ConnectionResetError as e:
-                    logger.exception(str(e))
-                    logger.error("Closing...")
-                    self.__clossed = True
-                    return  # this will exit the conn server.
-            self._commands = []
+        """Server which gives commands to remote, and restarts it in supervised mode."""
+        # accept wakes up regularly, to notice if remote exits before connecting.
+        self.conn_sock.settimeout(self.SUPERVISOR_POLL_INTERVAL)
+
+        while True:
+            accepted = self.__accept()
+            if accepted is not None:
+                _conn, hello = accepted
+                reason = self.__serve(_conn, hello)
+                _conn.conn.close()
+            else:
+                reason = f"remote exited before connecting, {self._remote_proc.exitcode=}"
+
+            if self.__closing or (
+                (not self.config.get("supervised")) and (self._recycle is None)
+            ):
+                logger.info(f"Closing... {reason=}")
+                break
+
+            try:
+                self.__restart(reason)
+            except Exception:
+                # ex: BrokerError, no worker has a free slot, the driver is closed, not left waiting.
+                logger.exception("Closing, remote could not be restarted.")
+                break
+
+        with self._lock:
+            self.__clossed = True
+            self._commands.close()
+            self._lock.notify_all()
         logger.warning("Closing, _Remote Connection was closed.")
 
+    def __supervisor(self) -> None:
+        """Watch the remote process, and wake the conn server to restart it once it exits."""
+        while not self.__clossed:
+            _time.sleep(self.SUPERVISOR_POLL_INTERVAL)
+            proc = self._remote_proc
+            if (not self.__closing) and (not proc.is_alive()):
+                with self._lock:
+                    if proc is not self._remote_proc:
+                        continue  # it was already restarted.
+                    if not self._restart_needed:
+                        logger.error(
+                            f"{self._remote_proc.name=} exited with {self._remote_proc.exitcode=}"
+                        )
+                    self._restart_needed = True
+                    self._lock.notify_all()
+
+    def __remote_config(self) -> dict:
+        """Give the config of a new remote, it starts at the last opened url if there is one."""
+        config = {
+            "connection_host": self.conn_sock.getsockname()[0],
+            "connection_port": self.conn_sock.getsockname()[1],
+            # the broker's address and token are the driver's, remote has no use for them.
+            **{
+                key: value
+                for key, value in self.config.items()
+                if key not in ("broker", "broker_token")
+            },
+            # a new token for every remote, the one it connects with must give it.
+            "connection_token": _secrets.token_hex(16),
+        }
+        if self._last_url is not None:
+            config["starting_url"] = self._last_url
+        if self._recycle_session is not None:
+            # a recycled remote's session is given to the new one.
+            config["session"] = self._recycle_session
+        if self.config.get("query_cache_dom"):
+            config["dom_events"] = True
+        return config
+
+    def __start_remote(self, config: dict) -> _typing.Any:
+        """Start remote with config, give its process, or its RemoteLease with a broker.
+
+        a lease can wait for a worker for up to the broker's LEASE_TIMEOUT, so the lock
+        must not be held while it is started.
+        """
+        if self.config.get("broker"):
+            return _RemoteLease(
+                self.config["broker"], self.config.get("broker_token"), config
+            )
+        return _Remote.start_process(config)
+
+    def __restart(self, reason: str) -> None:
+        """Replace a lost remote with a new one, and tell the restart listeners.
+
+        Args:
+        ----
+            reason (str): why the remote was lost.
+
+        """
+        # a remote which crashes on start must not be restarted in a tight loop.
+        _time.sleep(
+            max(
+                0,
+                self.RESTART_BACKOFF - (_time.monotonic() - self._last_restart),
+            )
+        )
+        self._last_restart = _time.monotonic()
+
+        if self._remote_proc.is_alive():
+            self._remote_proc.kill()
+        self._remote_proc.join(self.SUPERVISOR_POLL_INTERVAL)
+
+        event = RestartEvent(
+            self.restarts + 1, reason, self._remote_proc.exitcode, self._last_url
+        )
+        logger.warning(f"Restarting remote, {event=}")
+
+        with self._lock:
+            config = self.__remote_config()
+        proc = self.__start_remote(config)
+
+        with self._lock:
+            self._remote_proc = proc
+            self._connection_token = config["connection_token"]
+            self.restarts += 1
+            self._restart_needed = False
+            self.pages = 0
+            self._recycle = None
+            self._recycle_session = None
+            self._lock.notify_all()
+
+        for listener in self._restart_listeners:
+            try:
+                listener(event)
+            except Exception:
+                logger.exception(f"Restart listener {listener=} failed.")
+
     def __format_command(self, command: int | str) -> str:
         """Format command_id to a standardized format.
 
@@ -134,31 +736,89 @@ class Driver:
         """
         self.daemon = True
         self.config = config
-        self._commands: list = []
-        self._results: dict[str, _typing.Any] = {}
+
+        # the frame commands of each thread run in, see switch_to_frame.
+        self.__context = _threading.local()
+        self._lock = _threading.Condition()
+        self._request_ids = _itertools.count(1)
+
+        # commands not yet sent, results not yet taken, and requests whose callers gave up.
+        self._commands = _CommandQueue(
+            self._lock,
+            self.config.get("queue_capacity") or self.QUEUE_CAPACITY,
+            self.config.get("queue_policy") or "block",
+        )
+        self._max_in_flight: int = self.config.get("max_in_flight") or self.MAX_IN_FLIGHT
+        self._in_flight: dict[int, tuple[_Request, float]] = {}
+        self._results: dict[int, tuple[dict, bytes]] = {}
+        self._abandoned: set[int] = set()
+
+        # results of idempotent queries, until the page changes, see Query cache.
+        self._query_cache: _QueryCache | None = (
+            _QueryCache(self.config.get("query_cache_size") or _QueryCache.MAX_ENTRIES)
+            if self.config.get("query_cache")
+            else None
+        )
+
+        # per-command latency metrics, exported if "metrics_file" or "metrics_port" is in the config.
+        self.metrics = _CommandMetrics()
+        self._metrics_exporter: _PrometheusExporter | None = None
+        if ("metrics_file" in self.config) or ("metrics_port" in self.config):
+            self._metrics_exporter = _PrometheusExporter(
+                self.metrics,
+                file_path=self.config.get("metrics_file"),
+                port=self.config.get("metrics_port"),
+            )
+
+        # chrome trace of driver, and remote, only recorded if "trace_file" is in the config.
+        self.tracer = Tracer(bool(self.config.get("trace_file")), "driver")
+
         self.__hidden = False
         self.__clossed = False
+        self.__closing = False
+
+        # supervised mode state.
+        self.restarts = 0
+        self._restart_needed = False
+        self._restart_listeners: list[_typing.Callable[[RestartEvent], _typing.Any]] = []
+
+        # events of remote, and the downloads they report, see wait_for_download.
+        self._event_listeners: list[_typing.Callable[[str, dict], _typing.Any]] = []
+        self._downloads: dict[int, Download] = {}  # not yet done, by id.
+        # the last DOWNLOAD_HISTORY done, in the order they were done.
+        self._finished_downloads: _collections.deque[Download] = _collections.deque(
+            maxlen=self.DOWNLOAD_HISTORY
+        )
+        self._downloads_done = 0  # finished downloads, the dropped ones as well.
+        self._downloads_taken = 0  # finished downloads given by wait_for_download.
+
+        # (type, selector) of the element watched by watch_dom.
+        self._dom_watch: tuple[str, str] | None = None
+        self._last_url: str | None = None
+        self._last_restart = 0.0
+
+        # recycling remote, see recycle.
+        self.pages = 0  # pages opened by the current remote.
+        self._recycle: str | None = None  # the reason, while a recycle is pending.
+        self._recycle_session: bytes | None = None
+        self._memory_watchdog: _MemoryWatchdog | None = None
+
         self.conn_sock: _socket.socket = _socket.socket(
             _socket.AF_INET, _socket.SOCK_STREAM
         )
-        self.conn_sock.bind(("localhost", 0))
-
-        self.COMMAND_TO_ID = {
-            "js": self.__format_command(0),
-            "url": self.__format_command(1),
-            "click": self.__format_command(2),
-            "hide": self.__format_command(3),
-            "show": self.__format_command(4),
-            "page": self.__format_command(5),
-            "close": self.__format_command(6),
-            "current_url": self.__format_command(7)
-        }
+        self.conn_sock.bind((self.config.get("driver_host") or "localhost", 0))
+        # listen before remote is started, so it can't try to connect too early.
+        self.conn_sock.listen()
 
-        logger.debug(f"{self.COMMAND_TO_ID=}")
+        # the builtin commands, remote gives the opcodes of every command when it connects.
+        self.COMMAND_TO_ID: dict[str, str] = {
+            name: self.__format_command(opcode)
+            for opcode, name in enumerate(_commands.BUILTIN_COMMANDS)
+        }
 
-        self._remote_proc = _Remote.start_process(
-            {"connection_port": self.conn_sock.getsockname()[1], **self.config}
-        )
+        config = self.__remote_config()
+        self._remote_proc = self.__start_remote(config)
+        self._connection_token: str = config["connection_token"]
 
         self.__driver_server_thread = _threading.Thread(
             target=self.__conn_server, daemon=True
@@ -166,45 +826,202 @@ class Driver:
         self.__driver_server_thread.name = "driver-server"
         self.__driver_server_thread.start()
 
+        if self.config.get("supervised"):
+            self.__supervisor_thread = _threading.Thread(
+                target=self.__supervisor, daemon=True
+            )
+            self.__supervisor_thread.name = "driver-supervisor"
+            self.__supervisor_thread.start()
+
+        if ("memory_limit_mb" in self.config) or ("memory_interval" in self.config):
+            if _memory.available():
+                self._memory_watchdog = _MemoryWatchdog(
+                    self.__memory_target,
+                    self.config.get("memory_interval", self.MEMORY_INTERVAL),
+                    self.__check_limits,
+                )
+            else:
+                logger.warning("Memory can't be sampled, it is read from /proc.")
+
     # ==============================================commands==============================================
     # first the basic commands.
 
+    def __deadline(self, timeout: float | None) -> float | None:
+        """Convert a command timeout to a time.monotonic deadline, None if there is none.
+
+        Args:
+        ----
+            timeout (float | None): seconds, None for the default timeout, math.inf for no timeout.
+
+        """
+        if timeout is None:
+            timeout = self.config.get(
+                "command_timeout", self.DEFAULT_COMMAND_TIMEOUT
+            )
+        if (timeout is None) or (timeout == _math.inf):
+            return None
+        return _time.monotonic() + timeout
+
     @logger.catch(reraise=True)
-    def execute(self, command: str, arg: str = "") -> str | None:
+    def execute(
+        self, command: str, arg: str = "", timeout: float | None = None
+    ) -> str | None:
         """Execute a command directly to remote.
 
         Args:
         ----
             command (str): Command name, ex: js, all names are given in self.COMMAND_TO_ID
             arg (str): string argument to give to remote
+            timeout (float | None, optional): seconds to wait for the result, None for the default
+            given by config["command_timeout"], math.inf to wait forever. Defaults to None.
+
+        Raises:
+        ------
+            CommandTimeout: the command did not complete in time, remote abandons it as well.
+            RemoteExited: remote exited before the command completed.
+            UnknownCommand: remote has no command of that name.
 
         Returns:
         -------
-            str | None: _description_
+            str | None: the result given by remote.
 
         """
-        if not self._remote_proc.is_alive():
+        if self.__clossed or (
+            (not self.config.get("supervised"))
+            and (self._recycle is None)
+            and (not self._remote_proc.is_alive())
+        ):
             raise RemoteExited(f"{self._remote_proc.pid=} has exited.")
 
-        command = self.COMMAND_TO_ID[command] + arg
-        self._commands.append(command)
-        while command not in self._results:
-            if (self.__clossed):
-                e = RemoteExited()
-                logger.exception(e)
-                raise e
-            _time.sleep(1)
-        result = self._results[command]
+        deadline = self.__deadline(timeout)
+        request_id = next(self._request_ids)
+        queued_at = _now()
 
-        del self._results[command]
+        # a command which may change the page empties the cache, before and after it runs.
+        changes_page = (
+            (self._query_cache is not None)
+            and (command not in _READ_ONLY_COMMANDS)
+            and (not getattr(self.__context, "query", False))
+        )
+        if changes_page:
+            self._query_cache.invalidate()
+        try:
+            with self.tracer.span(f"execute {command}", args={"id": request_id}):
+                return self.__wait_result(
+                    _Request(
+                        request_id,
+                        command,
+                        arg,
+                        deadline,
+                        queued_at,
+                        getattr(self.__context, "frame", None),
+                    ),
+                    timeout,
+                )
+        finally:
+            if changes_page:
+                self._query_cache.invalidate()
+
+    def __query(
+        self, command: str, arg: str, run: _typing.Callable[[], str | None]
+    ) -> str | None:
+        """Give the cached result of an idempotent query, or run it and cache its result, see Query cache."""
+        cache = self._query_cache
+        if cache is None:
+            return run()
+
+        key = (command, arg, getattr(self.__context, "frame", None))
+        found, result, generation = cache.get(key)
+        if found:
+            return result
+
+        self.__context.query = True
+        try:
+            result = run()
+        finally:
+            self.__context.query = False
+        cache.put(key, result, generation)
+        return result
 
-        if isinstance(result, bytes):
-            result = result.decode('utf-8')
+    def __wait_result(self, request: _Request, timeout: float | None) -> str | None:
+        """Queue a request for the driver-server thread, and wait for its result, see execute."""
+        request_id, command, deadline = request.id, request.name, request.deadline
+
+        with self._lock:
+            try:
+                shed = self._commands.put(request, deadline)
+            except (QueueFull, CommandTimeout):
+                self.metrics.count(command, "rejected")
+                raise
+            if shed is not None:
+                # its caller is woken with the error, see Backpressure.
+                self.metrics.count(shed.name, "shed")
+                self._results[shed.id] = (
+                    {"id": shed.id, "status": "error", "error": "QueueFull"},
+                    f"{shed.name=} was shed for a newer command, the queue was full.".encode(
+                        "utf-8"
+                    ),
+                )
+            self._lock.notify_all()
+
+            try:
+                while request_id not in self._results:
+                    if self.__clossed:
+                        e = RemoteExited()
+                        logger.exception(e)
+                        raise e
+
+                    remaining = (
+                        None if deadline is None else deadline - _time.monotonic()
+                    )
+                    if (remaining is not None) and (remaining <= 0):
+                        raise CommandTimeout(
+                            f"{command=} did not complete within {timeout=}."
+                        )
+                    self._lock.wait(remaining)
+
+                reply, result = self._results.pop(request_id)
+            except BaseException:
+                # the caller is gone, ex: timed out or interrupted, a queued command
+                # is not sent at all, the result of one in flight is dropped when it arrives.
+                if self._commands.remove(request):
+                    self.metrics.count(command, "abandoned")
+                elif self._results.pop(request_id, None) is None:
+                    self._abandoned.add(request_id)
+                raise
+
+        match reply["status"]:
+            case "ok":
+                return result.decode("utf-8")
+            case "timeout":
+                raise CommandTimeout(result.decode("utf-8"))
+            case _:
+                # raise the same exception as remote did, if it is one of ours.
+                exception_type = getattr(_exception, reply.get("error", ""), None)
+                if not (
+                    isinstance(exception_type, type)
+                    and issubclass(exception_type, Exception)
+                ):
+                    exception_type = CommandFailed
+                raise exception_type(result.decode("utf-8"))
+
+    def queue_stats(self) -> QueueStats:
+        """Give the depth of the command queue, the commands in flight, and how many were refused or shed.
 
-        return result
+        # Usage
+            ```python
+            >>> driver = Driver({"starting_url": ..., "queue_capacity": 100, "queue_policy": "fail"})
+            >>> driver.queue_stats()
+            QueueStats(depth=0, in_flight=1, capacity=100, high_water=12, waiting=0, rejected=3, shed=0)
+            ```
+        """
+        with self._lock:
+            return self._commands.stats(len(self._in_flight))
 
     @logger.catch(reraise=True)
-    def execute_script_file(self, script_file_name) -> str | None:
+    def execute_script_file(
+        self, script_file_name, timeout: float | None = None
+    ) -> str | None:
         """Execute the javascript in the given script file.
 
         # Usage
@@ -229,6 +1046,7 @@ class Driver:
 
         # Args:
             script_file_name (str): the path of the script file name.
+            timeout (float | None, optional): seconds to wait, see execute. Defaults to None.
 
         # Raises:
             FileNotFoundError: Raised if the file is not found.
@@ -238,10 +1056,14 @@ class Driver:
         """
         if not _os.path.exists(script_file_name):
             raise FileNotFoundError(f"file: {script_file_name=}")
-        return self.execute("js", (script_file_name))
+        # the file is read here, remote may run on another machine, see the Multi-node section of the class.
+        with open(script_file_name, "r") as script_file:
+            return self.execute_script(script_file.read(), timeout=timeout)
 
     @logger.catch(reraise=True)
-    def execute_script(self, script: str) -> str | None:
+    def execute_script(
+        self, script: str, timeout: float | None = None, cache: bool = False
+    ) -> str | None:
         """Execute given Script, and return the returned value from the script, converted to python.
 
         # Usage
@@ -262,30 +1084,55 @@ class Driver:
 
         # Args:
             script (str): The Javascript to execute.
+            timeout (float | None, optional): seconds to wait, see execute. Defaults to None.
+            cache (bool, optional): the script only reads the page, its result can be cached, see the
+            Query cache section of the class. Defaults to False.
 
         # Returns:
             str | None: The return value of the script.
 
         """
-        with self.__temp_file() as tempfile_path:
-            open(tempfile_path, "w").write(script)
-            return self.execute_script_file(tempfile_path)
+
+        def run() -> str | None:
+            return self.execute("js", script, timeout=timeout)
+
+        if cache:
+            return self.__query("js", script, run)
+        return run()
 
     @logger.catch(reraise=True)
-    def open(self, url: str) -> None:
-        """Open the url given in the current tab. returns None. uses setURL.
+    def open(
+        self,
+        url: str,
+        wait_until: _typing.Literal[
+            "commit", "domcontentloaded", "load", "networkidle"
+        ] = "load",
+        timeout: float | None = None,
+    ) -> None:
+        """Open the url given in the current tab, and wait until the page has reached wait_until. returns None. uses setURL.
 
         # Usage
             ```python
-            >>> driver.open("https://www.google.com/") # this will open the url.
+            >>> driver.open("https://www.google.com/") # this will open the url, and return once it has loaded.
+            >>> driver.open("https://www.google.com/", wait_until="domcontentloaded") # return once the html is parsed.
             >>> driver.open('my purse') # this will throw a InvalidUrl Exception.
             ```
 
+        # wait_until
+            - commit: the new page has replaced the old one.
+            - domcontentloaded: the html is parsed, DOMContentLoaded has fired.
+            - load: the page and every subresource has loaded.
+            - networkidle: load, and then no request for 500 milliseconds.
+
         # Raises:
             InvalidUrl: raised when the url is detected to be invalid.
+            NavigationFailed: the page failed to load, ex: the host could not be reached.
+            CommandTimeout: wait_until was not reached within timeout.
 
         # Args:
             url (str): open the url in the current tab.
+            wait_until (str, optional): the state of the page to wait for. Defaults to "load".
+            timeout (float | None, optional): seconds to wait, see execute. Defaults to None.
         """
         # regex(s) taken from github.com/seleniumbase/seleniumbase > fixtures.page_utils.is_valid_url
         url_regex = _re.compile(
@@ -304,7 +1151,18 @@ class Driver:
 
         if not url_regex.match(url):
             raise InvalidUrl(f"argument {url=} is not a valid url.")
-        self.execute("url", url)
+        if wait_until not in self.WAIT_UNTIL:
+            raise ValueError(f"{wait_until=} is not one of {self.WAIT_UNTIL}")
+        self.execute(
+            "url",
+            _json.dumps({"url": url, "wait_until": wait_until}),
+            timeout=timeout,
+        )
+
+        # a restarted remote starts here.
+        self._last_url = url
+        self.pages += 1
+        self.__check_limits()
 
     @logger.catch(reraise=True)
     def click(
@@ -312,12 +1170,17 @@ class Driver:
         selector: str,
         _type: _typing.Literal["css "] | _typing.Literal["xpath"] = "css ",
         /,
+        scroll_into_view: bool = True,
+        timeout: float | None = None,
     ) -> None:
-        """Click an element on screen, this uses the QEvent.Type.MouseButtonPressed, not javascript. so this click event is indistiguishable from a real click.
+        """Click an element on screen, this sends QMouseEvents to the page's render widgit, not javascript. so this click event is indistiguishable from a real click.
+
+        The element's center is found and clicked in a single command, this returns once the events are delivered.
 
         # Usage
             ```python
             >>> driver.click("input.pfp") # this will click the input html element with the class `pfp`.
+            >>> driver.click("//button", Driver.XPATH, scroll_into_view=False) # click without scrolling.
             ```
 
         # Raises:
@@ -327,11 +1190,86 @@ class Driver:
         # Args:
             selector (str): the selector for the element that is to be clicked.
             _type (_typing.Literal['css'] | _typing.Literal['xpath'], optional): in what format is the selector given, css, xpath, etc. Defaults to 'css '.
+            scroll_into_view (bool, optional): scroll the element to the center of the viewport before clicking. Defaults to True.
+            timeout (float | None, optional): seconds to wait, see execute. Defaults to None.
+        """
+        self.execute(
+            "click",
+            _type + ("1" if scroll_into_view else "0") + selector,
+            timeout=timeout,
+        )
+
+    @logger.catch(reraise=True)
+    def frames(self, timeout: float | None = None) -> list[Frame]:
+        """Give every frame in the page, nested frames included, parents before their children.
+
+        a frame keeps its handle until it is detached, ex: when the page navigates, so
+        the handles can be kept, and given to switch_to_frame, without finding them again.
+        needs QWebEngineFrame, of qt 6.8 or later.
+
+        # Usage
+            ```python
+            >>> [(frame.handle, frame.html_name, frame.url) for frame in driver.frames()]
+            [(1, 'payment', 'https://pay.example.com/form'), (2, '', 'https://ads.example.com/')]
+            ```
+
+        # Args:
+            timeout (float | None, optional): seconds to wait, see execute. Defaults to None.
+        """
+        return [
+            Frame(**frame)
+            for frame in _json.loads(self.execute("frames", timeout=timeout))
+        ]
+
+    @logger.catch(reraise=True)
+    def switch_to_frame(self, frame: Frame | int | str | None) -> None:
+        """Run execute_script, click and the other page commands of this thread in a frame.
+
+        # Raises:
+            FrameDetached: the frame is no longer in the page, when the next command is run.
+            ValueError: no frame has that name.
+
+        # Args:
+            frame (Frame | int | str | None): a Frame, its handle, the name or name attribute of a frame, or None for the page.
+        """
+        if isinstance(frame, str):
+            found = [
+                known.handle
+                for known in self.frames()
+                if frame in (known.name, known.html_name)
+            ]
+            if not found:
+                raise ValueError(f"There is no frame named {frame=}")
+            frame = found[0]
+        elif isinstance(frame, Frame):
+            frame = frame.handle
+        self.__context.frame = frame
+
+    def default_context(self) -> None:
+        """Run the commands of this thread in the page again, instead of a frame."""
+        self.switch_to_frame(None)
+
+    @_contextlib.contextmanager
+    def frame(
+        self, frame: Frame | int | str | None
+    ) -> _typing.Iterator[None]:
+        """Run the commands of this thread in a frame, until the block exits, see switch_to_frame.
+
+        # Usage
+            ```python
+            >>> with driver.frame("payment"):
+            ...     driver.execute_script("return document.title;")
+            ```
         """
-        self.execute("click", _type + selector)
+        previous = getattr(self.__context, "frame", None)
+        self.switch_to_frame(frame)
+        try:
+            yield
+        finally:
+            self.__context.frame = previous
 
     @logger.catch(reraise=True)
-    def hide_window(self) -> None:
+    def hide_window(self, timeout: float | None = None) -> None:
         """Hide the browser window.
 
         # Usage
@@ -344,10 +1282,10 @@ class Driver:
             ```
         """
         self.__hidden = True
-        self.execute("hide")
+        self.execute("hide", timeout=timeout)
 
     @logger.catch(reraise=True)
-    def show_window(self) -> None:
+    def show_window(self, timeout: float | None = None) -> None:
         """Show the browser window if it is hidden.
 
         # Usage
@@ -360,32 +1298,514 @@ class Driver:
             ```
         """
         if self.__hidden:
-            self.execute("show")
+            self.execute("show", timeout=timeout)
         else:
             logger.warning(
                 "Ignoring show_window command, window is not hidden."
             )
 
     @logger.catch(reraise=True)
-    def set_page(self, custom_page_file: str) -> None:
-        self.execute("page", custom_page_file)
+    def add_init_script(
+        self,
+        source: str,
+        name: str | None = None,
+        world: _typing.Literal["main", "isolated"] = "main",
+        subframes: bool = False,
+        timeout: float | None = None,
+    ) -> None:
+        """Run a script in every new document, before the page's own scripts.
+
+        it runs from the next document on, not in the current one. the script is
+        kept in the config, so a supervised driver gives it to a restarted remote.
+
+        # Usage
+            ```python
+            >>> driver.add_init_script("Object.defineProperty(navigator, 'webdriver', {get: () => false});")
+            >>> driver.open("https://example.com") # runs before the page's own scripts.
+            ```
+
+        # Args:
+            source (str): the javascript.
+            name (str | None, optional): name of the script. Defaults to a generated one.
+            world (Literal["main", "isolated"], optional): "main" shares the page's globals, "isolated" hides it from the page. Defaults to "main".
+            subframes (bool, optional): also run it in every frame. Defaults to False.
+            timeout (float | None, optional): seconds to wait, see execute. Defaults to None.
+        """
+        init_scripts = self.config.setdefault("init_scripts", [])
+        init_script = {
+            "name": name or f"init-script-{len(init_scripts)}",
+            "source": source,
+            "world": world,
+            "subframes": subframes,
+        }
+        self.execute("init_script", _json.dumps(init_script), timeout=timeout)
+        init_scripts.append(init_script)
+
+    @logger.catch(reraise=True)
+    def export_session(
+        self,
+        origins: _typing.Iterable[str] | None = None,
+        timeout: float | None = None,
+    ) -> bytes:
+        """Give every cookie, and the localStorage and sessionStorage of the current origin, as a blob.
+
+        # Usage
+            ```python
+            >>> driver.open("https://example.com/login")
+            >>> ... # log in.
+            >>> blob = driver.export_session(["https://accounts.example.com"])
+            >>> # a new driver starts logged in, without opening the login page.
+            >>> other = Driver({"starting_url": "https://example.com", "session": blob})
+            >>> # or, on a driver which is already running.
+            >>> other.import_session(blob)
+            ```
+
+        # Args:
+            origins (Iterable[str] | None, optional): more origins to export the localStorage of, ex: https://example.com. Defaults to None.
+            timeout (float | None, optional): seconds to wait, see execute. Defaults to None.
+
+        # Returns:
+            bytes: the session, zlib compressed json, see seleniumqt.session.SessionStore.
+        """
+        session = self.execute(
+            "export_session", _json.dumps(list(origins or [])), timeout=timeout
+        )
+        return _session.dumps(_json.loads(session))
 
     @logger.catch(reraise=True)
-    def quit(self) -> None:
-        self.execute("close")
+    def import_session(self, blob: bytes, timeout: float | None = None) -> None:
+        """Restore a session given by export_session, its cookies and localStorage are set when this returns.
+
+        sessionStorage belongs to the page, it is set when the page next opens its origin.
+
+        # Raises:
+            InvalidSession: the blob is not a session.
+
+        # Args:
+            blob (bytes): the blob given by export_session.
+            timeout (float | None, optional): seconds to wait, see execute. Defaults to None.
+        """
+        self.execute(
+            "import_session", _json.dumps(_session.loads(blob)), timeout=timeout
+        )
 
     @logger.catch(reraise=True)
-    def close(self) -> None:
-        self.execute("close")
+    def clear_cookies(self, timeout: float | None = None) -> None:
+        """Delete every cookie of remote's profile, of every origin.
+
+        # Args:
+            timeout (float | None, optional): seconds to wait, see execute. Defaults to None.
+        """
+        self.execute("clear_cookies", timeout=timeout)
 
     @logger.catch(reraise=True)
-    def current_url(self) -> str:
-        return self.execute("current_url")
+    def command(
+        self, name: str, arg: _typing.Any = "", timeout: float | None = None
+    ) -> str | None:
+        """Run a command added by one of the "plugins" in the config, see seleniumqt.commands.
+
+        # Usage
+            ```python
+            >>> driver = Driver({"starting_url": ..., "plugins": ["my_plugin"]})
+            >>> driver.command("scroll_and_count", 500)
+            '{"count": 42}'
+            ```
+
+        # Raises:
+            UnknownCommand: remote has no command of that name.
+
+        # Args:
+            name (str): name the command was registered with.
+            arg (Any, optional): given to the handler, anything other than a str is sent as json. Defaults to "".
+            timeout (float | None, optional): seconds to wait, see execute. Defaults to None.
+
+        # Returns:
+            str | None: what the handler resolved the command with, anything other than a str is json.
+        """
+        if not isinstance(arg, str):
+            arg = _json.dumps(arg)
+        return self.execute(name, arg, timeout=timeout)
+
+    @logger.catch(reraise=True)
+    def watch_dom(
+        self,
+        root_selector: str = "html",
+        _type: _typing.Literal["css "] | _typing.Literal["xpath"] = "css ",
+        /,
+        timeout: float | None = None,
+    ) -> DomChanges:
+        """Watch the dom under an element, and give a snapshot of it, dom_changes then gives only what changed.
+
+        a MutationObserver in the page keeps the changes until they are read, so reading
+        costs as much as what changed, not as much as the page. a new document, ex: after
+        open, or more than DOM_CHANGES_LIMIT changes between two reads, is a resync.
+
+        # Usage
+            ```python
+            >>> state = driver.watch_dom("#dashboard")
+            >>> mirror = state.snapshot
+            >>> while True:
+            ...     state = driver.dom_changes(state.cursor)
+            ...     if state.resync:
+            ...         mirror = state.snapshot
+            ...     else:
+            ...         apply(mirror, state.changes) # every removal first, then every insertion, in order.
+            ```
+
+        # Args:
+            root_selector (str, optional): the element to watch. Defaults to "html".
+            _type (Literal['css ', 'xpath'], optional): in what format the selector is given, see click. Defaults to 'css '.
+            timeout (float | None, optional): seconds to wait, see execute. Defaults to None.
+
+        # Returns:
+            DomChanges: a resync, with the snapshot of the element.
+        """
+        self._dom_watch = (_type.strip(), root_selector)
+        return self.dom_changes(resync=True, timeout=timeout)
+
+    @logger.catch(reraise=True)
+    def dom_changes(
+        self,
+        since: str | None = None,
+        resync: bool = False,
+        timeout: float | None = None,
+    ) -> DomChanges:
+        """Give the changes under the element of watch_dom since a cursor, coalesced, see DomChanges.
+
+        # Args:
+            since (str | None, optional): cursor of the last result, None for a resync. Defaults to None.
+            resync (bool, optional): give a snapshot of the element instead of the changes. Defaults to False.
+            timeout (float | None, optional): seconds to wait, see execute. Defaults to None.
+        """
+        if self._dom_watch is None:
+            raise ValueError("No element is watched, call watch_dom first.")
+        _type, selector = self._dom_watch
+
+        query = {
+            "type": _type,
+            "selector": selector,
+            "since": since,
+            "resync": resync,
+            "limit": self.DOM_CHANGES_LIMIT,
+        }
+        return DomChanges(
+            **_json.loads(
+                self.execute("dom_changes", _json.dumps(query), timeout=timeout)
+            )
+        )
+
+    @logger.catch(reraise=True)
+    def performance_timings(
+        self,
+        since: int = 0,
+        types: _typing.Iterable[str] | None = None,
+        timeout: float | None = None,
+    ) -> PerformanceTimings:
+        """Give the performance entries remote has collected from its pages, after since.
+
+        navigation, resource, paint, longtask and largest-contentful-paint entries are
+        sent to remote as the browser records them, and remote adds a qt-load entry for
+        each loadStarted to loadFinished, so this does not run anything in the page.
+        remote keeps the last "timings_buffer" (default 1000) entries.
+
+        # Usage
+            ```python
+            >>> timings = driver.performance_timings()
+            >>> [entry["duration"] for entry in timings.entries if entry["entryType"] == "navigation"]
+            [412.3]
+            >>> # later, only the entries recorded since.
+            >>> timings = driver.performance_timings(since=timings.cursor, types=["resource"])
+            ```
+
+        # Args:
+            since (int, optional): cursor of an earlier result, 0 for every entry kept. Defaults to 0.
+            types (Iterable[str] | None, optional): entry types to give, see seleniumqt.timings.ENTRY_TYPES. Defaults to None, every type.
+            timeout (float | None, optional): seconds to wait, see execute. Defaults to None.
+
+        # Returns:
+            PerformanceTimings: (cursor, dropped, entries), see seleniumqt.timings.TimingBuffer.
+        """
+        query = {"since": since, "types": None if types is None else list(types)}
+        return PerformanceTimings(
+            **_json.loads(self.execute("timings", _json.dumps(query), timeout=timeout))
+        )
 
     @logger.catch(reraise=True)
-    def page_html(self):
+    def set_page(
+        self, custom_page_file: str, timeout: float | None = None
+    ) -> None:
+        self.execute("page", custom_page_file, timeout=timeout)
+
+    @logger.catch(reraise=True)
+    def quit(self, timeout: float | None = None) -> None:
+        self.close(timeout=timeout)
+
+    @logger.catch(reraise=True)
+    def export_trace(
+        self, path: str | None = None, timeout: float | None = None
+    ) -> str:
+        """Write the trace of driver and remote to one chrome trace file.
+
+        # Usage
+            ```python
+            >>> driver = Driver({"starting_url": ..., "trace_file": "trace.json"})
+            >>> driver.open(...)
+            >>> driver.export_trace()
+            'trace.json'
+            ```
+
+        # Args:
+            path (str | None, optional): the file, None for config["trace_file"]. Defaults to None.
+            timeout (float | None, optional): seconds to wait for remote's events. Defaults to None.
+
+        # Returns:
+            str: the file written.
+        """
+        path = path or self.config.get("trace_file")
+        if not path:
+            raise ValueError("No path given, and no trace_file in config.")
+
+        remote_events = _json.loads(self.execute("trace", timeout=timeout))
+        self.tracer.dump(path, remote_events)
+        return path
+
+    @logger.catch(reraise=True)
+    def close(self, timeout: float | None = None) -> None:
+        """Close remote, remote exits without replying, so its exit is the result."""
+        if self.tracer.enabled and (not self.__clossed):
+            try:
+                self.export_trace(timeout=timeout)
+            except Exception:
+                logger.exception("Could not export trace on close.")
+
+        self.__closing = True
+        if self._memory_watchdog is not None:
+            self._memory_watchdog.close()
+        try:
+            self.execute("close", timeout=timeout)
+        except RemoteExited:
+            pass
+        finally:
+            if self._metrics_exporter is not None:
+                self._metrics_exporter.close()
+
+    @logger.catch(reraise=True)
+    def current_url(self, timeout: float | None = None) -> str:
+        return self.__query(
+            "current_url", "", lambda: self.execute("current_url", timeout=timeout)
+        )
+
+    def query_cache_stats(self) -> CacheStats | None:
+        """Give the hits, misses and invalidations of the query cache, None without "query_cache" in the config.
+
+        # Usage
+            ```python
+            >>> driver = Driver({"starting_url": ..., "query_cache": True})
+            >>> for _ in range(10):
+            ...     driver.execute_script("return document.title;", cache=True)
+            >>> driver.query_cache_stats()
+            CacheStats(hits=9, misses=1, invalidations=2, entries=1)
+            ```
+        """
+        if self._query_cache is None:
+            return None
+        return self._query_cache.stats()
+
+    def invalidate_query_cache(self) -> None:
+        """Empty the query cache, ex: after the page was changed in a way remote does not report."""
+        if self._query_cache is not None:
+            self._query_cache.invalidate()
+
+    @logger.catch(reraise=True)
+    def page_html(self, timeout: float | None = None):
         """get page html."""
-        return self.execute_script(self.JAVASCRIPT_GET_HTML)
+        return self.execute_script(self.JAVASCRIPT_GET_HTML, timeout=timeout)
+
+    def stats(self) -> dict[str, dict]:
+        """Give latency histograms of every phase, and result counts, of every command type so far.
+
+        # Usage
+            ```python
+            >>> driver.stats()["js"]["phases"]["execute"]["p90"]
+            0.0123
+            >>> driver.stats()["js"]["results"]
+            {'ok': 41, 'timeout': 1}
+            ```
+
+        # Phases
+            queue, request, wait, execute, response and total, see seleniumqt.metrics.CommandMetrics.
+            remote's timestamps are compared to the driver's, which only holds on the same machine.
+
+        # Returns:
+            dict[str, dict]: {command: {"phases": {phase: histogram}, "results": {status: count}}}
+        """
+        return self.metrics.stats()
+
+    # ----------------------------------------------memory----------------------------------------------
+    def __memory_target(self) -> tuple[int | None, int]:
+        """Give the memory watchdog the pid of remote, None while it is not running, and its pages."""
+        proc = self._remote_proc
+        if isinstance(proc, _RemoteLease):
+            return None, self.pages  # on another machine.
+        return (proc.pid if proc.is_alive() else None), self.pages
+
+    def __check_limits(self, sample: MemorySample | None = None) -> None:
+        """Recycle remote once it is over "memory_limit_mb" or "max_pages"."""
+        memory_limit = self.config.get("memory_limit_mb")
+        max_pages = self.config.get("max_pages")
+
+        if (sample is not None) and memory_limit and (sample.rss > memory_limit * 2**20):
+            self.recycle(
+                f"{sample.rss / 2**20:.0f}MB used, over {memory_limit=}MB"
+            )
+        elif max_pages and (self.pages >= max_pages):
+            self.recycle(f"{self.pages} pages opened, {max_pages=}")
+
+    def memory(self) -> list[MemorySample]:
+        """Give the memory samples of remote, and its qtwebengine processes, oldest first.
+
+        # Usage
+            ```python
+            >>> driver = Driver({"starting_url": ..., "memory_limit_mb": 1024})
+            >>> driver.memory()[-1].rss / 2**20
+            312.5
+            ```
+
+        without memory_limit_mb or memory_interval in the config, no samples are kept, one is taken now.
+
+        # Returns:
+            list[MemorySample]: (at, rss, processes, pages), see seleniumqt.memory.
+        """
+        if self._memory_watchdog is not None:
+            return list(self._memory_watchdog.samples)
+        if (not _memory.available()) or isinstance(self._remote_proc, _RemoteLease):
+            return []
+        return [_memory.sample(self._remote_proc.pid, self.pages)]
+
+    @logger.catch(reraise=True)
+    def recycle(self, reason: str = "requested", keep_session: bool = True) -> None:
+        """Replace remote with a new one at the last opened url, once the commands in flight complete.
+
+        commands given meanwhile are sent to the new remote. the restart listeners
+        are told, as for a restart. remote is recycled on its own when it is over
+        "memory_limit_mb" or "max_pages", see the Memory section of the class.
+
+        # Args:
+            reason (str, optional): given to the restart listeners. Defaults to "requested".
+            keep_session (bool, optional): give the cookies and storage to the new remote, see export_session. Defaults to True.
+        """
+        with self._lock:
+            if (self._recycle is not None) or self.__closing:
+                return
+
+        session = None
+        if keep_session:
+            try:
+                session = self.export_session()
+            except Exception:
+                logger.exception("Could not export the session of the recycled remote.")
+
+        with self._lock:
+            if self._recycle is not None:
+                return
+            logger.warning(f"Recycling remote, {reason=}")
+            self._recycle = reason
+            self._recycle_session = session
+            self._lock.notify_all()
+
+    # ---------------------------------------------downloads----------------------------------------------
+    def __finish_download(self, download: Download) -> None:
+        """Keep a download which is done, with the lock held."""
+        self._finished_downloads.append(download)
+        self._downloads_done += 1
+
+    def downloads(self) -> list[Download]:
+        """Give the downloads of remote, the last DOWNLOAD_HISTORY done first, in the order they were done, then the others."""
+        with self._lock:
+            return [*self._finished_downloads, *self._downloads.values()]
+
+    def wait_for_download(self, timeout: float | None = None) -> str:
+        """Wait for the next download to be done, and give the path of its file.
+
+        each download is given once, in the order they are done, including the ones
+        done before this was called, unless more than DOWNLOAD_HISTORY were done since.
+
+        # Usage
+            ```python
+            >>> driver.click("#export")
+            >>> driver.wait_for_download(timeout=math.inf)
+            '/tmp/seleniumqt-downloads-x1y2/report.csv'
+            ```
+
+        # Raises:
+            CommandTimeout: no download was done within timeout.
+            DownloadFailed: the download was cancelled or interrupted.
+            RemoteExited: remote exited.
+
+        # Args:
+            timeout (float | None, optional): seconds to wait, see execute. Defaults to None.
+
+        # Returns:
+            str: the path of the file.
+        """
+        deadline = self.__deadline(timeout)
+        with self._lock:
+            while self._downloads_done <= self._downloads_taken:
+                if self.__clossed:
+                    raise RemoteExited()
+                remaining = (
+                    None if deadline is None else deadline - _time.monotonic()
+                )
+                if (remaining is not None) and (remaining <= 0):
+                    raise CommandTimeout(f"No download was done within {timeout=}.")
+                self._lock.wait(remaining)
+
+            # the position of the oldest download kept, among every one done.
+            first = self._downloads_done - len(self._finished_downloads)
+            if self._downloads_taken < first:
+                logger.warning(
+                    f"{first - self._downloads_taken} downloads were dropped before being waited for, {self.DOWNLOAD_HISTORY=}"
+                )
+                self._downloads_taken = first
+            download = self._finished_downloads[self._downloads_taken - first]
+            self._downloads_taken += 1
+
+        if download.state != "completed":
+            raise DownloadFailed(
+                f"{download.url=} was {download.state}, {download.error=}"
+            )
+        return download.path
+
+    def add_event_listener(
+        self, listener: _typing.Callable[[str, dict], _typing.Any]
+    ) -> None:
+        """Call listener with the name and data of every event of remote, ex: download progress.
+
+        # Usage
+            ```python
+            >>> driver.add_event_listener(lambda name, data: print(name, data["state"], data["received"]))
+            ```
+
+        # Args:
+            listener (Callable[[str, dict], Any]): called from the driver-receiver thread, it must not block.
+        """
+        self._event_listeners.append(listener)
+
+    def add_restart_listener(
+        self, listener: _typing.Callable[[RestartEvent], _typing.Any]
+    ) -> None:
+        """Call listener with a RestartEvent every time a supervised driver restarts remote.
+
+        # Usage
+            ```python
+            >>> driver = Driver({"starting_url": ..., "supervised": True})
+            >>> driver.add_restart_listener(lambda event: print(event.reason))
+            ```
+
+        # Args:
+            listener (Callable[[RestartEvent], Any]): called from the driver-server thread.
+        """
+        self._restart_listeners.append(listener)
 
     @property
     def is_closed(self):
@@ -402,4 +1822,14 @@ class Driver:
             pass # this is a bit dagrous
 
 
-__all__ = ["Driver"]
+__all__ = [
+    "Driver",
+    "RestartEvent",
+    "MemorySample",
+    "Frame",
+    "Download",
+    "DomChanges",
+    "PerformanceTimings",
+    "QueueStats",
+    "CacheStats",
+]
@@ -50,3 +50,81 @@ class NullPageError(Exception):
     """Raise when self.page() is None."""
 
     pass
+
+
+class InvalidArchive(Exception):
+    """Raise when a network archive file is missing its index, or is not an archive."""
+
+    pass
+
+
+class CommandTimeout(Exception):
+    """Raise when a command given to remote did not complete within its timeout.
+
+    remote abandons the command at the same deadline, so the driver can keep being used.
+    """
+
+    pass
+
+
+class CommandFailed(Exception):
+    """Raise when remote failed to run a command, with an error that has no exception of its own here."""
+
+    pass
+
+
+class UnknownCommand(Exception):
+    """Raise when remote has no command of the name given, ex: its plugin was not in the config."""
+
+    pass
+
+
+class RemoteCrashed(RemoteExited):
+    """Raise when remote crashed while a command was running, in supervised mode.
+
+    remote is restarted by the driver, so the command can be given again.
+    """
+
+    pass
+
+
+class NavigationFailed(Exception):
+    """Raise when a page opened with Driver.open failed to load, ex: the host could not be reached."""
+
+    pass
+
+
+class InvalidSession(Exception):
+    """Raise when a session blob given to Driver.import_session is not a session, or is of another version."""
+
+    pass
+
+
+class FrameDetached(Exception):
+    """Raise when a frame handle is used after its frame was detached, ex: by a navigation, or was never given by Driver.frames."""
+
+    pass
+
+
+class DownloadFailed(Exception):
+    """Raise when a download was cancelled, or interrupted, ex: the connection was lost."""
+
+    pass
+
+
+class BrokerError(Exception):
+    """Raise when a broker can't be used, ex: the connection was lost, or it has no worker to start a remote on."""
+
+    pass
+
+
+class BrokerRefused(BrokerError):
+    """Raise when a broker answered a connection with an error, ex: the token is wrong, trying again won't help."""
+
+    pass
+
+
+class QueueFull(Exception):
+    """Raise when a command is refused, or dropped, because the driver's command queue is full, see Driver.queue_stats."""
+
+    pass
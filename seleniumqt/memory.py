@@ -0,0 +1,139 @@
+"""module containing the memory watchdog, which samples the memory of remote and its qtwebengine processes."""
+
+# ---------------------------------------------------
+# author: Ansh Mathur
+# gtihub: https://github.com/Fakesum
+# repo: https://github.com/Fakesum/ TODO: THIS
+# ---------------------------------------------------
+
+# import python std library
+import os as _os
+import typing as _typing
+import threading as _threading
+import collections as _collections
+
+# import logger
+from .logger import logger
+
+# clock shared with the metrics.
+from .metrics import now as _now
+
+
+PROC = "/proc"
+
+# bytes in a page of memory, statm counts pages.
+PAGE_SIZE: int = _os.sysconf("SC_PAGE_SIZE") if hasattr(_os, "sysconf") else 4096
+
+
+class MemorySample(_typing.NamedTuple):
+    """Memory of remote and every process under it, at one time."""
+
+    at: float  # seleniumqt.metrics.now() when it was taken.
+    rss: int  # bytes resident, of every process.
+    processes: dict[int, int]  # bytes resident of each process, by pid.
+    pages: int  # pages opened by this remote so far.
+
+
+def available() -> bool:
+    """Give whether memory can be sampled, it is read from /proc, so only on linux."""
+    return _os.path.isdir(PROC)
+
+
+def descendants(pid: int) -> list[int]:
+    """Give the pids of every process under pid, ex: the qtwebengine renderer, gpu and zygote processes."""
+    children: dict[int, list[int]] = _collections.defaultdict(list)
+    for entry in _os.scandir(PROC):
+        if not entry.name.isdigit():
+            continue
+        try:
+            with open(f"{PROC}/{entry.name}/stat", "rb") as f:
+                stat = f.read()
+        except OSError:
+            continue  # it exited while being read.
+        # the name is in parentheses and may contain spaces, the fields after it are fixed.
+        ppid = int(stat[stat.rindex(b")") + 2 :].split()[1])
+        children[ppid].append(int(entry.name))
+
+    found, pending = [], [pid]
+    while pending:
+        for child in children.get(pending.pop(), []):
+            found.append(child)
+            pending.append(child)
+    return found
+
+
+def rss(pid: int) -> int:
+    """Give the bytes resident of a process, 0 if it has exited."""
+    try:
+        with open(f"{PROC}/{pid}/statm", "rb") as f:
+            return int(f.read().split()[1]) * PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        return 0
+
+
+def sample(pid: int, pages: int = 0) -> MemorySample:
+    """Sample the memory of a process and every process under it."""
+    processes = {process: rss(process) for process in [pid, *descendants(pid)]}
+    return MemorySample(_now(), sum(processes.values()), processes, pages)
+
+
+class MemoryWatchdog:
+    """Sample the memory of remote in a thread, keep the last samples, and give each to a listener.
+
+    # Usage
+    ```python
+    watchdog = MemoryWatchdog(lambda: (proc.pid, pages), interval=5, on_sample=print)
+    watchdog.samples[-1].rss
+    watchdog.close()
+    ```
+    """
+
+    # samples kept, the oldest are dropped.
+    HISTORY: int = 120
+
+    def __init__(
+        self,
+        target: _typing.Callable[[], tuple[int | None, int]],
+        interval: float = 5.0,
+        on_sample: _typing.Callable[[MemorySample], _typing.Any] | None = None,
+    ) -> None:
+        """Construct MemoryWatchdog, it starts sampling immediately.
+
+        Args:
+        ----
+            target (Callable[[], tuple[int | None, int]]): gives the pid of remote, None while there is none, and its pages opened.
+            interval (float, optional): seconds between samples. Defaults to 5.0.
+            on_sample (Callable[[MemorySample], Any] | None, optional): given every sample. Defaults to None.
+
+        """
+        self.target = target
+        self.interval = interval
+        self.on_sample = on_sample
+        self.samples: _collections.deque[MemorySample] = _collections.deque(
+            maxlen=self.HISTORY
+        )
+
+        self.__closed = _threading.Event()
+        self.__thread = _threading.Thread(target=self.__loop, daemon=True)
+        self.__thread.name = "memory-watchdog"
+        self.__thread.start()
+
+    def __loop(self) -> None:
+        while not self.__closed.wait(self.interval):
+            pid, pages = self.target()
+            if pid is None:
+                continue
+            taken = sample(pid, pages)
+            self.samples.append(taken)
+            if self.on_sample is not None:
+                try:
+                    self.on_sample(taken)
+                except Exception:
+                    logger.exception("Memory sample listener failed.")
+
+    def close(self) -> None:
+        """Stop sampling."""
+        self.__closed.set()
+
+
+__all__ = ["MemorySample", "MemoryWatchdog", "available", "descendants", "rss", "sample"]
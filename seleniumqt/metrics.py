@@ -0,0 +1,301 @@
+"""module containing the per-command latency metrics of driver, and their exporters."""
+
+# ---------------------------------------------------
+# author: Ansh Mathur
+# gtihub: https://github.com/Fakesum
+# repo: https://github.com/Fakesum/ TODO: THIS
+# ---------------------------------------------------
+
+# import python std library
+import os as _os
+import math as _math
+import time as _time
+import bisect as _bisect
+import threading as _threading
+import http.server as _http_server
+
+# import logger
+from .logger import logger
+
+
+class Histogram:
+    """Fixed bucket histogram of durations in seconds, like a prometheus histogram."""
+
+    # upper bounds of the buckets, in seconds.
+    BUCKETS: tuple[float, ...] = (
+        0.0005,
+        0.001,
+        0.0025,
+        0.005,
+        0.01,
+        0.025,
+        0.05,
+        0.1,
+        0.25,
+        0.5,
+        1.0,
+        2.5,
+        5.0,
+        10.0,
+        30.0,
+        60.0,
+        _math.inf,
+    )
+
+    def __init__(self) -> None:
+        """Construct Histogram."""
+        self.counts = [0] * len(self.BUCKETS)
+        self.count = 0
+        self.sum = 0.0
+        self.min = _math.inf
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        """Add one duration to the histogram."""
+        value = max(value, 0.0)
+        self.counts[_bisect.bisect_left(self.BUCKETS, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile, by interpolating inside the bucket it falls in.
+
+        Args:
+        ----
+            q (float): the quantile, between 0 and 1.
+
+        Returns:
+        -------
+            float: the estimate, 0.0 if nothing was observed.
+
+        """
+        if self.count == 0:
+            return 0.0
+
+        rank = q * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            if count and ((seen + count) >= rank):
+                lower = self.BUCKETS[i - 1] if i else 0.0
+                upper = self.max if self.BUCKETS[i] == _math.inf else self.BUCKETS[i]
+                estimate = lower + (upper - lower) * ((rank - seen) / count)
+                return min(max(estimate, self.min), self.max)
+            seen += count
+        return self.max
+
+    def snapshot(self) -> dict:
+        """Give the histogram as a plain dict."""
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min if self.count else 0.0,
+            "max": self.max,
+            "mean": (self.sum / self.count) if self.count else 0.0,
+            "p50": self.quantile(0.5),
+            "p90": self.quantile(0.9),
+            "p99": self.quantile(0.99),
+            "buckets": dict(zip(map(str, self.BUCKETS), self.counts)),
+        }
+
+
+class CommandMetrics:
+    """Latency histograms of every phase of every command type, and result counters.
+
+    # Phases
+    - queue: waiting in Driver._commands, until the driver-server thread sends it.
+    - request: the request on the wire, until remote_client has received it.
+    - wait: waiting in Remote._queue, until __dispatch starts it, ex: behind a serial command.
+    - execute: running in qt/javascript, until the result is resolved.
+    - response: the result on its way back, until the driver-server has received it.
+    - total: from Driver.execute, until the result was received.
+    """
+
+    PHASES = ("queue", "request", "wait", "execute", "response", "total")
+
+    def __init__(self) -> None:
+        """Construct CommandMetrics."""
+        self._lock = _threading.Lock()
+        self._histograms: dict[tuple[str, str], Histogram] = {}
+        self._results: dict[tuple[str, str], int] = {}
+
+    def observe(self, command: str, phase: str, seconds: float) -> None:
+        """Add one duration of a phase of a command."""
+        with self._lock:
+            histogram = self._histograms.get((command, phase))
+            if histogram is None:
+                histogram = self._histograms[(command, phase)] = Histogram()
+            histogram.observe(seconds)
+
+    def count(self, command: str, status: str) -> None:
+        """Count one result of a command, status is ok, error or timeout."""
+        with self._lock:
+            self._results[(command, status)] = (
+                self._results.get((command, status), 0) + 1
+            )
+
+    def stats(self) -> dict[str, dict]:
+        """Give all metrics as {command: {"phases": {phase: histogram}, "results": {status: count}}}."""
+        stats: dict[str, dict] = {}
+        with self._lock:
+            for (command, phase), histogram in self._histograms.items():
+                stats.setdefault(command, {"phases": {}, "results": {}})[
+                    "phases"
+                ][phase] = histogram.snapshot()
+            for (command, status), count in self._results.items():
+                stats.setdefault(command, {"phases": {}, "results": {}})[
+                    "results"
+                ][status] = count
+        return stats
+
+    def prometheus(self, prefix: str = "seleniumqt") -> str:
+        """Give all metrics in the prometheus text exposition format."""
+        lines = [
+            f"# HELP {prefix}_command_phase_seconds Seconds spent in each phase of a driver command.",
+            f"# TYPE {prefix}_command_phase_seconds histogram",
+        ]
+        with self._lock:
+            for (command, phase), histogram in sorted(self._histograms.items()):
+                labels = f'command="{command}",phase="{phase}"'
+                cumulative = 0
+                for bound, count in zip(histogram.BUCKETS, histogram.counts):
+                    cumulative += count
+                    le = "+Inf" if bound == _math.inf else repr(bound)
+                    lines.append(
+                        f'{prefix}_command_phase_seconds_bucket{{{labels},le="{le}"}} {cumulative}'
+                    )
+                lines.append(
+                    f"{prefix}_command_phase_seconds_sum{{{labels}}} {histogram.sum}"
+                )
+                lines.append(
+                    f"{prefix}_command_phase_seconds_count{{{labels}}} {histogram.count}"
+                )
+
+            lines.append(
+                f"# HELP {prefix}_command_results_total Results of driver commands by status."
+            )
+            lines.append(f"# TYPE {prefix}_command_results_total counter")
+            for (command, status), count in sorted(self._results.items()):
+                lines.append(
+                    f'{prefix}_command_results_total{{command="{command}",status="{status}"}} {count}'
+                )
+        return "\n".join(lines) + "\n"
+
+
+class PrometheusExporter:
+    """Export CommandMetrics in prometheus text format, to a file and/or over http on a local port.
+
+    # Usage
+    ```python
+    exporter = PrometheusExporter(metrics, file_path="metrics.prom", port=9464)
+    # http://localhost:9464/metrics
+    exporter.close()
+    ```
+    """
+
+    FILE_WRITE_INTERVAL: float = 5.0  # seconds between two writes of the file.
+
+    def __init__(
+        self,
+        metrics: CommandMetrics,
+        file_path: str | None = None,
+        port: int | None = None,
+    ) -> None:
+        """Construct PrometheusExporter.
+
+        Args:
+        ----
+            metrics (CommandMetrics): the metrics to export.
+            file_path (str | None, optional): file to rewrite every FILE_WRITE_INTERVAL, for node_exporter's textfile collector. Defaults to None.
+            port (int | None, optional): serve /metrics on localhost at this port, 0 picks a free port. Defaults to None.
+
+        """
+        self.metrics = metrics
+        self.file_path = file_path
+        self._closed = _threading.Event()
+        self._server: _http_server.ThreadingHTTPServer | None = None
+
+        if file_path is not None:
+            self.__file_thread = _threading.Thread(
+                target=self.__write_file_loop, daemon=True
+            )
+            self.__file_thread.name = "metrics-file"
+            self.__file_thread.start()
+
+        if port is not None:
+            self._server = _http_server.ThreadingHTTPServer(
+                ("localhost", port), self.__handler()
+            )
+            self._server.daemon_threads = True
+            self.__http_thread = _threading.Thread(
+                target=self._server.serve_forever, daemon=True
+            )
+            self.__http_thread.name = "metrics-http"
+            self.__http_thread.start()
+            logger.info(f"Serving metrics on http://localhost:{self.port}/metrics")
+
+    @property
+    def port(self) -> int | None:
+        """Port the http exporter listens on, None if there is none."""
+        return None if self._server is None else self._server.server_address[1]
+
+    def __handler(self) -> type[_http_server.BaseHTTPRequestHandler]:
+        metrics = self.metrics
+
+        class MetricsHandler(_http_server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = metrics.prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header(
+                    "Content-Type", "text/plain; version=0.0.4; charset=utf-8"
+                )
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                logger.trace(format % args)
+
+        return MetricsHandler
+
+    def write_file(self) -> None:
+        """Write the metrics file now, atomically so a reader never sees half of it."""
+        if self.file_path is None:
+            return
+        temp_path = f"{self.file_path}.{_os.getpid()}.tmp"
+        with open(temp_path, "w") as f:
+            f.write(self.metrics.prometheus())
+        _os.replace(temp_path, self.file_path)
+
+    def __write_file_loop(self) -> None:
+        while not self._closed.wait(self.FILE_WRITE_INTERVAL):
+            try:
+                self.write_file()
+            except OSError:
+                logger.exception(f"Could not write metrics to {self.file_path=}")
+
+    def close(self) -> None:
+        """Stop exporting, the file is written one last time."""
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+        self.write_file()
+
+
+def now() -> float:
+    """Give the clock used for all command timestamps.
+
+    time.monotonic is system wide on linux, so timestamps taken by driver and
+    remote on the same machine can be compared.
+    """
+    return _time.monotonic()
+
+
+__all__ = ["Histogram", "CommandMetrics", "PrometheusExporter", "now"]
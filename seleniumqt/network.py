@@ -0,0 +1,293 @@
+"""module containing the qt network hooks used by remote, request interception and archive replay."""
+
+# ---------------------------------------------------
+# author: Ansh Mathur
+# gtihub: https://github.com/Fakesum
+# repo: https://github.com/Fakesum/ TODO: THIS
+# ---------------------------------------------------
+
+# import python std library
+import typing as _typing
+
+# import Qt
+from PyQt6 import (
+    QtCore as _QtCore,
+    QtNetwork as _QtNetwork,
+    QtWebEngineCore as _QtWebEngineCore,
+)
+
+# import the archive file format.
+from .archive import Archive, ArchiveEntry
+
+# import logger
+from .logger import logger
+
+
+# the custom schemes which http and https requests are redirected to, so that
+# they can be served by ArchiveSchemeHandler, qt does not allow a scheme handler
+# to be installed for http/https themselves.
+ARCHIVE_SCHEMES: dict[str, str] = {"http": "sqt-http", "https": "sqt-https"}
+ARCHIVE_SCHEME_PORTS: dict[str, int] = {"sqt-http": 80, "sqt-https": 443}
+
+# response headers which are not replayed, the body is stored decoded and whole.
+SKIPPED_HEADERS = {
+    "content-length",
+    "content-encoding",
+    "transfer-encoding",
+    "connection",
+    "content-type",
+}
+
+
+def register_archive_schemes() -> None:
+    """Register the archive schemes with qt, must be called before the QApplication is created."""
+    for name, port in ARCHIVE_SCHEME_PORTS.items():
+        scheme = _QtWebEngineCore.QWebEngineUrlScheme(name.encode("utf-8"))
+        scheme.setSyntax(_QtWebEngineCore.QWebEngineUrlScheme.Syntax.HostAndPort)
+        scheme.setDefaultPort(port)
+
+        flags = (
+            _QtWebEngineCore.QWebEngineUrlScheme.Flag.CorsEnabled
+            | _QtWebEngineCore.QWebEngineUrlScheme.Flag.FetchApiAllowed
+        )
+        if name == "sqt-https":
+            flags |= _QtWebEngineCore.QWebEngineUrlScheme.Flag.SecureScheme
+        scheme.setFlags(flags)
+
+        _QtWebEngineCore.QWebEngineUrlScheme.registerScheme(scheme)
+        logger.debug(f"Registered archive scheme {name=} {port=}")
+
+
+class RequestInterceptor(_QtWebEngineCore.QWebEngineUrlRequestInterceptor):
+    """Profile wide request interceptor, which forwards every request to its listeners.
+
+    qt only allows one interceptor per profile, so everything in remote which
+    needs to see requests adds a listener here instead.
+    """
+
+    def __init__(self, parent: _QtCore.QObject | None = None) -> None:
+        """Construct RequestInterceptor."""
+        super().__init__(parent)
+        self.listeners: list[
+            _typing.Callable[[_QtWebEngineCore.QWebEngineUrlRequestInfo], None]
+        ] = []
+
+    def add_listener(
+        self,
+        listener: _typing.Callable[
+            [_QtWebEngineCore.QWebEngineUrlRequestInfo], None
+        ],
+    ) -> None:
+        """Add a function which will be called with every QWebEngineUrlRequestInfo."""
+        self.listeners.append(listener)
+
+    def interceptRequest(
+        self, info: _QtWebEngineCore.QWebEngineUrlRequestInfo
+    ) -> None:
+        """Run every listener on the request, runs on the qt ui thread."""
+        for listener in self.listeners:
+            try:
+                listener(info)
+            except Exception:
+                # an exception here would abort qt, so it is only logged.
+                logger.exception(f"Request listener {listener=} failed.")
+
+
+class ArchiveSchemeHandler(_QtWebEngineCore.QWebEngineUrlSchemeHandler):
+    """Serve the archive schemes, from an Archive in replay mode, from the network in record mode.
+
+    # Usage
+    ```python
+    handler = ArchiveSchemeHandler(Archive("run.sqtarc"), record=False)
+    handler.install(profile, interceptor)
+    ```
+    """
+
+    def __init__(
+        self,
+        archive: Archive,
+        record: bool = False,
+        parent: _QtCore.QObject | None = None,
+    ) -> None:
+        """Construct ArchiveSchemeHandler.
+
+        Args:
+        ----
+            archive (Archive): the archive to replay from, or record into.
+            record (bool, optional): fetch requests from the network and record them. Defaults to False.
+            parent (QObject, optional): qt parent. Defaults to None.
+
+        """
+        super().__init__(parent)
+        self.archive = archive
+        self.record = record
+        self.hits = 0
+        self.misses = 0
+
+        self._manager: _QtNetwork.QNetworkAccessManager | None = None
+        if record:
+            self._manager = _QtNetwork.QNetworkAccessManager(self)
+
+    # -----------------------------------------utility functions------------------------------------------
+    @staticmethod
+    def to_archive_url(url: _QtCore.QUrl) -> _QtCore.QUrl:
+        """Convert a http(s) url to its archive scheme url."""
+        archive_url = _QtCore.QUrl(url)
+        archive_url.setScheme(ARCHIVE_SCHEMES[url.scheme()])
+        return archive_url
+
+    @staticmethod
+    def to_original_url(url: _QtCore.QUrl) -> _QtCore.QUrl:
+        """Convert an archive scheme url back to the http(s) url it stands for."""
+        original_url = _QtCore.QUrl(url)
+        for scheme, archive_scheme in ARCHIVE_SCHEMES.items():
+            if url.scheme() == archive_scheme:
+                original_url.setScheme(scheme)
+        return original_url
+
+    def install(
+        self,
+        profile: _QtWebEngineCore.QWebEngineProfile,
+        interceptor: RequestInterceptor,
+    ) -> None:
+        """Install the handler on the profile, and redirect http(s) to it through the interceptor."""
+        for archive_scheme in ARCHIVE_SCHEMES.values():
+            profile.installUrlSchemeHandler(
+                archive_scheme.encode("utf-8"), self
+            )
+        interceptor.add_listener(self.__redirect)
+        logger.info(
+            f"Archive installed, {self.record=} {self.archive.path=} {len(self.archive)=}"
+        )
+
+    def __redirect(
+        self, info: _QtWebEngineCore.QWebEngineUrlRequestInfo
+    ) -> None:
+        url = info.requestUrl()
+        if url.scheme() in ARCHIVE_SCHEMES:
+            info.redirect(self.to_archive_url(url))
+
+    def __serve(
+        self,
+        job: _QtWebEngineCore.QWebEngineUrlRequestJob,
+        entry: ArchiveEntry,
+    ) -> None:
+        """Reply to the job with a recorded response."""
+        location = entry.headers.get("location")
+        if (300 <= entry.status < 400) and location:
+            target = self.to_original_url(job.requestUrl()).resolved(
+                _QtCore.QUrl(location)
+            )
+            if target.scheme() in ARCHIVE_SCHEMES:
+                target = self.to_archive_url(target)
+            job.redirect(target)
+            return
+
+        if entry.headers and hasattr(job, "setAdditionalResponseHeaders"):
+            job.setAdditionalResponseHeaders(
+                {
+                    name.encode("utf-8"): [value.encode("utf-8")]
+                    for name, value in entry.headers.items()
+                }
+            )
+
+        # the buffer is parented to the job, so it is deleted along with it.
+        buffer = _QtCore.QBuffer(job)
+        buffer.setData(_QtCore.QByteArray(entry.body))
+        buffer.open(_QtCore.QIODevice.OpenModeFlag.ReadOnly)
+        job.reply(entry.content_type.encode("utf-8"), buffer)
+
+    def __fetch(
+        self,
+        job: _QtWebEngineCore.QWebEngineUrlRequestJob,
+        method: str,
+        url: _QtCore.QUrl,
+    ) -> None:
+        """Fetch the request from the network, record it and reply with it."""
+        request = _QtNetwork.QNetworkRequest(url)
+        request.setAttribute(
+            _QtNetwork.QNetworkRequest.Attribute.RedirectPolicyAttribute,
+            _QtNetwork.QNetworkRequest.RedirectPolicy.ManualRedirectPolicy,
+        )
+        if hasattr(job, "requestHeaders"):
+            for name, value in job.requestHeaders().items():
+                if bytes(name).lower() != b"host":
+                    request.setRawHeader(name, value)
+
+        reply = self._manager.sendCustomRequest(request, method.encode("utf-8"))
+
+        def finished():
+            status = reply.attribute(
+                _QtNetwork.QNetworkRequest.Attribute.HttpStatusCodeAttribute
+            )
+            content_type = reply.header(
+                _QtNetwork.QNetworkRequest.KnownHeaders.ContentTypeHeader
+            )
+            headers = {
+                bytes(name).decode("latin-1").lower(): bytes(value).decode(
+                    "latin-1"
+                )
+                for name, value in reply.rawHeaderPairs()
+                if bytes(name).decode("latin-1").lower() not in SKIPPED_HEADERS
+            }
+            entry = ArchiveEntry(
+                int(status or 200),
+                str(content_type or "application/octet-stream"),
+                headers,
+                bytes(reply.readAll()),
+            )
+            reply.deleteLater()
+
+            if (status is None) and (
+                reply.error() != _QtNetwork.QNetworkReply.NetworkError.NoError
+            ):
+                logger.warning(f"Not recording {url.toString()=}, {reply.errorString()=}")
+                try:
+                    job.fail(
+                        _QtWebEngineCore.QWebEngineUrlRequestJob.Error.RequestFailed
+                    )
+                except RuntimeError:
+                    pass  # the job was already deleted by qt.
+                return
+
+            self.archive.add(method, url.toString(), *entry)
+            logger.trace(f"Recorded {method} {url.toString()} {entry.status=}")
+
+            try:
+                self.__serve(job, entry)
+            except RuntimeError:
+                # the request was aborted while it was being fetched,
+                # it is still recorded, there is just nobody to reply to.
+                logger.trace(f"Job for {url.toString()=} was deleted.")
+
+        reply.finished.connect(finished)
+
+    # -------------------------------------------qt interface---------------------------------------------
+    def requestStarted(
+        self, job: _QtWebEngineCore.QWebEngineUrlRequestJob
+    ) -> None:
+        """Serve one request made to an archive scheme."""
+        method = bytes(job.requestMethod()).decode("utf-8")
+        url = self.to_original_url(job.requestUrl())
+
+        if self.record:
+            self.__fetch(job, method, url)
+            return
+
+        entry = self.archive.get(method, url.toString())
+        if entry is None:
+            self.misses += 1
+            logger.warning(f"Not in archive: {method} {url.toString()}")
+            job.fail(_QtWebEngineCore.QWebEngineUrlRequestJob.Error.UrlNotFound)
+            return
+
+        self.hits += 1
+        self.__serve(job, entry)
+
+
+__all__ = [
+    "ARCHIVE_SCHEMES",
+    "register_archive_schemes",
+    "RequestInterceptor",
+    "ArchiveSchemeHandler",
+]
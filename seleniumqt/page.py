@@ -0,0 +1,565 @@
+"""module containing remote's page, which reports page events to python, the helper runtime commands call into, and the navigation lifecycle."""
+
+# ---------------------------------------------------
+# author: Ansh Mathur
+# gtihub: https://github.com/Fakesum
+# repo: https://github.com/Fakesum/ TODO: THIS
+# ---------------------------------------------------
+
+# import python std library
+import json as _json
+import typing as _typing
+import secrets as _secrets
+import collections as _collections
+
+# import Qt
+from PyQt6 import (
+    QtCore as _QtCore,
+    QtWebEngineCore as _QtWebEngineCore,
+)
+
+# import logger
+from .logger import logger
+
+# clock shared with the driver.
+from .metrics import now as _now
+
+# the performance entry types collected.
+from .timings import ENTRY_TYPES as _ENTRY_TYPES
+
+
+# states of a navigation, in the order they are reached.
+LIFECYCLE_STATES = ("commit", "domcontentloaded", "load", "networkidle")
+
+# reports DOMContentLoaded of the top frame, and every finished resource of every frame.
+# it runs in the application world, so the page can't see or change it.
+JAVASCRIPT_LIFECYCLE = """
+(() => {{
+    const send = (message) => console.debug({token} + JSON.stringify(message));
+    if (window === window.top) {{
+        document.addEventListener("DOMContentLoaded", () => {{
+            send({{event: "domcontentloaded", url: location.href}});
+        }}, {{once: true}});
+    }}
+    try {{
+        new PerformanceObserver((list) => {{
+            const urls = list.getEntries().map((entry) => entry.name);
+            if (urls.length) {{
+                send({{event: "resources", urls: urls}});
+            }}
+        }}).observe({{type: "resource", buffered: true}});
+    }} catch (e) {{}}
+}})();
+"""
+
+# reports the performance entries of every frame, as the browser records them.
+JAVASCRIPT_TIMINGS = """
+(() => {{
+    const send = (message) => console.debug({token} + JSON.stringify(message));
+    for (const type of {types}) {{
+        try {{
+            new PerformanceObserver((list) => {{
+                send({{
+                    event: "timings",
+                    url: location.href,
+                    timeOrigin: performance.timeOrigin,
+                    entries: list.getEntries().map((entry) => entry.toJSON()),
+                }});
+            }}).observe({{type: type, buffered: true}});
+        }} catch (e) {{}} // a type this browser does not record.
+    }}
+}})();
+"""
+
+# milliseconds between two "mutated" messages of a document, while its dom keeps changing.
+MUTATION_INTERVAL: int = 50
+
+# reports that the dom of a document changed, once at once, then at most every interval.
+JAVASCRIPT_MUTATIONS = """
+(() => {{
+    const send = (message) => console.debug({token} + JSON.stringify(message));
+    let quietUntil = 0;
+    let trailing = null;
+    const notify = () => {{
+        const now = performance.now();
+        if (now >= quietUntil) {{
+            quietUntil = now + {interval};
+            send({{event: "mutated", url: location.href}});
+        }} else if (trailing === null) {{
+            // the changes during the interval are reported at its end.
+            trailing = setTimeout(() => {{
+                trailing = null;
+                notify();
+            }}, quietUntil - now);
+        }}
+    }};
+    new MutationObserver(notify).observe(document, {{
+        subtree: true, childList: true, attributes: true, characterData: true,
+    }});
+}})();
+"""
+
+# the helper runtime, installed in every document before the page's own scripts run.
+# bump RUNTIME_VERSION whenever JAVASCRIPT_RUNTIME changes, a runtime of another
+# version is replaced instead of reused.
+RUNTIME_VERSION = 3
+RUNTIME_MISSING = "SeleniumqtRuntimeMissing"
+
+JAVASCRIPT_RUNTIME = """
+(() => {{
+    if (window.__seleniumqt && window.__seleniumqt.version === {version}) {{
+        return;
+    }}
+    const find = (type, selector) => (type === "xpath")
+        ? document.evaluate(selector, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue
+        : document.querySelector(selector);
+
+    // the dom watch of this document, its mutation records are kept until changes reads them.
+    const documentId = Math.random().toString(36).slice(2);
+    let watch = null;
+    const idOf = (node) => {{
+        let id = watch.ids.get(node);
+        if (id === undefined) {{
+            id = watch.nextId++;
+            watch.ids.set(node, id);
+        }}
+        return id;
+    }};
+    // [id, name, value] of a text or comment, [id, tag, attributes, children] of an element.
+    const serialize = (node) => {{
+        const name = node.nodeName.toLowerCase();
+        if (node.nodeType !== Node.ELEMENT_NODE) {{
+            return [idOf(node), name, node.nodeValue];
+        }}
+        const attributes = {{}};
+        for (const attribute of node.attributes) {{
+            attributes[attribute.name] = attribute.value;
+        }}
+        return [idOf(node), name, attributes, Array.from(node.childNodes, serialize)];
+    }};
+    const startWatch = (type, selector, limit) => {{
+        if (watch && watch.observer) {{
+            watch.observer.disconnect();
+        }}
+        watch = {{
+            type: type, selector: selector, limit: limit, root: find(type, selector),
+            ids: new WeakMap(), nextId: 1, records: [], first: 0, overflow: false, observer: null,
+        }};
+        if (watch.root) {{
+            const current = watch;
+            current.observer = new MutationObserver((records) => {{
+                if ((current.records.length + records.length) > current.limit) {{
+                    // too many to keep, the next read is a resync instead.
+                    current.overflow = true;
+                    current.records = [];
+                }} else if (!current.overflow) {{
+                    current.records.push(...records);
+                }}
+            }});
+            current.observer.observe(watch.root, {{
+                subtree: true, childList: true, attributes: true, characterData: true,
+            }});
+        }}
+    }};
+    // the records read, coalesced, the last value of each attribute and text, and
+    // the nodes removed from and added to each parent, in their final places.
+    const coalesce = (records) => {{
+        const attributes = new Map(), texts = new Map(), children = new Map();
+        for (const record of records) {{
+            const target = record.target;
+            if (record.type === "attributes") {{
+                attributes.set(target, (attributes.get(target) || new Set()).add(record.attributeName));
+            }} else if (record.type === "characterData") {{
+                texts.set(target, true);
+            }} else {{
+                let change = children.get(target);
+                if (!change) {{
+                    change = {{removed: new Set(), added: new Set()}};
+                    children.set(target, change);
+                }}
+                for (const node of record.removedNodes) {{
+                    if (change.added.has(node)) {{
+                        change.added.delete(node);
+                    }} else if (watch.ids.has(node)) {{
+                        change.removed.add(node);
+                    }}
+                }}
+                for (const node of record.addedNodes) {{
+                    change.added.add(node);
+                }}
+            }}
+        }}
+
+        const added = new Set();
+        for (const [target, change] of children) {{
+            for (const node of change.added) {{
+                if (node.parentNode === target) {{
+                    added.add(node);
+                }}
+            }}
+        }}
+        // a node the driver knows, which is still watched, and not inside a node sent whole.
+        const known = (node) => {{
+            if (!watch.ids.has(node)) {{
+                return false;
+            }}
+            for (let parent = node; parent; parent = parent.parentNode) {{
+                if (added.has(parent)) {{
+                    return false;
+                }}
+                if (parent === watch.root) {{
+                    return true;
+                }}
+            }}
+            return false;
+        }};
+
+        const changes = [];
+        for (const [target, names] of attributes) {{
+            if (known(target)) {{
+                for (const name of names) {{
+                    changes.push({{type: "attributes", target: idOf(target), name: name, value: target.getAttribute(name)}});
+                }}
+            }}
+        }}
+        for (const target of texts.keys()) {{
+            if (known(target)) {{
+                changes.push({{type: "characterData", target: idOf(target), value: target.nodeValue}});
+            }}
+        }}
+        for (const [target, change] of children) {{
+            if (!known(target)) {{
+                continue;
+            }}
+            const nodes = Array.from(target.childNodes);
+            const inserted = Array.from(change.added)
+                .filter((node) => added.has(node))
+                .map((node) => [nodes.indexOf(node), node])
+                .sort((a, b) => a[0] - b[0]);
+            if (change.removed.size || inserted.length) {{
+                changes.push({{
+                    type: "childList",
+                    target: idOf(target),
+                    removed: Array.from(change.removed, idOf),
+                    added: inserted.map(([index, node]) => [index, serialize(node)]),
+                }});
+            }}
+        }}
+        return changes;
+    }};
+
+    window.__seleniumqt = Object.freeze({{
+        version: {version},
+        find: find,
+        // "x,y" of the element's center in the viewport, scrolled to the center first.
+        center: (type, selector, scrollIntoView) => {{
+            try {{
+                const element = find(type, selector);
+                if (element == null) {{
+                    return "JavascriptException, cannot find element, with selector: " + selector;
+                }}
+                if (scrollIntoView) {{
+                    element.scrollIntoView({{block: "center", inline: "center", behavior: "instant"}});
+                }}
+                const box = element.getBoundingClientRect();
+                return (box.left + (box.width / 2)) + "," + (box.top + (box.height / 2));
+            }} catch (err) {{
+                return "JavascriptException, exception: " + err.message;
+            }}
+        }},
+        // the dom changes under the element since a cursor, a snapshot of it instead with resync.
+        changes: (type, selector, since, resync, limit) => {{
+            try {{
+                if ((!watch) || (watch.type !== type) || (watch.selector !== selector)
+                    || !(watch.root && watch.root.isConnected)) {{
+                    resync = true;
+                }}
+                const [document_, seq] = String(since || "").split(":");
+                const position = Number(seq) - (watch ? watch.first : 0);
+                if (resync || watch.overflow || (document_ !== documentId)
+                    || !((position >= 0) && (position <= watch.records.length))) {{
+                    startWatch(type, selector, limit);
+                    return JSON.stringify({{
+                        cursor: documentId + ":0",
+                        resync: true,
+                        snapshot: watch.root ? serialize(watch.root) : null,
+                        changes: [],
+                    }});
+                }}
+                const records = watch.records.slice(position);
+                watch.first += position + records.length;
+                watch.records = [];
+                return JSON.stringify({{
+                    cursor: documentId + ":" + watch.first,
+                    resync: false,
+                    snapshot: null,
+                    changes: coalesce(records),
+                }});
+            }} catch (err) {{
+                return "JavascriptException, exception: " + err.message;
+            }}
+        }},
+        // "x,y" of the content of the iframe with that name or url, in this frame's viewport.
+        frameOffset: (name, url) => {{
+            try {{
+                const frames = Array.from(document.querySelectorAll("iframe, frame"));
+                const element = (name && frames.find((frame) => frame.name === name))
+                    || frames.find((frame) => frame.src === url)
+                    || ((frames.length === 1) ? frames[0] : null);
+                if (element == null) {{
+                    return "JavascriptException, cannot find the element of frame: " + (name || url);
+                }}
+                const box = element.getBoundingClientRect();
+                const style = getComputedStyle(element);
+                return (box.left + element.clientLeft + parseFloat(style.paddingLeft)) + ","
+                    + (box.top + element.clientTop + parseFloat(style.paddingTop));
+            }} catch (err) {{
+                return "JavascriptException, exception: " + err.message;
+            }}
+        }},
+    }});
+}})();
+""".format(version=RUNTIME_VERSION)
+
+# worlds a script can run in, main is the page's own, isolated can't be seen or changed by the page.
+WORLDS = {
+    "main": _QtWebEngineCore.QWebEngineScript.ScriptWorldId.MainWorld,
+    "isolated": _QtWebEngineCore.QWebEngineScript.ScriptWorldId.ApplicationWorld,
+}
+
+
+def runtime_call(call: str) -> str:
+    """Give the javascript which calls into the runtime, it gives RUNTIME_MISSING if the document has none.
+
+    Args:
+    ----
+        call (str): the call, ex: `center("css", "#submit", true)`
+
+    """
+    return (
+        f"((typeof __seleniumqt === 'object') && (__seleniumqt.version === {RUNTIME_VERSION}))"
+        f" ? __seleniumqt.{call} : {_json.dumps(RUNTIME_MISSING)}"
+    )
+
+
+def make_script(
+    name: str, source: str, world: str = "main", subframes: bool = False
+) -> _QtWebEngineCore.QWebEngineScript:
+    """Create a script which runs in every new document, before the page's own scripts.
+
+    Args:
+    ----
+        name (str): name of the script, scripts are found and removed by it.
+        source (str): the javascript.
+        world (str, optional): one of WORLDS. Defaults to "main".
+        subframes (bool, optional): also run it in every frame. Defaults to False.
+
+    """
+    if world not in WORLDS:
+        raise ValueError(f"{world=} is not one of {tuple(WORLDS)}")
+
+    script = _QtWebEngineCore.QWebEngineScript()
+    script.setName(name)
+    script.setSourceCode(source)
+    script.setInjectionPoint(
+        _QtWebEngineCore.QWebEngineScript.InjectionPoint.DocumentCreation
+    )
+    script.setWorldId(WORLDS[world])
+    script.setRunsOnSubFrames(subframes)
+    return script
+
+
+class BridgePage(_QtWebEngineCore.QWebEnginePage):
+    """QWebEnginePage which turns the console messages of its own scripts into a qt signal.
+
+    the messages start with a random token, which the page does not know, so
+    the page can't send bridge messages of its own. every other console message
+    is kept in console, the last CONSOLE_HISTORY of them.
+
+    with timings, the performance entries of every frame are sent as "timings"
+    messages, see seleniumqt.timings. with mutations, a change to the dom of
+    any frame is sent as a "mutated" message, see JAVASCRIPT_MUTATIONS.
+    """
+
+    bridgeMessage = _QtCore.pyqtSignal(dict)
+
+    # console messages kept, for the errors of failed scripts.
+    CONSOLE_HISTORY: int = 100
+
+    def __init__(
+        self,
+        profile: _QtWebEngineCore.QWebEngineProfile,
+        parent: _QtCore.QObject | None = None,
+        timings: bool = True,
+        mutations: bool = False,
+    ) -> None:
+        """Construct BridgePage, and add the lifecycle script and helper runtime to it.
+
+        Args:
+        ----
+            profile (QWebEngineProfile): profile of the page.
+            parent (QObject, optional): qt parent. Defaults to None.
+            timings (bool, optional): also add the timings script. Defaults to True.
+            mutations (bool, optional): also add the mutations script. Defaults to False.
+
+        """
+        super().__init__(profile, parent)
+        self.token = f"sqt-{_secrets.token_hex(16)}:"
+        self.console: _collections.deque[str] = _collections.deque(
+            maxlen=self.CONSOLE_HISTORY
+        )
+
+        self.scripts().insert(
+            make_script(
+                "seleniumqt-lifecycle",
+                JAVASCRIPT_LIFECYCLE.format(token=_json.dumps(self.token)),
+                "isolated",
+                subframes=True,
+            )
+        )
+        if timings:
+            self.scripts().insert(
+                make_script(
+                    "seleniumqt-timings",
+                    JAVASCRIPT_TIMINGS.format(
+                        token=_json.dumps(self.token),
+                        types=_json.dumps(_ENTRY_TYPES),
+                    ),
+                    "isolated",
+                    subframes=True,
+                )
+            )
+        if mutations:
+            self.scripts().insert(
+                make_script(
+                    "seleniumqt-mutations",
+                    JAVASCRIPT_MUTATIONS.format(
+                        token=_json.dumps(self.token), interval=MUTATION_INTERVAL
+                    ),
+                    "isolated",
+                    subframes=True,
+                )
+            )
+        self.scripts().insert(
+            make_script(
+                f"seleniumqt-runtime-{RUNTIME_VERSION}",
+                JAVASCRIPT_RUNTIME,
+                "isolated",
+                subframes=True,
+            )
+        )
+
+    def javaScriptConsoleMessage(self, level, message, line_number, source_id):
+        """Emit bridgeMessage for bridge messages, keep and log every other console message."""
+        if message.startswith(self.token):
+            try:
+                self.bridgeMessage.emit(_json.loads(message[len(self.token) :]))
+            except ValueError:
+                logger.warning(f"Malformed bridge message {message=}")
+            return
+        self.console.append(f"{level.name}: {message}")
+        logger.trace(f"console {level.name}: {message} ({source_id}:{line_number})")
+
+
+class Lifecycle:
+    """Tracks how far one navigation has got, for Driver.open(wait_until=...).
+
+    # States
+    - commit: the new document has replaced the old one, the url has changed.
+    - domcontentloaded: the html is parsed, DOMContentLoaded fired on the top frame.
+    - load: loadFinished, every subresource of the document has loaded.
+    - networkidle: load, and then no request in flight for NETWORK_IDLE_TIME.
+
+    requests are counted as started by the request interceptor, and as finished
+    when the page reports their resource timing entry.
+    """
+
+    # seconds without a request in flight, for networkidle.
+    NETWORK_IDLE_TIME: float = 0.5
+
+    # seconds after which a request that was never reported finished is ignored,
+    # ex: a long poll, or a request resource timing does not see.
+    REQUEST_STALE_AFTER: float = 10.0
+
+    def __init__(self, url: str, wait_until: str, request_id: int | None) -> None:
+        """Construct Lifecycle.
+
+        Args:
+        ----
+            url (str): url being navigated to.
+            wait_until (str): one of LIFECYCLE_STATES.
+            request_id (int | None): the command waiting for it.
+
+        """
+        if wait_until not in LIFECYCLE_STATES:
+            raise ValueError(f"{wait_until=} is not one of {LIFECYCLE_STATES}")
+        self.url = url
+        self.wait_until = wait_until
+        self.request_id = request_id
+        self.started = False  # loadStarted was seen for this navigation.
+        self.reached: set[str] = set()
+        self.in_flight: dict[str, list[float]] = {}
+        self.last_activity = _now()
+
+    @staticmethod
+    def _key(url: str) -> str:
+        # archive replay serves http(s) as sqt-http(s), the page reports those urls.
+        if url.startswith("sqt-http"):
+            url = url[len("sqt-") :]
+        return url.split("#", 1)[0]
+
+    def reach(self, *states: str) -> None:
+        """Mark states as reached, every earlier state is reached along with them."""
+        for state in states:
+            self.reached.update(
+                LIFECYCLE_STATES[: LIFECYCLE_STATES.index(state) + 1]
+            )
+
+    def request_started(self, url: str) -> None:
+        self.in_flight.setdefault(self._key(url), []).append(_now())
+        self.last_activity = _now()
+
+    def requests_finished(self, urls: _typing.Iterable[str]) -> None:
+        for url in urls:
+            started = self.in_flight.get(self._key(url))
+            if started:
+                started.pop(0)
+        self.last_activity = _now()
+
+    def remaining(self, now: float | None = None) -> float | None:
+        """Give the seconds until wait_until is reached.
+
+        Returns:
+        -------
+            float | None: 0 once it is reached, None if it waits for an event that has not
+            happened yet, otherwise the seconds after which networkidle should be checked again.
+
+        """
+        now = _now() if now is None else now
+        if self.wait_until != "networkidle":
+            return 0.0 if self.wait_until in self.reached else None
+
+        if "load" not in self.reached:
+            return None
+
+        starts = [
+            start
+            for started in self.in_flight.values()
+            for start in started
+            if (now - start) < self.REQUEST_STALE_AFTER
+        ]
+        if starts:
+            # not idle, check again once the oldest request has become stale.
+            return (min(starts) + self.REQUEST_STALE_AFTER - now) + self.NETWORK_IDLE_TIME
+        return max(self.last_activity + self.NETWORK_IDLE_TIME - now, 0.0)
+
+
+__all__ = [
+    "LIFECYCLE_STATES",
+    "RUNTIME_VERSION",
+    "WORLDS",
+    "runtime_call",
+    "make_script",
+    "BridgePage",
+    "Lifecycle",
+]
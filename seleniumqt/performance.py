@@ -0,0 +1,172 @@
+"""module containing the performance profiles, curated QWebEngineSettings and chromium flags for remote."""
+
+# ---------------------------------------------------
+# author: Ansh Mathur
+# gtihub: https://github.com/Fakesum
+# repo: https://github.com/Fakesum/ TODO: THIS
+# ---------------------------------------------------
+
+# import python std library
+import os as _os
+import typing as _typing
+
+# import Qt
+from PyQt6 import QtWebEngineCore as _QtWebEngineCore
+
+# import logger
+from .logger import logger
+
+
+# chromium reads its flags from here, once, when QtWebEngine starts.
+CHROMIUM_FLAGS_ENV = "QTWEBENGINE_CHROMIUM_FLAGS"
+
+
+class PerformanceProfile(_typing.NamedTuple):
+    """Chromium flags, and QWebEngineSettings.WebAttribute values, applied together."""
+
+    flags: dict[str, str | bool]  # flag: its value, True for a flag without one.
+    settings: dict[str, bool]  # name of a WebAttribute: its value.
+
+
+_SCRAPE = PerformanceProfile(
+    flags={
+        # servers have no gpu, trying it only costs a gpu process and fallbacks.
+        "--disable-gpu": True,
+        "--disable-gpu-compositing": True,
+        "--disable-smooth-scrolling": True,
+        "--disable-background-networking": True,
+        "--disable-component-update": True,
+        "--disable-domain-reliability": True,
+        "--disable-breakpad": True,
+        "--mute-audio": True,
+        "--autoplay-policy": "user-gesture-required",
+    },
+    settings={
+        "PlaybackRequiresUserGesture": True,
+        "ScrollAnimatorEnabled": False,
+        "WebGLEnabled": False,
+        "Accelerated2dCanvasEnabled": False,
+        "PluginsEnabled": False,
+        "PdfViewerEnabled": False,
+        "FullScreenSupportEnabled": False,
+        "AutoLoadIconsForPage": False,
+        "TouchIconsEnabled": False,
+        "HyperlinkAuditingEnabled": False,
+        "DnsPrefetchEnabled": False,
+        "ScreenCaptureEnabled": False,
+    },
+)
+
+# every profile, by the name given as "performance_profile".
+PROFILES: dict[str, PerformanceProfile] = {
+    # the desktop browser defaults of qt.
+    "default": PerformanceProfile({}, {}),
+    # no gpu, media, or browser chrome, pages still look and behave as usual.
+    "scrape": _SCRAPE,
+    # scrape, without images or web fonts, and one renderer process.
+    "minimal": PerformanceProfile(
+        flags={
+            **_SCRAPE.flags,
+            "--renderer-process-limit": "1",
+            "--disable-remote-fonts": True,
+        },
+        settings={
+            **_SCRAPE.settings,
+            "AutoLoadImages": False,
+            "JavascriptCanOpenWindows": False,
+        },
+    ),
+}
+
+
+def resolve(data: dict) -> tuple[str, PerformanceProfile]:
+    """Give the profile of remote's config, with "chromium_flags" and "web_settings" over it.
+
+    # Usage
+        ```python
+        >>> resolve({"performance_profile": "scrape", "web_settings": {"WebGLEnabled": True}, "chromium_flags": {"--mute-audio": False}})
+        ```
+        a flag given False is removed, see PerformanceProfile.
+
+    # Raises:
+        ValueError: there is no profile of that name.
+
+    # Returns:
+        tuple[str, PerformanceProfile]: the profile's name, and the profile.
+    """
+    name = data.get("performance_profile") or "default"
+    if name not in PROFILES:
+        raise ValueError(f"{name=} is not one of {list(PROFILES)}.")
+    profile = PROFILES[name]
+
+    flags = {**profile.flags, **(data.get("chromium_flags") or {})}
+    return name, PerformanceProfile(
+        {flag: value for flag, value in flags.items() if value not in (False, None)},
+        {**profile.settings, **(data.get("web_settings") or {})},
+    )
+
+
+def format_flags(flags: dict[str, str | bool]) -> str:
+    """Give flags as a command line, ex: --disable-gpu --renderer-process-limit=1"""
+    return " ".join(
+        flag if value is True else f"{flag}={value}" for flag, value in flags.items()
+    )
+
+
+def apply_flags(profile: PerformanceProfile) -> str:
+    """Add the profile's flags to QTWEBENGINE_CHROMIUM_FLAGS, must be called before the QApplication is created.
+
+    flags already in the environment are kept, after the profile's, so they win.
+
+    Returns:
+    -------
+        str: the flags chromium is given.
+
+    """
+    flags = " ".join(
+        flags
+        for flags in (format_flags(profile.flags), _os.environ.get(CHROMIUM_FLAGS_ENV))
+        if flags
+    )
+    if flags:
+        _os.environ[CHROMIUM_FLAGS_ENV] = flags
+    return flags
+
+
+def apply_settings(
+    profile: PerformanceProfile, settings: _QtWebEngineCore.QWebEngineSettings
+) -> None:
+    """Set the profile's attributes on a QWebEngineSettings, ex: of QWebEngineProfile.defaultProfile().
+
+    Raises:
+    ------
+        ValueError: an attribute is not a QWebEngineSettings.WebAttribute.
+
+    """
+    for name, value in profile.settings.items():
+        try:
+            attribute = _QtWebEngineCore.QWebEngineSettings.WebAttribute[name]
+        except KeyError:
+            raise ValueError(
+                f"{name=} is not a QWebEngineSettings.WebAttribute."
+            ) from None
+        settings.setAttribute(attribute, value)
+
+
+def report(name: str, profile: PerformanceProfile, flags: str) -> None:
+    """Log what a profile changed, and the chromium flags in effect."""
+    logger.info(
+        f"Performance profile {name!r}: {CHROMIUM_FLAGS_ENV}={flags!r}, "
+        f"settings={profile.settings}"
+    )
+
+
+__all__ = [
+    "PerformanceProfile",
+    "PROFILES",
+    "resolve",
+    "format_flags",
+    "apply_flags",
+    "apply_settings",
+    "report",
+]
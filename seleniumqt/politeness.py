@@ -0,0 +1,344 @@
+"""module containing the politeness scheduler, which limits how hard the drivers hit each host."""
+
+# ---------------------------------------------------
+# author: Ansh Mathur
+# gtihub: https://github.com/Fakesum
+# repo: https://github.com/Fakesum/ TODO: THIS
+# ---------------------------------------------------
+
+# import python std library
+import os as _os
+import json as _json
+import time as _time
+import typing as _typing
+import threading as _threading
+import contextlib as _contextlib
+import urllib.parse as _urllib_parse
+
+try:
+    import fcntl as _fcntl
+except ImportError:  # windows, only MemoryBackend can be used.
+    _fcntl = None
+
+# import logger
+from .logger import logger
+
+# import exceptions
+from .exception import CommandTimeout
+
+
+# seconds to wait before trying a host again, when it is at its concurrency limit.
+RETRY_INTERVAL: float = 0.05
+
+
+class HostPolicy(_typing.NamedTuple):
+    """How hard a host may be hit, by every driver sharing a backend together."""
+
+    max_concurrency: int = 2  # opens of the host running at once.
+    min_delay: float = 0.0  # seconds between the starts of two opens.
+    rate: float | None = None  # opens per second, on average, None for no limit.
+    burst: int = 1  # opens which can start at once after being idle, if rate is given.
+
+
+def host(url: str) -> str:
+    """Give the host of a url, ex: www.example.com, with its port if it has one."""
+    return (_urllib_parse.urlsplit(url).netloc.rsplit("@", 1)[-1] or url).lower()
+
+
+def _admit(state: dict, policy: HostPolicy, now: float, holder: str) -> float:
+    """Start an open of a host if its policy allows it now, updating its state.
+
+    Returns:
+    -------
+        float: 0.0 if it was started, else seconds until it may be.
+
+    """
+    if sum(state["running"].values()) >= policy.max_concurrency:
+        # only a release frees a slot, when is not known.
+        return max(policy.min_delay, RETRY_INTERVAL)
+
+    wait = 0.0
+    if state["last"] is not None:
+        wait = state["last"] + policy.min_delay - now
+
+    if policy.rate:
+        # token bucket, refilled at rate up to burst.
+        state["tokens"] = min(
+            float(policy.burst),
+            state["tokens"] + (now - state["updated"]) * policy.rate,
+        )
+        state["updated"] = now
+        if state["tokens"] < 1:
+            wait = max(wait, (1 - state["tokens"]) / policy.rate)
+
+    if wait > 0:
+        return wait
+
+    if policy.rate:
+        state["tokens"] -= 1
+    state["last"] = now
+    state["running"][holder] = state["running"].get(holder, 0) + 1
+    return 0.0
+
+
+def _release(state: dict, host: str, holder: str) -> None:
+    """End an open of host by holder, a release without an open running is ignored."""
+    running = state["running"].get(holder, 0)
+    if running <= 0:
+        logger.warning(f"Released {host=} which has no open running.")
+        return
+    state["running"][holder] = running - 1
+
+
+def _new_state(policy: HostPolicy, now: float) -> dict:
+    return {"running": {}, "last": None, "tokens": float(policy.burst), "updated": now}
+
+
+class MemoryBackend:
+    """Host states kept in this process, shared by every Scheduler given it."""
+
+    def __init__(self) -> None:
+        """Construct MemoryBackend."""
+        self._lock = _threading.Lock()
+        self._states: dict[str, dict] = {}
+        self._holder = str(_os.getpid())
+
+    def try_acquire(self, host: str, policy: HostPolicy) -> float:
+        """Start an open of host if policy allows it, see Scheduler.try_acquire."""
+        now = _time.monotonic()
+        with self._lock:
+            state = self._states.setdefault(host, _new_state(policy, now))
+            return _admit(state, policy, now, self._holder)
+
+    def release(self, host: str) -> None:
+        """End an open of host, started by try_acquire."""
+        with self._lock:
+            if host not in self._states:
+                logger.warning(f"Released {host=} which was never acquired.")
+                return
+            _release(self._states[host], host, self._holder)
+
+
+class FileBackend:
+    """Host states kept in files of a directory, shared by every process using that directory.
+
+    each host has a json file, locked while it is read and written. the opens
+    running are counted per process, so those of a process which died are not.
+    """
+
+    def __init__(self, directory: str) -> None:
+        """Construct FileBackend.
+
+        Raises:
+        ------
+            RuntimeError: files cannot be locked on this platform, use MemoryBackend.
+
+        Args:
+        ----
+            directory (str): where the host files are, it is created if needed.
+
+        """
+        if _fcntl is None:
+            raise RuntimeError("FileBackend needs fcntl, use MemoryBackend instead.")
+        self.directory = directory
+        _os.makedirs(directory, exist_ok=True)
+        # the thread lock orders this process's own threads, the file lock other processes.
+        self._lock = _threading.Lock()
+
+    def __path(self, host: str) -> str:
+        return _os.path.join(
+            self.directory, "".join(c if c.isalnum() or c in ".-" else "_" for c in host)
+        )
+
+    @_contextlib.contextmanager
+    def __state(self, host: str, policy: HostPolicy) -> _typing.Iterator[dict]:
+        """Give the state of host, locked, and write it back."""
+        fd = _os.open(self.__path(host), _os.O_RDWR | _os.O_CREAT, 0o644)
+        with self._lock, open(fd, "r+") as f:
+            _fcntl.flock(f, _fcntl.LOCK_EX)
+            try:
+                # the time, not monotonic, is the one clock every process agrees on.
+                now = _time.time()
+                try:
+                    state = _json.loads(f.read())
+                except ValueError:
+                    state = _new_state(policy, now)
+                state["running"] = {
+                    pid: count
+                    for pid, count in state["running"].items()
+                    if count > 0 and _alive(int(pid))
+                }
+                yield state
+                f.seek(0)
+                f.truncate()
+                f.write(_json.dumps(state))
+                f.flush()
+            finally:
+                _fcntl.flock(f, _fcntl.LOCK_UN)
+
+    def try_acquire(self, host: str, policy: HostPolicy) -> float:
+        """Start an open of host if policy allows it, see Scheduler.try_acquire."""
+        with self.__state(host, policy) as state:
+            return _admit(state, policy, _time.time(), str(_os.getpid()))
+
+    def release(self, host: str) -> None:
+        """End an open of host, started by try_acquire."""
+        if not _os.path.exists(self.__path(host)):
+            logger.warning(f"Released {host=} which was never acquired.")
+            return
+        with self.__state(host, HostPolicy()) as state:
+            _release(state, host, str(_os.getpid()))
+
+
+def _alive(pid: int) -> bool:
+    try:
+        _os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+# the backend of every Scheduler not given one, so all of a process's are limited together.
+PROCESS_BACKEND = MemoryBackend()
+
+
+class Scheduler:
+    """Limit the opens of each host, across every Driver, so hosts are not hit harder than their policy.
+
+    a host's policy is the one given for it, or for a domain it is under, else the default.
+    every Scheduler with the same backend shares the hosts' limits, by default those of
+    the process, with a FileBackend those of every process using its directory.
+
+    # Usage
+        ```python
+        >>> scheduler = Scheduler(HostPolicy(max_concurrency=2, rate=1.0), {"example.com": HostPolicy(min_delay=5)})
+        >>> scheduler.open(driver, "https://www.example.com/") # waits for a slot of www.example.com, then opens it.
+        >>> with scheduler.slot("https://api.example.org/"): # or, around anything else that hits the host.
+        ...     driver.execute_script("return fetch('https://api.example.org/').then(r => r.status);")
+        ```
+        ```python
+        >>> # shared by every process.
+        >>> scheduler = Scheduler(HostPolicy(rate=0.5), backend=FileBackend("/tmp/seleniumqt-hosts"))
+        >>> seleniumqt.crawl(urls, "return document.title;", concurrency=16, scheduler=scheduler)
+        ```
+    """
+
+    def __init__(
+        self,
+        default: HostPolicy = HostPolicy(),
+        policies: dict[str, HostPolicy] | None = None,
+        backend: MemoryBackend | FileBackend | None = None,
+    ) -> None:
+        """Construct Scheduler.
+
+        Args:
+        ----
+            default (HostPolicy, optional): policy of the hosts not in policies. Defaults to HostPolicy().
+            policies (dict[str, HostPolicy] | None, optional): policy by host or domain. Defaults to None.
+            backend (MemoryBackend | FileBackend | None, optional): where the hosts' states are kept. Defaults to PROCESS_BACKEND.
+
+        """
+        self.default = default
+        self.policies = {name.lower(): policy for name, policy in (policies or {}).items()}
+        self.backend = backend or PROCESS_BACKEND
+
+    def policy(self, host: str) -> HostPolicy:
+        """Give the policy of a host, ex: for www.example.com the one of www.example.com, else example.com, else com."""
+        parts = host.split(":", 1)[0].split(".")
+        for i in range(len(parts)):
+            name = ".".join(parts[i:])
+            if name in self.policies:
+                return self.policies[name]
+        return self.default
+
+    def try_acquire(self, url: str) -> float:
+        """Start an open of url's host if its policy allows it now, release it once done.
+
+        Returns:
+        -------
+            float: 0.0 if it was started, else seconds until it may be.
+
+        """
+        name = host(url)
+        return self.backend.try_acquire(name, self.policy(name))
+
+    def try_acquire_any(self, urls: _typing.Sequence[str]) -> tuple[int | None, float]:
+        """Start an open of the first url whose host allows it now, the others wait, so work is not stuck behind a throttled host.
+
+        Returns:
+        -------
+            tuple[int | None, float]: position of the url started, None if none could be, and seconds until one may be.
+
+        """
+        wait = RETRY_INTERVAL
+        tried: dict[str, float] = {}
+        for index, url in enumerate(urls):
+            name = host(url)
+            if name in tried:
+                continue
+            tried[name] = self.backend.try_acquire(name, self.policy(name))
+            if tried[name] == 0.0:
+                return index, 0.0
+        if tried:
+            wait = min(tried.values())
+        return None, wait
+
+    def release(self, url: str) -> None:
+        """End an open of url's host, started by try_acquire or acquire."""
+        self.backend.release(host(url))
+
+    def acquire(self, url: str, timeout: float | None = None) -> None:
+        """Wait until an open of url's host can start, and start it, release it once done.
+
+        Raises:
+        ------
+            CommandTimeout: it could not start within timeout.
+
+        """
+        deadline = None if timeout is None else _time.monotonic() + timeout
+        while True:
+            wait = self.try_acquire(url)
+            if wait == 0.0:
+                return
+            if deadline is not None:
+                if _time.monotonic() + wait > deadline:
+                    raise CommandTimeout(
+                        f"{host(url)} was throttled for more than {timeout=} seconds."
+                    )
+            logger.trace(f"Throttled {host(url)}, waiting {wait:.3f} seconds.")
+            _time.sleep(wait)
+
+    @_contextlib.contextmanager
+    def slot(self, url: str, timeout: float | None = None) -> _typing.Iterator[None]:
+        """Hold an open of url's host while in the with block, see acquire."""
+        self.acquire(url, timeout)
+        try:
+            yield
+        finally:
+            self.release(url)
+
+    def open(
+        self,
+        driver: _typing.Any,
+        url: str,
+        wait_until: str = "load",
+        timeout: float | None = None,
+    ) -> None:
+        """Open url with driver once its host allows it, see Driver.open, timeout is for the wait and the open together."""
+        deadline = None if timeout is None else _time.monotonic() + timeout
+        with self.slot(url, timeout):
+            if deadline is not None:
+                timeout = max(deadline - _time.monotonic(), 0.0)
+            driver.open(url, wait_until=wait_until, timeout=timeout)
+
+
+__all__ = [
+    "HostPolicy",
+    "MemoryBackend",
+    "FileBackend",
+    "PROCESS_BACKEND",
+    "Scheduler",
+    "host",
+]
@@ -16,10 +16,16 @@ import enum as _enum
 import multiprocessing as _multiprocessing
 import math as _math
 import importlib as _importlib
+import json as _json
+import os as _os
+import queue as _queue
+import itertools as _itertools
+import tempfile as _tempfile
 
 # import Qt
 from PyQt6 import (
     QtCore as _QtCore,
+    QtGui as _QtGui,
     QtWidgets as _QtWidgets,
     QtWebEngineWidgets as _QtWebEngineWidgets,
     QtWebEngineCore as _QtWebEngineCore,
@@ -29,9 +35,13 @@ from PyQt6 import (
 from .exception import (
     JavascriptException,
     InvalidSelectorType,
+    InternalWidgitNotFound,
     NullPageError,
     SetPageEror,
     DataNotGiven,
+    CommandTimeout,
+    NavigationFailed,
+    FrameDetached,
 )
 
 # import logger
@@ -39,6 +49,46 @@ from .logger import logger
 
 from .comms import DriverComs
 
+# clock shared with the driver, for command timings.
+from .metrics import now as _now
+
+# import tracer
+from .tracing import Tracer as _Tracer
+
+# import network hooks, and the archive used for record/replay.
+from .archive import Archive as _Archive
+from .network import (
+    RequestInterceptor as _RequestInterceptor,
+    ArchiveSchemeHandler as _ArchiveSchemeHandler,
+    register_archive_schemes as _register_archive_schemes,
+)
+
+# import the page which reports page events, the helper runtime, and the navigation lifecycle.
+from .page import (
+    BridgePage as _BridgePage,
+    Lifecycle as _Lifecycle,
+    JAVASCRIPT_RUNTIME as _JAVASCRIPT_RUNTIME,
+    RUNTIME_MISSING as _RUNTIME_MISSING,
+    WORLDS as _WORLDS,
+    runtime_call as _runtime_call,
+    make_script as _make_script,
+)
+
+# import the cookies and storage snapshots.
+from .session import SessionStore as _SessionStore, loads as _loads_session
+
+# import the command registry.
+from . import commands as _commands
+
+# import the performance profiles.
+from . import performance as _performance
+
+# import the download manager.
+from .downloads import DownloadManager as _DownloadManager
+
+# import the performance timing buffer.
+from .timings import TimingBuffer as _TimingBuffer, QT_LOAD as _QT_LOAD
+
 
 class WindowMode(_enum.IntEnum):
     WINDOWED = 0
@@ -53,6 +103,17 @@ class WindowMode(_enum.IntEnum):
     MAXIMIZED_ON_BOTTOM = 9
 
 
+class _Command(_typing.NamedTuple):
+    """A command received from the driver, queued or in flight."""
+
+    id: int
+    name: str  # name in STR_TO_COMMAND, ex: js
+    arg: str
+    frame: int | None  # handle of the frame it runs in, None for the page.
+    deadline: float | None  # monotonic time it is abandoned at, None for never.
+    timings: dict[str, float]  # received, started and finished, sent back to the driver.
+
+
 class Remote(_QtWebEngineWidgets.QWebEngineView):
     """The Remote Qt Session Host.
 
@@ -65,22 +126,78 @@ class Remote(_QtWebEngineWidgets.QWebEngineView):
         # required
         "starting_url": ..., # url/QWebEnginePage where the remote will start
         "connection_port": ..., # the port where the remote will connect to, and listen to commands.
+        "connection_host": ..., # the driver's address, localhost without it.
+        "connection_token": ..., # given to the driver in the hello, so it knows this is its remote.
 
         # optional
         "window_mode": ..., # one of the WindowMode _enum
         "flags": ..., # list of qt.WindowType Flags.
         "wait_for_load": ... # True or False.
+        "archive": ..., # path of a network archive, see seleniumqt.archive.Archive
+        "archive_mode": ..., # "record" to record the network into archive, "replay" to serve pages only from it.
+        "headless": ..., # True to render offscreen, with no window, ex: for tests and CI.
+        "max_concurrent_scripts": ..., # javascript commands run at once on the page, see MAX_CONCURRENT_SCRIPTS.
+        "init_scripts": ..., # [{"name": ..., "source": ..., "world": ..., "subframes": ...}], run in every new document.
+        "session": ..., # blob of Driver.export_session, restored before starting_url is opened.
+        "idle_state": ..., # "frozen" or "discarded", the state a hidden page is put in when idle, see IDLE_AFTER.
+        "idle_after": ..., # seconds without a command before the page is idle.
+        "plugins": ..., # modules imported on start, which add commands, see seleniumqt.commands.
+        "performance_profile": ..., # "default", "scrape" or "minimal", settings and chromium flags, see seleniumqt.performance.
+        "web_settings": ..., # {WebAttribute name: bool}, set over the profile's.
+        "chromium_flags": ..., # {flag: value, True for none, False to remove}, set over the profile's.
+        "download_dir": ..., # where downloads are saved, a new temporary directory without it.
+        "max_parallel_downloads": ..., # downloads running at once, see MAX_PARALLEL_DOWNLOADS.
+        "timings_buffer": ..., # performance entries kept for the driver, 0 to not collect them, see seleniumqt.timings.
+        "dom_events": ..., # True to send the driver "dom_mutated" events, see the Events section.
     })
     # this will return the process Object where the Remote is running.
     ```
 
+    ## Commands
+    commands are queued as they arrive, and replied to as they finish, which
+    need not be the order they were sent in.
+    - js, dom_changes: run alongside others of their kind, up to MAX_CONCURRENT_SCRIPTS at once.
+    - current_url, trace, timings: run as soon as the page is ready, even while scripts are running.
+    - every other command is exclusive, it waits for the commands before it
+      to finish, and the commands after it wait for it.
+
+    js and click run in the frame given in the request's "frame" header, a
+    handle from the frames command, or in the page without it.
+
+    the commands registered by the "plugins" run like the builtin ones, concurrent
+    ones like js. their opcodes are sent to the driver in a hello message, the
+    first message on the connection: `{"id": None, "status": "hello", "commands": {name: opcode}, "token": ...}`.
+
+    ## Events
+    remote also sends the driver events, which reply to no command, as they happen:
+    `{"id": None, "status": "event", "event": name}` with a json payload, ex: the
+    "download" events of seleniumqt.downloads.DownloadManager.
+    - navigation: `{"signal": "urlChanged" or "loadStarted", "url": ...}`, as qt emits them.
+    - dom_mutated: `{"url": ...}`, the dom of a frame changed, with "dom_events", at
+      most every seleniumqt.page.MUTATION_INTERVAL milliseconds per frame.
+
     """
 
     # ---------------------------------------------constants----------------------------------------------
     # define class Scope Global constants.
     COMMAND_POLL_INTERVAL: int = 100  # once every 100 milliseconds.
     COMMAND_RESERVED_LENGTH: int = 2
-    CONSOLE_POLL_TIME = 1000  # once every second.
+
+    # exit code of remote when the renderer process crashes, a supervised driver restarts it.
+    RENDERER_CRASHED_EXIT_CODE: int = 3
+
+    # javascript commands in flight at once on the page, unless the "max_concurrent_scripts" config is given.
+    MAX_CONCURRENT_SCRIPTS: int = 8
+
+    # downloads running at once, unless the "max_parallel_downloads" config is given.
+    MAX_PARALLEL_DOWNLOADS: int = 4
+
+    # seconds without a command before a hidden page is frozen or discarded, if "idle_state" is given.
+    IDLE_AFTER: float = 30.0
+
+    # commands which can run alongside others, every other command is exclusive.
+    CONCURRENT_COMMANDS: tuple[str, ...] = ("js", "dom_changes")
+    IMMEDIATE_COMMANDS: tuple[str, ...] = ("current_url", "trace", "timings")
 
     # a special None Type, this is used
     # to distinguish whether a command
@@ -90,33 +207,9 @@ class Remote(_QtWebEngineWidgets.QWebEngineView):
         pass  # it is `__` private so that it can't be given as custom return of some kind.
 
     # ---------------------------------------------javascript---------------------------------------------
-    JAVASCRIPT_GET_ELEMENT_POS_CSS = """
-    (()=>{{
-        try{{
-            var elm = document.querySelector("{css_selector}");
-            if (elm == null){{
-                return "JavascriptException, cannot find element, with css selector: "+"{css_selector}";
-            }};
-            var box = elm.getBoundingClientRect();
-            return (box.right+((box.right-box.left)/2)).toString()+','+(box.top+((box.bottom-box.top)/2)).toString();
-        }} catch (err) {{
-            return "JavascriptException, exception: "+err.message;
-        }}
-    }})()
-    """
-
-    JAVASCRIPT_GET_ELEMENT_POS_XPATH = """
-    (()=>{{
-        try{{
-            var elm = document.evaluate("{xpath_selector}", document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
-            var box = elm.getBoundingClientRect();
-            return (box.right+((box.right-box.left)/2)).toString()+','+(box.top+((box.bottom-box.top)/2)).toString();
-        }} catch(err){{
-            return "JavascriptException, exception: "+err.message;
-        }}
-    }})
-    """
-
+    # helpers, ex: finding an element, are in the runtime every document gets, see seleniumqt.page.
+    # the scripts given to execute_script run in the page's own world, which the runtime is hidden
+    # from, so they are still wrapped in this shell, to give their exceptions back.
     JAVASCRIPT_EXECUTION_SHELL = """
     (() =>{{
         try {{
@@ -127,80 +220,116 @@ class Remote(_QtWebEngineWidgets.QWebEngineView):
     }})();
     """
 
-    CONSOLE_JAVASCRIPT = """
-    (()=>{{
-        try{{
-            if (!("logs" in console)){{
-                console.slogs = console.log.bind(console);
-                console.logs = []
-                console.log = ((...args)=>{{
-                    console.logs.push(args);
-                    console.slogs(...args);
-                }});
-            }};
-            return console.logs;
-        }} catch (err){{
-            return "JavascriptException"+err.message;
-        }}
-    }})()
-    """
-
     # -----------------------------------------utility functions------------------------------------------
     def __raise(self, e: Exception):
         logger.exception(str(e))
         raise e
 
-    def __get_element_pos_callback(self, res):
-        """Set Callback for getting the position of elements using javascript, for __click_element function.
+    def __send_click(self, x: float, y: float) -> None:
+        """Send a move, press and release QMouseEvent at (x, y) to the widgit which renders the page.
+
+        The events are sent, not posted, so they have all been delivered when this returns.
 
         Args:
         ----
-            res (str): the resulting point.
+            x (float): x position in css pixels, relative to the viewport.
+            y (float): y position in css pixels, relative to the viewport.
 
         """
-        res = str(res)  # convert the res to be for sure str
-        # in case it is given in some other format.
+        target = self.focusProxy()
+        if target is None:
+            self.__raise(
+                InternalWidgitNotFound("The render widgit of the view was not found.")
+            )
 
-        if res.startswith("JavascriptException"):
-            self.__raise(JavascriptException(res, self.__console))
-        self._element_pos = res.split(",")
+        # css pixels are scaled by the page zoom, widgit pixels are not.
+        pos = _QtCore.QPointF(x * self.zoomFactor(), y * self.zoomFactor())
+        global_pos = target.mapToGlobal(pos)
+
+        for event_type, button, buttons in (
+            (
+                _QtCore.QEvent.Type.MouseMove,
+                _QtCore.Qt.MouseButton.NoButton,
+                _QtCore.Qt.MouseButton.NoButton,
+            ),
+            (
+                _QtCore.QEvent.Type.MouseButtonPress,
+                _QtCore.Qt.MouseButton.LeftButton,
+                _QtCore.Qt.MouseButton.LeftButton,
+            ),
+            (
+                _QtCore.QEvent.Type.MouseButtonRelease,
+                _QtCore.Qt.MouseButton.LeftButton,
+                _QtCore.Qt.MouseButton.NoButton,
+            ),
+        ):
+            _QtWidgets.QApplication.sendEvent(
+                target,
+                _QtGui.QMouseEvent(
+                    event_type,
+                    pos,
+                    global_pos,
+                    button,
+                    buttons,
+                    _QtCore.Qt.KeyboardModifier.NoModifier,
+                ),
+            )
 
-    def __get_element_pos(
-        self,
-        _type: _typing.Literal["css "] | _typing.Literal["xpath"] | str,
-        selector: str,
+    def __resolve(
+        self, result: _typing.Any, request_id: int | None | _typing.Any = __Nothing
     ) -> None:
-        """Set callback to Get the position of Element by selector.
+        """Set the result of a command, and queue its reply for remote-sender.
+
+        A result given for a request which is no longer in flight, ex: one which was
+        abandoned at its deadline, is dropped so it can't be sent twice.
 
         Args:
         ----
-            _type (_typing.Literal['css '] | _typing.Literal['xpath']): type of selector, either css or xpath
-            selector (str): selector to get the element.
+            result (str | Exception): the result, an Exception is sent to the driver as an error.
+            request_id (int, optional): the request the result is for. Defaults to the one being dispatched.
 
         """
+        if request_id is self.__Nothing:
+            request_id = self._request_id
+
+        command = self._in_flight.pop(request_id, None)
+        if command is None:
+            logger.warning(f"Dropping late result for {request_id=}: {result=}")
+            return
+
+        command.timings["finished"] = _now()
+
+        if isinstance(result, CommandTimeout):
+            reply = {"id": command.id, "status": "timeout"}
+        elif isinstance(result, BaseException):
+            reply = {
+                "id": command.id,
+                "status": "error",
+                "error": type(result).__name__,
+            }
+        else:
+            reply = {"id": command.id, "status": "ok"}
+        reply["timings"] = command.timings
+
+        self.tracer.complete(
+            f"request {command.name}",
+            command.timings["received"],
+            command.timings["finished"],
+            args={"id": command.id, "status": reply["status"]},
+        )
 
-        script: _typing.Any | str = None
-        match _type:
-            case "css ":
-                script = self.JAVASCRIPT_GET_ELEMENT_POS_CSS.format(
-                    css_selector=selector
-                )
-            case "xpath":
-                script = self.JAVASCRIPT_GET_ELEMENT_POS_XPATH.format(
-                    xpath_selector=selector
-                )
-            case _:
-                self.__raise(InvalidSelectorType(f"{_type=}"))
-
-        logger.trace(f"Running Javascript: {script=}")
-        self.__ensure_page().runJavaScript(
-            script,
-            resultCallback=self.__get_element_pos_callback,
+        self._replies.put(
+            (reply, str(result).encode("utf-8") if result != None else b"")
         )
 
-    def __update_console(self, console):
-        console = str(console)
-        self.__console = console
+    def __emit(self, event: str, data: dict) -> None:
+        """Send the driver an event, see the Events section of the class."""
+        self._replies.put(
+            (
+                {"id": None, "status": "event", "event": event},
+                _json.dumps(data).encode("utf-8"),
+            )
+        )
 
     def __show(self) -> None:
         window_mode = self.__get_data("window_mode")
@@ -275,6 +404,166 @@ class Remote(_QtWebEngineWidgets.QWebEngineView):
         else:  # if the config is not given, windowed will automatically be applied.
             self.show()
 
+    def __setup_network(self) -> None:
+        """Install the request interceptor on the profile, and the archive if one is configured."""
+        profile = self.__ensure_page().profile()
+
+        self.interceptor = _RequestInterceptor(self)
+        profile.setUrlRequestInterceptor(self.interceptor)
+        self.interceptor.add_listener(self.__request_started)
+
+        self.archive: _Archive | None = None
+        archive_path = self.__get_data("archive")
+        if not archive_path:
+            return
+
+        archive_mode = self.__get_data("archive_mode") or "replay"
+        match archive_mode:
+            case "record":
+                self.archive = _Archive(archive_path, "w")
+                # flush the index after every page, so the archive is usable even if remote is killed.
+                self.loadFinished.connect(lambda _: self.archive.flush())
+            case "replay":
+                self.archive = _Archive(archive_path, "r")
+            case _:
+                self.__raise(ValueError(f"{archive_mode=} is not one of 'record', 'replay'"))
+
+        self._archive_handler = _ArchiveSchemeHandler(
+            self.archive, record=(archive_mode == "record"), parent=self
+        )
+        self._archive_handler.install(profile, self.interceptor)
+
+    def __run_javascript(
+        self,
+        script: str,
+        callback: _typing.Callable[[_typing.Any], None],
+        name: str = "script",
+        world: str = "main",
+        frame: int | None = None,
+    ) -> None:
+        """Run javascript on the page, or one of its frames, the time until its callback fires is traced.
+
+        Args:
+        ----
+            script (str): the javascript.
+            callback (Callable[[Any], None]): given the result of the script.
+            name (str, optional): name of the span in the trace. Defaults to "script".
+            world (str, optional): one of seleniumqt.page.WORLDS. Defaults to "main".
+            frame (int | None, optional): handle of the frame, see __frames. Defaults to None, the page.
+
+        Raises:
+        ------
+            FrameDetached: the frame is no longer in the page.
+
+        """
+        target = self.__ensure_page() if frame is None else self.__frame(frame)[0]
+        start = _now()
+
+        def traced_callback(result):
+            self.tracer.complete(
+                f"runJavaScript {name}", start, _now(), cat="javascript"
+            )
+            callback(result)
+
+        target.runJavaScript(script, _WORLDS[world].value, traced_callback)
+
+    def __call_runtime(
+        self,
+        call: str,
+        callback: _typing.Callable[[_typing.Any], None],
+        name: str,
+        frame: int | None = None,
+    ) -> None:
+        """Call a helper of the runtime, in the isolated world.
+
+        a document without the runtime, ex: of a page given by set_page, gets it first.
+
+        Args:
+        ----
+            call (str): the call, see seleniumqt.page.runtime_call.
+            callback (Callable[[Any], None]): given the result of the call.
+            name (str): name of the span in the trace.
+            frame (int | None, optional): handle of the frame, see __frames. Defaults to None, the page.
+
+        """
+        script = _runtime_call(call)
+
+        def runtime_callback(result):
+            if result == _RUNTIME_MISSING:
+                logger.debug(f"Installing the runtime, for {call=}")
+                try:
+                    self.__run_javascript(
+                        _JAVASCRIPT_RUNTIME + script, callback, name, "isolated", frame
+                    )
+                except FrameDetached as e:
+                    callback(f"JavascriptException, {e}")
+                return
+            callback(result)
+
+        self.__run_javascript(script, runtime_callback, name, "isolated", frame)
+
+    # -------------------------------------------------frames-------------------------------------------------
+    def __frame(
+        self, handle: int
+    ) -> tuple[_QtWebEngineCore.QWebEngineFrame, int | None]:
+        """Give the frame of a handle, and the handle of its parent, None if it is the page's main frame.
+
+        Raises:
+        ------
+            FrameDetached: the frame is no longer in the page, or the handle was never given.
+
+        """
+        entry = self._frames.get(handle)
+        if (entry is None) or (not entry[0].isValid()):
+            self._frames.pop(handle, None)
+            raise FrameDetached(f"frame {handle=} is not in the page, get the frames again.")
+        return entry
+
+    def __frame_offset(
+        self,
+        handle: int,
+        callback: _typing.Callable[[tuple[float, float] | Exception], None],
+    ) -> None:
+        """Give callback where a frame's viewport is in the page's viewport, or the exception which stopped it.
+
+        each parent is asked where the element of its child frame is, so a
+        cross origin frame works, its own document is never read.
+        """
+        try:
+            frame, parent = self.__frame(handle)
+        except FrameDetached as e:
+            callback(e)
+            return
+
+        def offset_in_parent(result):
+            result = str(result)
+            if result.startswith("JavascriptException"):
+                callback(JavascriptException(result))
+                return
+            x, y = (float(value) for value in result.split(","))
+            if parent is None:
+                callback((x, y))
+                return
+            self.__frame_offset(
+                parent,
+                lambda offset: callback(
+                    offset
+                    if isinstance(offset, Exception)
+                    else (offset[0] + x, offset[1] + y)
+                ),
+            )
+
+        self.__call_runtime(
+            f"frameOffset({_json.dumps(frame.htmlName())}, {_json.dumps(frame.url().toString())})",
+            offset_in_parent,
+            "frame offset",
+            parent,
+        )
+
+    def __console(self) -> str:
+        """Give the console messages of the page, most recent last."""
+        return "\n".join(getattr(self.__ensure_page(), "console", []))
+
     def __ensure_page(self) -> _QtWebEngineCore.QWebEnginePage:
         page: _typing.Any = self.page()
         if page == None:
@@ -284,46 +573,43 @@ class Remote(_QtWebEngineWidgets.QWebEngineView):
 
     # ------------------------------------command execution functions-------------------------------------
     @logger.catch(reraise=True)
-    def __run_js(self, script_file_name: str) -> bool:
-        """Execute the Given Javascript file.
+    def __run_js(self, script: str) -> bool:
+        """Execute the Given Javascript.
 
         Args:
         ----
-            script_file_name (str): the path to the javascript file which is to be run.
+            script (str): the source of the javascript to run, sent as the command's payload.
 
         """
-        # load script from file.
-        try:
-            script = open(script_file_name, "r").read()
-        except Exception:
-            logger.exception(
-                f"Threre was a problem when reading the script file: {script_file_name=}"
-            )
-            self.__raise(IOError(f"File: {script_file_name=} not found."))
-
         def return_callback(result: str):
             result = str(
                 result
             )  # convert the result to str if it is given in some other format.
 
             if result.startswith("JavascriptException"):
-                logger.exception("This Here.")
-                self.__raise(
+                logger.error(f"There was a problem with the javascript: {result}")
+                self.__resolve(
                     JavascriptException(
                         "There was a problem with the javascript",
                         result,
-                        str(self.__console),
-                    )
+                        self.__console(),
+                    ),
+                    request_id,
                 )
+                return
+
+            self.__resolve(result, request_id)
 
-            self.result: _typing.Any = result  # type: ignore
+        request_id = self._request_id
 
         logger.info(f"Running {script=}")
         logger.trace(f"Starting to run {script=}")
 
-        self.__ensure_page().runJavaScript(
+        self.__run_javascript(
             self.JAVASCRIPT_EXECUTION_SHELL.format(script=script),
-            resultCallback=return_callback,
+            return_callback,
+            "js",
+            frame=self._frame,
         )
 
         logger.trace(f"Done Running {script=}")
@@ -333,59 +619,144 @@ class Remote(_QtWebEngineWidgets.QWebEngineView):
     def __go_to_url(self, url: str) -> bool:
         """Change the url as per the argument given with setUrl.
 
+        a plain url is resolved as soon as it is set, a json argument
+        `{"url": ..., "wait_until": ...}` is resolved by __check_lifecycle, once
+        the page has reached that state, see seleniumqt.page.Lifecycle.
+
         Args:
         ----
             url (str): the url given by the driver.
 
         """
+        wait_until = None
+        if url.startswith("{"):
+            request = _json.loads(url)
+            url, wait_until = request["url"], request["wait_until"]
+
         logger.info(
-            f"Changing Url to {url=} from {self.__ensure_page().url().toString()=}"
+            f"Changing Url to {url=} from {self.__ensure_page().url().toString()=}, {wait_until=}"
         )
 
+        if wait_until is not None:
+            # created before setUrl, the navigation's first signals may be emitted by it.
+            self._lifecycle = _Lifecycle(url, wait_until, self._request_id)
+
         logger.trace(f"Setting Url to {url=}")
         self.setUrl(_QtCore.QUrl(url))
         logger.trace(f"Setting Url to {url=}")
 
-        self.result = "done"
+        if wait_until is None:
+            self.__resolve("done")
 
         return True
 
     @logger.catch(reraise=True)
     def __click_element(self, selector: str) -> bool:
-        """Send a QMouseClick Event to the QApplication, at the point of the element's position.
-
-        The element is gotten from the selector.
+        """Click on the center of an element with real QMouseEvents, in one javascript round trip.
 
         Args:
         ----
-            selector (str): Selector for the element must be in the format: '<4-letter-type-code, ex: 'css ','xpath'><the-actual-selector>'
+            selector (str): Selector for the element must be in the format: '<type-code, 'css ' or 'xpath'><scroll_into_view, '1' or '0'><the-actual-selector>'
 
         """
-        if self._element_pos == None:
-            if not self._element_pos_started:
-                self._element_pos_started: bool = True
-                self.__get_element_pos(selector[:4], selector[4:])
-            return False
+        if selector.startswith("xpath"):
+            _type, selector = "xpath", selector[5:]
+        elif selector.startswith("css "):
+            _type, selector = "css", selector[4:]
+        else:
+            self.__raise(InvalidSelectorType(f"{selector[:5]=}"))
+        scroll_into_view, selector = selector[:1] == "1", selector[1:]
+
+        call = (
+            f"center({_json.dumps(_type)}, {_json.dumps(selector)}, "
+            f"{_json.dumps(scroll_into_view)})"
+        )
 
-        self._element_pos = None
-        self._element_pos_started = False
+        request_id, frame = self._request_id, self._frame
+
+        def click_at(offset):
+            if isinstance(offset, Exception):
+                logger.error(f"Could not click {selector=}: {offset}")
+                self.__resolve(offset, request_id)
+                return
+
+            if request_id not in self._in_flight:
+                # the click was abandoned, it must not happen after the deadline.
+                logger.warning(f"Not clicking {selector=}, {request_id=} was abandoned.")
+                return
+
+            x, y = offset
+            try:
+                self.__send_click(x, y)
+            except InternalWidgitNotFound as e:
+                self.__resolve(e, request_id)
+                return
+            logger.trace(f"Clicked {selector=} at {x=} {y=}")
+            self.__resolve("done", request_id)
+
+        def click_callback(res):
+            res = str(res)  # convert the res to be for sure str
+
+            if res.startswith("JavascriptException"):
+                click_at(JavascriptException(res))
+                return
+
+            x, y = (float(value) for value in res.split(","))
+            if frame is None:
+                click_at((x, y))
+                return
+            # the center is in the frame's viewport, the click is given in the page's.
+            self.__frame_offset(
+                frame,
+                lambda offset: click_at(
+                    offset
+                    if isinstance(offset, Exception)
+                    else (offset[0] + x, offset[1] + y)
+                ),
+            )
 
-        click = _QtCore.QEvent(_QtCore.QEvent.Type.MouseButtonPress)
-        _QtWidgets.QApplication.postEvent(self, click)
-        self.result = "done"
+        logger.trace(f"Calling the runtime: {call=}")
+        self.__call_runtime(call, click_callback, "click", frame)
 
         return True
 
+    def __dom_changes(self, arg: str) -> bool:
+        """Give the dom changes under the watched element since a cursor, or a snapshot of it, see Driver.watch_dom.
+
+        Args:
+        ----
+            arg (str): json {"type": "css" or "xpath", "selector": ..., "since": ..., "resync": ..., "limit": ...}
+
+        """
+        query = _json.loads(arg)
+        call = "changes({})".format(
+            ", ".join(
+                _json.dumps(query[key])
+                for key in ("type", "selector", "since", "resync", "limit")
+            )
+        )
+        request_id = self._request_id
+
+        def changes_callback(result):
+            result = str(result)
+            if result.startswith("JavascriptException"):
+                self.__resolve(JavascriptException(result), request_id)
+                return
+            self.__resolve(result, request_id)
+
+        self.__call_runtime(call, changes_callback, "dom_changes", self._frame)
+        return True
+
     @logger.catch(reraise=True)
     def __hide(self, arg: _typing.Literal[""] = "") -> bool:
         self.hide()
-        self.result = "done"
+        self.__resolve("done")
         return True
 
     @logger.catch(reraise=True)
     def __show_window(self, arg: _typing.Literal[""] = "") -> bool:
         self.__show()
-        self.result = "done"
+        self.__resolve("done")
         return True
 
     @logger.catch(reraise=True)
@@ -394,18 +765,140 @@ class Remote(_QtWebEngineWidgets.QWebEngineView):
             self.setPage(_importlib.import_module(page_script).page)
         except Exception:
             self.__raise(SetPageEror(f"{page_script=}"))
-        self.result = "done"
+        self.__ensure_page().renderProcessTerminated.connect(
+            self.__render_process_terminated
+        )
+        for init_script in self._init_scripts:
+            self.__ensure_page().scripts().insert(_make_script(**init_script))
+        self._frames.clear()  # they were frames of the old page.
+        self.__resolve("done")
+        return True
+
+    @logger.catch(reraise=True)
+    def __add_init_script(self, init_script: str) -> bool:
+        """Add a script which runs in every new document, from the next one on.
+
+        Args:
+        ----
+            init_script (str): json `{"name": ..., "source": ..., "world": ..., "subframes": ...}`, see seleniumqt.page.make_script.
+
+        """
+        init_script = _json.loads(init_script)
+        self.__ensure_page().scripts().insert(_make_script(**init_script))
+        self._init_scripts.append(init_script)
+        self.__resolve("done")
+        return True
+
+    @logger.catch(reraise=True)
+    def __frames(self, arg: _typing.Literal[""] = "") -> bool:
+        """Give every frame in the page as json, with the handle commands are given it by.
+
+        a frame keeps its handle until it is detached, ex: when the page navigates.
+        """
+        page = self.__ensure_page()
+        if not hasattr(page, "mainFrame"):
+            self.__raise(
+                NotImplementedError("frames need QWebEngineFrame, of qt 6.8 or later.")
+            )
+
+        # forget detached frames, their handles are not given again.
+        self._frames = {
+            handle: entry
+            for handle, entry in self._frames.items()
+            if entry[0].isValid()
+        }
+        listed = []
+
+        def walk(frame: _QtWebEngineCore.QWebEngineFrame, parent: int | None) -> None:
+            for child in frame.children():
+                handle = next(
+                    (
+                        handle
+                        for handle, (known, _) in self._frames.items()
+                        if known == child
+                    ),
+                    None,
+                )
+                if handle is None:
+                    handle = next(self._frame_handles)
+                    self._frames[handle] = (child, parent)
+                listed.append(
+                    {
+                        "handle": handle,
+                        "name": child.name(),
+                        "html_name": child.htmlName(),
+                        "url": child.url().toString(),
+                        "parent": parent,
+                    }
+                )
+                walk(child, handle)
+
+        walk(page.mainFrame(), None)
+        self.__resolve(_json.dumps(listed))
+        return True
+
+    @logger.catch(reraise=True)
+    def __export_session(self, origins: str) -> bool:
+        """Give the cookies, and the storage of the page's origin and of origins, as json.
+
+        Args:
+        ----
+            origins (str): json list of more origins to export the localStorage of.
+
+        """
+        request_id = self._request_id
+        self.session.export_session(
+            self.__ensure_page(),
+            _json.loads(origins) if origins else None,
+            lambda session: self.__resolve(_json.dumps(session), request_id),
+        )
+        return True
+
+    @logger.catch(reraise=True)
+    def __import_session(self, session: str) -> bool:
+        """Restore a session given as json, see seleniumqt.session.SessionStore."""
+        request_id = self._request_id
+        self.session.import_session(
+            self.__ensure_page(),
+            _json.loads(session),
+            lambda: self.__resolve("done", request_id),
+        )
+        return True
+
+    @logger.catch(reraise=True)
+    def __clear_cookies(self, arg: _typing.Literal[""] = "") -> bool:
+        """Delete every cookie of the profile, see seleniumqt.session.SessionStore.clear_cookies."""
+        self.session.clear_cookies()
+        self.__resolve("done")
         return True
 
     @logger.catch(reraise=True)
     def __close(self, arg: _typing.Literal[""] = "") -> _typing.NoReturn:
+        if self.archive is not None:
+            self.archive.close()
         self.close()
         self.conn.close()
         raise SystemExit(0)
 
+    @logger.catch(reraise=True)
+    def __timings(self, arg: str) -> bool:
+        """Give the performance entries after a cursor, as json, see seleniumqt.timings.TimingBuffer.since."""
+        query = _json.loads(arg or "{}")
+        self.__resolve(
+            _json.dumps(
+                self.timings.since(query.get("since", 0), query.get("types"))._asdict()
+            )
+        )
+        return True
+
+    def __trace(self, arg: _typing.Literal[""] = "") -> bool:
+        """Give remote's trace events as json, for the driver to merge with its own."""
+        self.__resolve(_json.dumps(self.tracer.events()))
+        return True
+
     @logger.catch(reraise=True)
     def __current_url(self, arg: _typing.Literal[""] = "") -> bool:
-        self.result = self.__ensure_page().url().toString()
+        self.__resolve(self.__ensure_page().url().toString())
         return True
 
     # -------------------------------------driver communication logic-------------------------------------
@@ -413,29 +906,57 @@ class Remote(_QtWebEngineWidgets.QWebEngineView):
         """Poll self.conn.
 
         This function runs in a seperate thread, here it continously listens for any
-        commands that are given by the driver, and updates the self.command property
-        accordingly.
+        commands that are given by the driver, and queues them for __recurrent. it
+        does not wait for their results, remote-sender sends those.
         """
         logger.info("Started Remote Command Client")
 
-        self._conn = DriverComs(self.conn)
-
         while self.conn:
-            message: bytes = self._conn.recv()
-            self.command = message.decode("utf-8")
-            logger.info(f"Executing Command: {self.command}")
-
-            while self.result == self.__Nothing:
-                _time.sleep(0.5)
-
-            self._conn.send(
-                self.result.encode("utf-8") if self.result != None else b''
+            try:
+                header, arg = self._conn.recv_message()
+            except (ConnectionError, OSError, ValueError):
+                logger.warning("Driver closed the connection.")
+                break
+
+            # timestamps of each phase of the command, the driver turns them into metrics.
+            name, _ = self.STR_TO_COMMAND.get(
+                header["op"], (f"unknown {header['op']}", None)
             )
-            self.result = self.__Nothing
+            command = _Command(
+                header["id"],
+                name,
+                header["op"] + arg.decode("utf-8"),
+                header.get("frame"),
+                (
+                    None
+                    if header.get("timeout") is None
+                    else _time.monotonic() + header["timeout"]
+                ),
+                {"received": _now()},
+            )
+            logger.info(f"Queueing Command: {command.name} {command.id=}")
+
+            with self._queue_lock:
+                self._queue.append(command)
 
         logger.warning("Closing Remote Client.")
+        self._replies.put(None)
         self.close()  # when the connection is close we want qt to close as well.
 
+    def remote_sender(self) -> None:
+        """Send the replies queued by __resolve, in the order the commands finished.
+
+        This function runs in a seperate thread, so a large reply does not block qt.
+        """
+        while (item := self._replies.get()) is not None:
+            reply, payload = item
+            try:
+                self._conn.send_message(reply, payload)
+            except (ConnectionError, OSError):
+                logger.warning("Driver closed the connection.")
+                break
+        logger.warning("Closing Remote Sender.")
+
     def __set_timer(self) -> None:
         """Set slef.timer for recurrent function.
 
@@ -460,37 +981,302 @@ class Remote(_QtWebEngineWidgets.QWebEngineView):
 
         runs in the same thread and process as qt. it is run once every COMMAND_POLL_INTERVAL by the timer.
         """
-        # only run if a command is given and the remote worker is ready to execute it.
-        if (self.ready) and (self.command != ""):
-            if self.STR_TO_COMMAND[
-                self.command[: self.COMMAND_RESERVED_LENGTH]
-            ][1](self.command[self.COMMAND_RESERVED_LENGTH :]):
-                self.command = ""  # reset the command property when done.
+        # a tick much later than COMMAND_POLL_INTERVAL means the qt event loop was blocked.
+        tick = _now()
+        if (tick - self._last_tick) > (2 * self.COMMAND_POLL_INTERVAL / 1000):
+            self.tracer.complete(
+                "event loop stall",
+                self._last_tick + (self.COMMAND_POLL_INTERVAL / 1000),
+                tick,
+                cat="qt",
+            )
+        self._last_tick = tick
+
+        # abandon requests once their deadline has passed, whether or not they were started.
+        # this is checked before ready, so a page which never finishes loading can't block them.
+        now = _time.monotonic()
+
+        def passed(command: _Command) -> bool:
+            return (command.deadline is not None) and (now > command.deadline)
+
+        expired = [command for command in self._in_flight.values() if passed(command)]
+        with self._queue_lock:
+            queued = [command for command in self._queue if passed(command)]
+            for command in queued:
+                self._queue.remove(command)
+        for command in queued:
+            # resolved like a started command, so the driver gets its timeout.
+            self._in_flight[command.id] = command
+        expired += queued
+
+        for command in expired:
+            logger.warning(f"Abandoning {command.name=} {command.id=}, deadline passed.")
+            reached = ""
+            if (self._lifecycle is not None) and (
+                self._lifecycle.request_id == command.id
+            ):
+                reached = f" the page had reached {sorted(self._lifecycle.reached)}."
+                self._lifecycle = None
+            self.__resolve(
+                CommandTimeout(
+                    f"remote abandoned {command.id=} at its deadline.{reached}"
+                ),
+                command.id,
+            )
+
+        if self._idle_state is not None:
+            self.__idle()
+
+        # only run if the remote worker is ready to execute commands.
+        if self.ready:
+            self.__dispatch()
 
         self.__set_timer()  # set the timer for the next call.
 
-    def __console_recurrent(self) -> None:
-        self.__ensure_page().runJavaScript(
-            self.CONSOLE_JAVASCRIPT, resultCallback=self.__update_console
-        )
+    def __idle(self) -> None:
+        """Put a hidden page which has had no command for idle_after in the idle state, and wake it for the next command.
 
-        # reset console recurrent.
-        if isinstance(self._console_timer, _QtCore.QTimer):
-            self._console_timer.deleteLater()
-            self._console_timer = None
-        self._console_timer = _QtCore.QTimer()
-        self._console_timer.startTimer(self.CONSOLE_POLL_TIME)
+        a frozen page keeps its state but runs no javascript or timers, a discarded one
+        frees its renderer's memory, and is loaded again when it wakes. qt only
+        allows either for a page which is not visible, ex: after hide_window.
+        """
+        page = self.__ensure_page()
+        active = _QtWebEngineCore.QWebEnginePage.LifecycleState.Active
+
+        if self._queue or self._in_flight:
+            self._last_active = _now()
+            if page.lifecycleState() != active:
+                logger.info(f"Waking page from {page.lifecycleState().name}.")
+                self.tracer.instant("lifecycle Active", cat="qt")
+                page.setLifecycleState(active)
+            return
+
+        if (
+            (page.lifecycleState() == active)
+            and (not page.isVisible())
+            and ((_now() - self._last_active) > self._idle_after)
+        ):
+            logger.info(f"Page is idle, putting it in {self._idle_state.name}.")
+            self.tracer.instant(f"lifecycle {self._idle_state.name}", cat="qt")
+            page.setLifecycleState(self._idle_state)
+
+    def __dispatch(self) -> None:
+        """Start every queued command which may run now, see the Commands section of the class."""
+        with self._queue_lock:
+            queue = list(self._queue)
+
+        waiting = False  # a command before this one is still queued.
+
+        for command in queue:
+            running = [running.name for running in self._in_flight.values()]
+            if any(
+                name not in (self._concurrent_commands + self.IMMEDIATE_COMMANDS)
+                for name in running
+            ):
+                break  # an exclusive command is in flight.
+
+            if command.name in self.IMMEDIATE_COMMANDS:
+                pass
+            elif command.name in self._concurrent_commands:
+                if running.count(command.name) >= self._max_concurrent_scripts:
+                    waiting = True
+                    continue
+            elif running or waiting:
+                break  # exclusive, it waits for every command before it.
+
+            with self._queue_lock:
+                self._queue.remove(command)
+            self.__run(command)
+
+            if not self.ready:
+                break  # the command started a navigation.
+
+    def __run(self, command: _Command) -> None:
+        """Start one command, a handler which is not done is put back at the front of the queue."""
+        command.timings.setdefault("started", _now())
+        self._in_flight[command.id] = command
+        # handlers take the id of the request they run, and its frame, from here.
+        self._request_id, self._frame = command.id, command.frame
+
+        try:
+            _, handler = self.STR_TO_COMMAND[
+                command.arg[: self.COMMAND_RESERVED_LENGTH]
+            ]
+            with self.tracer.span(f"dispatch {command.name}", args={"id": command.id}):
+                done = handler(command.arg[self.COMMAND_RESERVED_LENGTH :])
+        except SystemExit:
+            raise
+        except Exception as e:
+            # the error is given to the driver, instead of taking down qt.
+            done = True
+            self.__resolve(e, command.id)
+        finally:
+            self._request_id, self._frame = None, None
+
+        if (not done) and (self._in_flight.pop(command.id, None) is not None):
+            with self._queue_lock:
+                self._queue.insert(0, command)
+
+    def __plugin(self, command: _commands.Command) -> _typing.Callable[[str], bool]:
+        """Give the handler of a registered command, it is given a CommandContext of the request."""
+
+        def handler(arg: str) -> bool:
+            request_id, frame = self._request_id, self._frame
+            context = _commands.CommandContext(
+                self,
+                self.__ensure_page(),
+                None if frame is None else self.__frame(frame)[0],
+                lambda result: self.__resolve(result, request_id),
+                lambda script, callback, world="main": self.__run_javascript(
+                    script, callback, command.name, world, frame
+                ),
+            )
+            result = command.handler(context, arg)
+            if result is not _commands.PENDING:
+                context.resolve(result)
+            return True
 
-        self._console_timer.start()
-        self._console_timer.timeout.connect(self.__console_recurrent)
+        return handler
+
+    def __render_process_terminated(
+        self,
+        status: _QtWebEngineCore.QWebEnginePage.RenderProcessTerminationStatus,
+        exit_code: int,
+    ) -> None:
+        """Exit remote when the renderer dies, the page can't be used after that.
+
+        a supervised driver sees the exit, and starts a new remote.
+        """
+        if (
+            status
+            == _QtWebEngineCore.QWebEnginePage.RenderProcessTerminationStatus.NormalTerminationStatus
+        ):
+            return
+
+        logger.error(f"Renderer process terminated, {status=} {exit_code=}, exiting.")
+        self.tracer.instant(
+            "renderProcessTerminated", args={"status": status.name, "exit_code": exit_code}
+        )
+        if self.archive is not None:
+            self.archive.close()
+        _QtWidgets.QApplication.exit(self.RENDERER_CRASHED_EXIT_CODE)
+
+    # -----------------------------------------navigation lifecycle-----------------------------------------
+    def __check_lifecycle(self) -> None:
+        """Resolve the navigation Driver.open waits for once it has reached its state, run on every page event."""
+        lifecycle = self._lifecycle
+        if lifecycle is None:
+            return
+
+        remaining = lifecycle.remaining()
+        if remaining is None:
+            return
+        if remaining > 0:
+            # networkidle needs more quiet time, check again when it has passed.
+            _QtCore.QTimer.singleShot(
+                _math.ceil(remaining * 1000), self.__check_lifecycle
+            )
+            return
+
+        self._lifecycle = None
+        self.tracer.instant(lifecycle.wait_until, args={"url": lifecycle.url})
+        self.__resolve("done", lifecycle.request_id)
+
+    def __url_changed(self, url: _QtCore.QUrl) -> None:
+        self.tracer.instant("urlChanged", args={"url": url.toString()})
+        self.__emit("navigation", {"signal": "urlChanged", "url": url.toString()})
+
+        lifecycle = self._lifecycle
+        if lifecycle is None:
+            return
+        if lifecycle.started:
+            lifecycle.reach("commit")
+        elif _QtCore.QUrl(lifecycle.url).matches(
+            url, _QtCore.QUrl.UrlFormattingOption.StripTrailingSlash
+        ):
+            # same document navigation, ex: to a #fragment, the page does not load again.
+            lifecycle.reach("load")
+        self.__check_lifecycle()
+
+    def __bridge_message(self, message: dict) -> None:
+        match message.get("event"):
+            case "domcontentloaded":
+                self.tracer.instant("DOMContentLoaded", args={"url": message.get("url")})
+                # the dom can be used, commands don't have to wait for every subresource.
+                self.ready = True
+                if (self._lifecycle is not None) and self._lifecycle.started:
+                    self._lifecycle.reach("domcontentloaded")
+            case "resources":
+                if self._lifecycle is not None:
+                    self._lifecycle.requests_finished(message.get("urls", []))
+            case "timings":
+                self.timings.add(
+                    {
+                        "frameUrl": message.get("url"),
+                        "timeOrigin": message.get("timeOrigin"),
+                        **entry,
+                    }
+                    for entry in message.get("entries", [])
+                )
+            case "mutated":
+                self.__emit("dom_mutated", {"url": message.get("url")})
+        self.__check_lifecycle()
+
+    def __request_started(
+        self, info: _QtWebEngineCore.QWebEngineUrlRequestInfo
+    ) -> None:
+        if self._lifecycle is None:
+            return
+        resource_type = info.resourceType()
+        if resource_type in (
+            # the navigation itself, and favicons, have no resource timing entry.
+            _QtWebEngineCore.QWebEngineUrlRequestInfo.ResourceType.ResourceTypeMainFrame,
+            _QtWebEngineCore.QWebEngineUrlRequestInfo.ResourceType.ResourceTypeFavicon,
+        ):
+            return
+        self._lifecycle.request_started(info.requestUrl().toString())
 
     # ----------------------------------------initialization logic----------------------------------------
-    def __set_ready(self) -> None:
+    def __set_ready(self, ok: bool = True) -> None:
         """Run once when the page is loaded.
 
         to set self.ready and log that the page is done loading.
         """
         self.ready = True
+
+        lifecycle = self._lifecycle
+        if (lifecycle is not None) and lifecycle.started:
+            if not ok:
+                self._lifecycle = None
+                self.__resolve(
+                    NavigationFailed(f"{lifecycle.url=} failed to load."),
+                    lifecycle.request_id,
+                )
+            else:
+                lifecycle.reach("load")
+                self.__check_lifecycle()
+
+        if self._load_started is not None:
+            # remote's own measure of the navigation, as a performance entry.
+            time_origin, started = self._load_started
+            self._load_started = None
+            self.timings.add(
+                [
+                    {
+                        "entryType": _QT_LOAD,
+                        "name": self.__ensure_page().url().toString(),
+                        "frameUrl": self.__ensure_page().url().toString(),
+                        "timeOrigin": time_origin,
+                        "startTime": 0,
+                        "duration": (_now() - started) * 1000,
+                        "ok": ok,
+                    }
+                ]
+            )
+
+        self.tracer.instant(
+            "loadFinished", args={"url": self.__ensure_page().url().toString()}
+        )
         logger.debug(f"Done Loading, {self.__ensure_page().url().toString()=}")
 
     def __unset_ready(self) -> None:
@@ -499,6 +1285,16 @@ class Remote(_QtWebEngineWidgets.QWebEngineView):
         to set self.ready and log that the page has started loading.
         """
         self.ready = False
+        if self._lifecycle is not None:
+            self._lifecycle.started = True
+        self._load_started = (_time.time() * 1000, _now())
+        self.tracer.instant(
+            "loadStarted", args={"url": self.__ensure_page().url().toString()}
+        )
+        self.__emit(
+            "navigation",
+            {"signal": "loadStarted", "url": self.__ensure_page().url().toString()},
+        )
         logger.debug(
             f"Starting Loading, {self.__ensure_page().url().toString()=}"
         )
@@ -567,26 +1363,100 @@ class Remote(_QtWebEngineWidgets.QWebEngineView):
         self.data = data
         self.ready = False
 
-        # variable to record the console.
-        self.__console = []
-        self._console_timer: _typing.Any = None
+        # records spans in chrome trace format, only if the driver was given a "trace_file".
+        self.tracer = _Tracer(bool(self.__get_data("trace_file")), "remote")
+        self._last_tick = _now()
+
+        # commands received and not yet started, remote-client adds to it.
+        self._queue: list[_Command] = []
+        self._queue_lock = _threading.Lock()
 
-        # propogation of commands.
-        self.command = ""
-        self._element_pos = None
-        self._element_pos_started: bool = False
+        # commands started and not yet resolved, by id, only used by qt's thread.
+        self._in_flight: dict[int, _Command] = {}
 
+        # the command being dispatched, handlers resolve it by default, and the frame it runs in.
+        self._request_id: int | None = None
+        self._frame: int | None = None
+
+        # frames given to the driver by handle, with the handle of their parent.
+        self._frames: dict[int, tuple[_QtWebEngineCore.QWebEngineFrame, int | None]] = {}
+        self._frame_handles = _itertools.count(1)
+
+        # (reply, payload) of resolved commands, None stops remote-sender.
+        self._replies: _queue.Queue = _queue.Queue()
+
+        self._max_concurrent_scripts: int = (
+            self.__get_data("max_concurrent_scripts") or self.MAX_CONCURRENT_SCRIPTS
+        )
+
+        # the state an idle page is put in, None to leave it active, see __idle.
+        idle_state = self.__get_data("idle_state")
+        self._idle_state: _QtWebEngineCore.QWebEnginePage.LifecycleState | None = (
+            None
+            if not idle_state
+            else _QtWebEngineCore.QWebEnginePage.LifecycleState[idle_state.capitalize()]
+        )
+        self._idle_after: float = self.__get_data("idle_after") or self.IDLE_AFTER
+        self._last_active = _now()
+
+        # the navigation Driver.open is waiting for, if any.
+        self._lifecycle: _Lifecycle | None = None
+
+        # performance entries of the page, and remote's own load times, for the driver.
+        timings_buffer = self.data.get("timings_buffer", _TimingBuffer.SIZE)
+        self.timings = _TimingBuffer(timings_buffer)
+        self._load_started: tuple[float, float] | None = None  # (epoch ms, now()) of loadStarted.
+
+        # a page which reports DOMContentLoaded and finished requests, for the lifecycle.
+        self.setPage(
+            _BridgePage(
+                _QtWebEngineCore.QWebEngineProfile.defaultProfile(),
+                self,
+                timings=bool(timings_buffer),
+                mutations=bool(self.__get_data("dom_events")),
+            )
+        )
+        self.__ensure_page().bridgeMessage.connect(self.__bridge_message)
 
-        # the result of the command given
-        self.result: self.__Nothing | str | _typing.Any = self.__Nothing
+        # the user's scripts, which run in every new document.
+        self._init_scripts: list[dict] = []
+        for init_script in self.__get_data("init_scripts") or []:
+            self.__ensure_page().scripts().insert(_make_script(**init_script))
+            self._init_scripts.append(init_script)
 
         # set loadFinished to set self.ready
         self.loadFinished.connect(self.__set_ready)
         self.loadStarted.connect(self.__unset_ready)
+        self.urlChanged.connect(self.__url_changed)
+        self.__ensure_page().renderProcessTerminated.connect(
+            self.__render_process_terminated
+        )
 
         self.timer: _QtCore.QTimer = None
 
-        self.setUrl(_QtCore.QUrl(self.__get_data("starting_url", True)))
+        self.__setup_network()
+
+        # keeps the cookies from the start, and restores the session given, before starting_url.
+        self.session = _SessionStore(self.__ensure_page().profile(), self)
+
+        # downloads are saved straight to disk, and reported to the driver as events.
+        self.downloads = _DownloadManager(
+            self.__ensure_page().profile(),
+            self.__get_data("download_dir")
+            or _tempfile.mkdtemp(prefix="seleniumqt-downloads-"),
+            self.__get_data("max_parallel_downloads") or self.MAX_PARALLEL_DOWNLOADS,
+            lambda event: self.__emit("download", event),
+            self,
+        )
+        starting_url = _QtCore.QUrl(self.__get_data("starting_url", True))
+        if self.__get_data("session"):
+            self.session.import_session(
+                self.__ensure_page(),
+                _loads_session(self.__get_data("session")),
+                lambda: self.setUrl(starting_url),
+            )
+        else:
+            self.setUrl(starting_url)
 
         # connect to the driver
         self.conn: _socket.socket = _socket.socket(
@@ -594,29 +1464,71 @@ class Remote(_QtWebEngineWidgets.QWebEngineView):
         )
         self._conn: DriverComs | _typing.Any = None
 
+        # a dict to convert from the command given in the message
+        # to the function which will run it.
+        builtin_commands: dict[str, _typing.Callable] = {
+            "js": self.__run_js,
+            "url": self.__go_to_url,
+            "click": self.__click_element,
+            "hide": self.__hide,
+            "show": self.__show_window,
+            "page": self.__set_page,
+            "close": self.__close,
+            "current_url": self.__current_url,
+            "trace": self.__trace,
+            "init_script": self.__add_init_script,
+            "export_session": self.__export_session,
+            "import_session": self.__import_session,
+            "frames": self.__frames,
+            "timings": self.__timings,
+            "dom_changes": self.__dom_changes,
+            "clear_cookies": self.__clear_cookies,
+        }
+        _commands.load(self.__get_data("plugins") or [])
+        self.STR_TO_COMMAND: dict[str, tuple[str, _typing.Callable]] = {
+            self.__format_command(opcode): (
+                name,
+                builtin_commands.get(name)
+                or self.__plugin(_commands.COMMANDS[name]),
+            )
+            for name, opcode in _commands.opcodes().items()
+        }
+        self._concurrent_commands: tuple[str, ...] = self.CONCURRENT_COMMANDS + tuple(
+            name for name, command in _commands.COMMANDS.items() if command.concurrent
+        )
+
+        # connect once the plugins are loaded, the driver waits HELLO_TIMEOUT for the hello.
         self.conn.connect(
-            ("localhost", self.__get_data("connection_port", True))
+            (
+                self.__get_data("connection_host") or "localhost",
+                self.__get_data("connection_port", True),
+            )
         )
 
-        # start the function which will recieve commands from the driver.
+        # tell the driver the opcodes first, then start the function which will
+        # recieve commands from the driver, and the one which sends their results.
+        self._conn = DriverComs(self.conn)
+        self._conn.send_message(
+            {
+                "id": None,
+                "status": "hello",
+                "commands": {
+                    name: op for op, (name, _) in self.STR_TO_COMMAND.items()
+                },
+                "token": self.__get_data("connection_token"),
+            },
+            b"",
+        )
         self.__remote_client_thread = _threading.Thread(
             target=self.remote_client, daemon=True
         )
         self.__remote_client_thread.name = "remote-client"
         self.__remote_client_thread.start()
-
-        # a dict to convert from the command given in the message
-        # to the function which will run it.
-        self.STR_TO_COMMAND: dict[str, tuple[str, _typing.Callable]] = {
-            self.__format_command(0): ("js", self.__run_js),
-            self.__format_command(1): ("url", self.__go_to_url),
-            self.__format_command(2): ("click", self.__click_element),
-            self.__format_command(3): ("hide", self.__hide),
-            self.__format_command(4): ("show", self.__show_window),
-            self.__format_command(5): ("page", self.__set_page),
-            self.__format_command(6): ("close", self.__close),
-            self.__format_command(7): ("current_url", self.__current_url)
-        }
+        self.__remote_sender_thread = _threading.Thread(
+            target=self.remote_sender, daemon=True
+        )
+        self.__remote_sender_thread.name = "remote-sender"
+        self.__remote_sender_thread.start()
 
         logger.debug(f"{self.STR_TO_COMMAND=}")
 
@@ -645,8 +1557,25 @@ class Remote(_QtWebEngineWidgets.QWebEngineView):
             data (dict): Data given to remote, by driver
 
         """
+        if data.get("archive"):
+            # custom schemes can only be registered before the QApplication exists.
+            _register_archive_schemes()
+
+        if data.get("headless"):
+            # the offscreen platform renders pages as usual, but never creates a window.
+            _os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+        # chromium reads its flags once, when it starts with the QApplication.
+        profile_name, profile = _performance.resolve(data)
+        flags = _performance.apply_flags(profile)
+
         app = _QtWidgets.QApplication([__file__])
 
+        _performance.apply_settings(
+            profile, _QtWebEngineCore.QWebEngineProfile.defaultProfile().settings()
+        )
+        _performance.report(profile_name, profile, flags)
+
         remote = cls(data)  # noqa: F841 # this is because qt works in weird and mysterious ways.
 
         logger.info("Starting Main Qt Loop.")
@@ -0,0 +1,342 @@
+"""module containing the session store, which snapshots and restores cookies and web storage of remote's profile."""
+
+# ---------------------------------------------------
+# author: Ansh Mathur
+# gtihub: https://github.com/Fakesum
+# repo: https://github.com/Fakesum/ TODO: THIS
+# ---------------------------------------------------
+
+# import python std library
+import json as _json
+import zlib as _zlib
+import typing as _typing
+
+# import Qt
+from PyQt6 import (
+    QtCore as _QtCore,
+    QtNetwork as _QtNetwork,
+    QtWebEngineCore as _QtWebEngineCore,
+)
+
+# import Some Custom Exceptions
+from .exception import InvalidSession
+
+# import logger
+from .logger import logger
+
+# import the init scripts.
+from .page import make_script as _make_script, WORLDS as _WORLDS
+
+
+# version of the session format, a blob of another version is refused.
+SESSION_VERSION = 1
+
+# sessionStorage key which marks a tab's storage as restored, it is never exported.
+RESTORED_MARKER = "__seleniumqt_session"
+
+
+def dumps(session: dict) -> bytes:
+    """Give the compact blob of a session, zlib compressed json."""
+    return _zlib.compress(
+        _json.dumps(session, separators=(",", ":")).encode("utf-8"), 9
+    )
+
+
+def loads(blob: bytes) -> dict:
+    """Give the session in a blob made by dumps.
+
+    Raises:
+    ------
+        InvalidSession: the blob is not a session, or is of another SESSION_VERSION.
+
+    """
+    try:
+        session = _json.loads(_zlib.decompress(blob))
+    except (_zlib.error, ValueError, TypeError) as e:
+        raise InvalidSession(f"not a session blob: {e}") from e
+    if (not isinstance(session, dict)) or (
+        session.get("version") != SESSION_VERSION
+    ):
+        raise InvalidSession(f"{SESSION_VERSION=} is needed, the blob is not of it.")
+    return session
+
+
+class SessionStore(_QtCore.QObject):
+    """Cookies and web storage of a profile, exported and imported in bulk.
+
+    # Session
+    ```python
+    {
+        "version": SESSION_VERSION,
+        "cookies": [{"raw": ..., "domain": ...}], # set-cookie form of every cookie.
+        "local_storage": {origin: {key: value}},
+        "session_storage": {origin: {key: value}}, # only of the page's tab.
+    }
+    ```
+
+    cookies are kept as the cookie store reports them, the store can't be read.
+    localStorage of an origin is read and written from a helper page, which is
+    given an empty document at that origin without loading anything from the
+    network. sessionStorage belongs to one tab, so it is read from the page, and
+    written by an init script the first time the tab is at that origin.
+    """
+
+    # read and write a Storage, the page's own document may have no storage, ex: about:blank.
+    JAVASCRIPT_READ_STORAGE = """
+    (() => {{
+        try {{
+            const items = {{}};
+            for (let i = 0; i < {storage}.length; i++) {{
+                const key = {storage}.key(i);
+                if (key !== {marker}) {{
+                    items[key] = {storage}.getItem(key);
+                }}
+            }}
+            return JSON.stringify({{origin: location.origin, items: items}});
+        }} catch (err) {{
+            return JSON.stringify({{origin: location.origin, items: {{}}}});
+        }}
+    }})()
+    """
+
+    JAVASCRIPT_WRITE_STORAGE = """
+    (() => {{
+        const items = {items};
+        for (const key in items) {{
+            {storage}.setItem(key, items[key]);
+        }}
+        return Object.keys(items).length;
+    }})()
+    """
+
+    JAVASCRIPT_RESTORE_SESSION_STORAGE = """
+    (() => {{
+        try {{
+            const items = {session_storage}[location.origin];
+            if ((!items) || sessionStorage.getItem({marker})) {{
+                return;
+            }}
+            for (const key in items) {{
+                sessionStorage.setItem(key, items[key]);
+            }}
+            sessionStorage.setItem({marker}, "1");
+        }} catch (err) {{}}
+    }})();
+    """
+
+    HELPER_DOCUMENT = "<!doctype html><title>seleniumqt session</title>"
+
+    def __init__(
+        self,
+        profile: _QtWebEngineCore.QWebEngineProfile,
+        parent: _QtCore.QObject | None = None,
+    ) -> None:
+        """Construct SessionStore, it starts keeping the profile's cookies.
+
+        Args:
+        ----
+            profile (QWebEngineProfile): the profile, of remote's page.
+            parent (QObject, optional): qt parent. Defaults to None.
+
+        """
+        super().__init__(parent)
+        self.profile = profile
+        self.cookies: dict[tuple[bytes, str, str], _QtNetwork.QNetworkCookie] = {}
+
+        self._store = profile.cookieStore()
+        self._store.cookieAdded.connect(self.__cookie_added)
+        self._store.cookieRemoved.connect(self.__cookie_removed)
+        self._store.loadAllCookies()
+
+        # created on first use, with the origin jobs it runs one at a time.
+        self._helper: _QtWebEngineCore.QWebEnginePage | None = None
+        self._jobs: list[tuple[str, str, _typing.Callable[[_typing.Any], None]]] = []
+
+    # ---------------------------------------------cookies----------------------------------------------
+    @staticmethod
+    def __key(cookie: _QtNetwork.QNetworkCookie) -> tuple[bytes, str, str]:
+        return (bytes(cookie.name()), cookie.domain(), cookie.path())
+
+    def __cookie_added(self, cookie: _QtNetwork.QNetworkCookie) -> None:
+        self.cookies[self.__key(cookie)] = _QtNetwork.QNetworkCookie(cookie)
+
+    def __cookie_removed(self, cookie: _QtNetwork.QNetworkCookie) -> None:
+        self.cookies.pop(self.__key(cookie), None)
+
+    def export_cookies(self) -> list[dict]:
+        return [
+            {
+                "raw": bytes(
+                    cookie.toRawForm(_QtNetwork.QNetworkCookie.RawForm.Full)
+                ).decode("latin-1"),
+                "domain": cookie.domain(),
+            }
+            for cookie in self.cookies.values()
+        ]
+
+    def clear_cookies(self) -> None:
+        """Delete every cookie of the profile, they are forgotten at once, the store deletes them later."""
+        self._store.deleteAllCookies()
+        self.cookies.clear()
+
+    def import_cookies(self, cookies: list[dict]) -> None:
+        for exported in cookies:
+            for cookie in _QtNetwork.QNetworkCookie.parseCookies(
+                _QtCore.QByteArray(exported["raw"].encode("latin-1"))
+            ):
+                # parsing adds a leading dot, a host only cookie must stay host only.
+                cookie.setDomain(exported["domain"])
+                scheme = "https" if cookie.isSecure() else "http"
+                self._store.setCookie(
+                    cookie,
+                    _QtCore.QUrl(f"{scheme}://{exported['domain'].lstrip('.')}/"),
+                )
+
+    # ---------------------------------------------storage----------------------------------------------
+    def __run_in_origin(
+        self, origin: str, script: str, callback: _typing.Callable[[_typing.Any], None]
+    ) -> None:
+        """Run script in an empty document at origin, in the helper page, after the jobs before it."""
+        if self._helper is None:
+            self._helper = _QtWebEngineCore.QWebEnginePage(self.profile, self)
+            self._helper.loadFinished.connect(self.__helper_loaded)
+
+        self._jobs.append((origin, script, callback))
+        if len(self._jobs) == 1:
+            self.__next_job()
+
+    def __next_job(self) -> None:
+        if self._jobs:
+            origin = self._jobs[0][0]
+            self._helper.setHtml(self.HELPER_DOCUMENT, _QtCore.QUrl(origin + "/"))
+
+    def __helper_loaded(self, ok: bool) -> None:
+        if not self._jobs:
+            return
+        origin, script, callback = self._jobs[0]
+
+        def done(result: _typing.Any) -> None:
+            self._jobs.pop(0)
+            try:
+                callback(result)
+            finally:
+                self.__next_job()
+
+        if not ok:
+            logger.error(f"Could not open an empty document at {origin=}")
+            done(None)
+            return
+        self._helper.runJavaScript(script, resultCallback=done)
+
+    # ---------------------------------------------sessions---------------------------------------------
+    def export_session(
+        self,
+        page: _QtWebEngineCore.QWebEnginePage,
+        origins: list[str] | None,
+        callback: _typing.Callable[[dict], None],
+    ) -> None:
+        """Give callback the session, see the Session section of the class.
+
+        Args:
+        ----
+            page (QWebEnginePage): the page, its origin is exported, and its sessionStorage.
+            origins (list[str] | None): more origins to export the localStorage of, ex: https://example.com
+            callback (Callable[[dict], None]): given the session once it is read.
+
+        """
+        session = {
+            "version": SESSION_VERSION,
+            "cookies": self.export_cookies(),
+            "local_storage": {},
+            "session_storage": {},
+        }
+
+        def page_storage(result: _typing.Any) -> None:
+            current = _json.loads(result)
+            if current["items"]:
+                session["session_storage"][current["origin"]] = current["items"]
+
+            pending = list(origins or [])
+            if current["origin"] != "null":  # ex: about:blank has no storage.
+                pending.append(current["origin"])
+            pending = list(dict.fromkeys(origin.rstrip("/") for origin in pending))
+            if not pending:
+                callback(session)
+                return
+
+            def local_storage(result: _typing.Any) -> None:
+                if result is not None:
+                    stored = _json.loads(result)
+                    if stored["items"]:
+                        session["local_storage"][stored["origin"]] = stored["items"]
+                pending.pop(0)
+                if not pending:
+                    callback(session)
+
+            for origin in list(pending):
+                self.__run_in_origin(
+                    origin,
+                    self.JAVASCRIPT_READ_STORAGE.format(
+                        storage="localStorage", marker=_json.dumps(RESTORED_MARKER)
+                    ),
+                    local_storage,
+                )
+
+        page.runJavaScript(
+            self.JAVASCRIPT_READ_STORAGE.format(
+                storage="sessionStorage", marker=_json.dumps(RESTORED_MARKER)
+            ),
+            _WORLDS["isolated"].value,
+            resultCallback=page_storage,
+        )
+
+    def import_session(
+        self,
+        page: _QtWebEngineCore.QWebEnginePage,
+        session: dict,
+        callback: _typing.Callable[[], None],
+    ) -> None:
+        """Restore a session, cookies and localStorage before callback, sessionStorage on the page's next document.
+
+        Args:
+        ----
+            page (QWebEnginePage): the page, its tab gets the sessionStorage.
+            session (dict): the session, see the Session section of the class.
+            callback (Callable[[], None]): called once the cookies and localStorage are written.
+
+        """
+        self.import_cookies(session.get("cookies", []))
+
+        if session.get("session_storage"):
+            page.scripts().insert(
+                _make_script(
+                    "seleniumqt-session-storage",
+                    self.JAVASCRIPT_RESTORE_SESSION_STORAGE.format(
+                        session_storage=_json.dumps(session["session_storage"]),
+                        marker=_json.dumps(RESTORED_MARKER),
+                    ),
+                    "isolated",
+                )
+            )
+
+        pending = list(session.get("local_storage", {}).items())
+        if not pending:
+            callback()
+            return
+
+        def written(result: _typing.Any) -> None:
+            pending.pop(0)
+            if not pending:
+                callback()
+
+        for origin, items in list(pending):
+            self.__run_in_origin(
+                origin.rstrip("/"),
+                self.JAVASCRIPT_WRITE_STORAGE.format(
+                    storage="localStorage", items=_json.dumps(items)
+                ),
+                written,
+            )
+
+
+__all__ = ["SESSION_VERSION", "dumps", "loads", "SessionStore"]
@@ -0,0 +1,14 @@
+"""plugin used by tests.Tests.test_plugin, it adds two commands to remote."""
+
+from seleniumqt.commands import command, PENDING
+
+
+@command("test_url")
+def test_url(context, arg):
+    return {"url": context.page.url().toString(), "arg": arg}
+
+
+@command("test_sum", concurrent=True)
+def test_sum(context, arg):
+    context.run_javascript(f"{arg} + 1", context.resolve)
+    return PENDING
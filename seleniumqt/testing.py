@@ -0,0 +1,353 @@
+"""pytest plugin for seleniumqt, pooled headless drivers, a local static server and event based waits.
+
+the plugin is registered with pytest through the `pytest11` entry point, so
+installing seleniumqt is enough to use its fixtures. it is loaded by every pytest
+run, so qt is only imported once a driver is started, not by the plugin.
+
+# Usage
+```python
+def test_login(driver, static_server):
+    driver.open(static_server.url("/login.html"))
+    driver.click("#submit")
+    static_server.wait_for_request("/api/login")
+```
+
+# Fixtures
+- `seleniumqt_config` (session): config given to every Driver, override it in a conftest.py.
+- `static_server` (session): serves `--seleniumqt-static-dir` on localhost, see StaticServer.
+- `driver_pool` (session): the drivers of this worker, see DriverPool.
+- `driver` (function): a driver from the pool, its page is reset after the test.
+
+# pytest-xdist
+session fixtures are created once per worker process, so every worker has
+its own pool, Remote processes and server, and nothing is shared between them.
+files named in the config, ex: "trace_file", get the worker id added to their name.
+"""
+
+# ---------------------------------------------------
+# author: Ansh Mathur
+# gtihub: https://github.com/Fakesum
+# repo: https://github.com/Fakesum/ TODO: THIS
+# ---------------------------------------------------
+
+# import python std library
+import os as _os
+import typing as _typing
+import threading as _threading
+import functools as _functools
+import http.server as _http_server
+import urllib.parse as _urllib_parse
+
+# import pytest
+import pytest
+
+if _typing.TYPE_CHECKING:
+    from .driver import Driver
+
+# config keys which name a file, each worker writes its own.
+PER_WORKER_FILES = ("trace_file", "metrics_file")
+
+
+class Request(_typing.NamedTuple):
+    """A request received by StaticServer."""
+
+    method: str
+    path: str
+    query: dict[str, str]
+    headers: dict[str, str]
+
+
+class StaticServer:
+    """Serve a directory on localhost, and record every request it receives.
+
+    requests are waited for with a condition, so a test wakes up as soon as the
+    request arrives, instead of polling or sleeping.
+
+    # Usage
+    ```python
+    server = StaticServer("tests/pages")
+    driver.open(server.url("/index.html"))
+    request = server.wait_for_request("/clicked", timeout=5)
+    server.close()
+    ```
+    """
+
+    def __init__(self, directory: str) -> None:
+        """Construct StaticServer, it starts serving immediately.
+
+        Args:
+        ----
+            directory (str): the directory served.
+
+        """
+        self.directory = _os.path.abspath(directory)
+        self.requests: list[Request] = []
+        self._condition = _threading.Condition()
+
+        self._server = _http_server.ThreadingHTTPServer(
+            ("localhost", 0), self.__handler()
+        )
+        self._server.daemon_threads = True
+        self.__thread = _threading.Thread(
+            target=self._server.serve_forever, daemon=True
+        )
+        self.__thread.name = "seleniumqt-static-server"
+        self.__thread.start()
+
+    @property
+    def port(self) -> int:
+        """Port the server listens on."""
+        return self._server.server_address[1]
+
+    def url(self, path: str = "/") -> str:
+        """Give the full url of a path on the server."""
+        return f"http://localhost:{self.port}/{path.lstrip('/')}"
+
+    def __handler(self) -> type[_http_server.SimpleHTTPRequestHandler]:
+        server = self
+
+        class StaticHandler(_http_server.SimpleHTTPRequestHandler):
+            def __record(self):
+                url = _urllib_parse.urlsplit(self.path)
+                with server._condition:
+                    server.requests.append(
+                        Request(
+                            self.command,
+                            url.path,
+                            dict(_urllib_parse.parse_qsl(url.query)),
+                            dict(self.headers.items()),
+                        )
+                    )
+                    server._condition.notify_all()
+
+            def do_GET(self):
+                self.__record()
+                super().do_GET()
+
+            def do_POST(self):
+                # posts are recorded, and answered with no content, ex: beacons and forms.
+                self.__record()
+                self.send_response(204)
+                self.end_headers()
+
+            def end_headers(self):
+                self.send_header("Cache-Control", "no-store")
+                super().end_headers()
+
+            def log_message(self, format, *args):
+                pass
+
+        return _functools.partial(StaticHandler, directory=self.directory)
+
+    def wait_for_request(
+        self,
+        path: str,
+        timeout: float = 10.0,
+        predicate: _typing.Callable[[Request], bool] | None = None,
+    ) -> Request:
+        """Wait until a request for path has been received, including before this call.
+
+        Args:
+        ----
+            path (str): path of the request, ex: /clicked
+            timeout (float, optional): seconds to wait. Defaults to 10.0.
+            predicate (Callable[[Request], bool] | None, optional): only count requests it accepts. Defaults to None.
+
+        Raises:
+        ------
+            AssertionError: no such request within timeout, the requests received are listed.
+
+        Returns:
+        -------
+            Request: the first matching request.
+
+        """
+
+        def find() -> Request | None:
+            for request in self.requests:
+                if (request.path == path) and (
+                    (predicate is None) or predicate(request)
+                ):
+                    return request
+            return None
+
+        with self._condition:
+            if self._condition.wait_for(
+                lambda: find() is not None, timeout
+            ):
+                return find()
+            seen = [f"{request.method} {request.path}" for request in self.requests]
+
+        raise AssertionError(
+            f"No request for {path=} within {timeout=} seconds, received {seen=}"
+        )
+
+    def clear(self) -> None:
+        """Forget the requests received so far."""
+        with self._condition:
+            self.requests.clear()
+
+    def close(self) -> None:
+        """Stop serving."""
+        self._server.shutdown()
+        self._server.server_close()
+
+
+class DriverPool:
+    """Drivers kept alive across tests, so Remote is started once per worker, not once per test.
+
+    a driver is reset when it is given back, if the reset fails, ex: because the
+    test crashed remote, it is closed and a new one is started the next time.
+
+    the reset deletes every cookie, and the localStorage and sessionStorage of the
+    page's origin, then opens BLANK_URL. the storage of other origins, indexedDB,
+    service workers, the http cache and the history are kept, a test which
+    depends on those must not use the pool. a driver a test added init scripts
+    to is closed, they can't be removed.
+    """
+
+    # page every driver is left on between tests.
+    BLANK_URL = "about:blank"
+
+    JAVASCRIPT_RESET = """
+    try { localStorage.clear(); } catch (e) {}
+    try { sessionStorage.clear(); } catch (e) {}
+    """
+
+    def __init__(self, config: dict) -> None:
+        """Construct DriverPool.
+
+        Args:
+        ----
+            config (dict): config of every driver started by the pool.
+
+        """
+        self.config = config
+        self.started = 0
+        self._idle: list["Driver"] = []
+        self._lock = _threading.Lock()
+
+    def acquire(self) -> "Driver":
+        """Give an idle driver, or start one if there is none."""
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+
+        from .driver import Driver
+
+        self.started += 1
+        config = dict(self.config)
+        # add_init_script adds to the driver's list, not the pool's.
+        config["init_scripts"] = list(config.get("init_scripts") or [])
+        return Driver(config)
+
+    def release(self, driver: "Driver") -> None:
+        """Reset a driver's page and give it back to the pool."""
+        if len(driver.config.get("init_scripts") or []) != len(
+            self.config.get("init_scripts") or []
+        ):
+            self.discard(driver)
+            return
+
+        try:
+            driver.default_context()
+            driver.execute_script(self.JAVASCRIPT_RESET, timeout=10)
+            driver.clear_cookies(timeout=10)
+            driver.execute("url", self.BLANK_URL, timeout=10)
+        except Exception:
+            # a driver which can't be reset is not reused.
+            self.discard(driver)
+            return
+
+        with self._lock:
+            self._idle.append(driver)
+
+    @staticmethod
+    def discard(driver: "Driver") -> None:
+        """Close a driver, instead of giving it back."""
+        try:
+            driver.close(timeout=10)
+        except Exception:
+            pass
+
+    def close(self) -> None:
+        """Close every idle driver."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for driver in idle:
+            self.discard(driver)
+
+
+# -----------------------------------------------pytest hooks-----------------------------------------------
+def pytest_addoption(parser: pytest.Parser) -> None:
+    group = parser.getgroup("seleniumqt")
+    group.addoption(
+        "--seleniumqt-headed",
+        action="store_true",
+        default=False,
+        help="show the browser windows, drivers are headless by default.",
+    )
+    group.addoption(
+        "--seleniumqt-static-dir",
+        default=None,
+        help="directory served by the static_server fixture, defaults to the rootdir.",
+    )
+
+
+def worker_id(config: pytest.Config) -> str:
+    """Give the pytest-xdist worker id, ex: gw0, or "master" without xdist."""
+    workerinput = getattr(config, "workerinput", None)
+    return "master" if workerinput is None else workerinput["workerid"]
+
+
+# -------------------------------------------------fixtures-------------------------------------------------
+@pytest.fixture(scope="session")
+def seleniumqt_config(static_server: StaticServer) -> dict:
+    """Give the config every pooled Driver is started with, override it to change it."""
+    return {"starting_url": static_server.url("/")}
+
+
+@pytest.fixture(scope="session")
+def static_server(pytestconfig: pytest.Config) -> _typing.Iterator[StaticServer]:
+    """Serve the static directory on localhost for the whole session."""
+    directory = pytestconfig.getoption("seleniumqt_static_dir") or str(
+        pytestconfig.rootpath
+    )
+    server = StaticServer(directory)
+    yield server
+    server.close()
+
+
+@pytest.fixture(scope="session")
+def driver_pool(
+    pytestconfig: pytest.Config, seleniumqt_config: dict
+) -> _typing.Iterator[DriverPool]:
+    """Give the pool of drivers of this worker, they are closed at the end of the session."""
+    config = dict(seleniumqt_config)
+    config.setdefault(
+        "headless", not pytestconfig.getoption("seleniumqt_headed")
+    )
+
+    worker = worker_id(pytestconfig)
+    for key in PER_WORKER_FILES:
+        if config.get(key) and (worker != "master"):
+            root, extension = _os.path.splitext(config[key])
+            config[key] = f"{root}.{worker}{extension}"
+
+    pool = DriverPool(config)
+    yield pool
+    pool.close()
+
+
+@pytest.fixture
+def driver(
+    driver_pool: DriverPool, static_server: StaticServer
+) -> _typing.Iterator["Driver"]:
+    """Give a driver from the pool, a reused driver is on about:blank with its storage cleared."""
+    static_server.clear()
+    driver = driver_pool.acquire()
+    yield driver
+    driver_pool.release(driver)
+
+
+__all__ = ["StaticServer", "DriverPool", "Request", "worker_id"]
@@ -6,6 +6,28 @@ from .logger import logger
 # import the Driver
 from .driver import Driver
 from .comms import DriverComs
+from .archive import Archive
+from .exception import (
+    CommandTimeout,
+    InvalidSession,
+    UnknownCommand,
+    BrokerError,
+    QueueFull,
+)
+from .metrics import CommandMetrics, now
+from .tracing import Tracer
+from .page import Lifecycle
+from .crawler import crawl
+from . import session
+from . import memory
+from . import commands
+from . import performance
+from . import politeness
+from .broker import Broker, RemoteLease
+from .worker import Worker
+from .backpressure import CommandQueue
+from .cache import QueryCache
+from .timings import TimingBuffer
 
 # import socket, threading & threading for test flask server
 import socket
@@ -18,10 +40,13 @@ import types
 
 # for unit tests.
 import unittest
+import json
 import time
 import typing
 import os
 import random
+import subprocess
+import tempfile
 
 # a url object in order to compare whether two urls are equal.
 from urllib.parse import urlparse, parse_qsl, unquote_plus
@@ -59,6 +84,8 @@ class TestDriverComsDriver(threading.Thread):
         self.daemon = True
         self.conn = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         self.conn.bind(('localhost', 0))
+        # listen before the remote connects, not in run.
+        self.conn.listen()
 
         self.port = self.conn.getsockname()[1]
         self._commands = []
@@ -69,7 +96,6 @@ class TestDriverComsDriver(threading.Thread):
         self.start()
     
     def run(self):
-        self.conn.listen()
         conn, _ = self.conn.accept()
         
         self._conn = DriverComs(conn)
@@ -120,6 +146,488 @@ class TestDriverComs(unittest.TestCase):
         
         self.assertEqual(self.driver._result, "".join(reversed(test_string)))
 
+    def test_framing(self):
+        """test that frames of every size, sent back to back, arrive byte exact and in order."""
+        driver_end, remote_end = socket.socketpair()
+        driver, remote = DriverComs(driver_end), DriverComs(remote_end)
+
+        sizes = [0, 1, 1023, 1024, 1025, 65536, DriverComs.RECV_CHUNK_SIZE + 1, 4 * 1024 * 1024]
+        payloads = [random.randbytes(size) for size in sizes] * 2
+
+        sender = threading.Thread(
+            target=lambda: [driver.send_message({"n": n}, data) for n, data in enumerate(payloads)],
+            daemon=True,
+        )
+        sender.start()
+        for n, data in enumerate(payloads):
+            header, received = remote.recv_message()
+            self.assertEqual(header, {"n": n})
+            self.assertEqual(received, data)
+        sender.join()
+
+        # a frame written one byte at a time is still read whole.
+        frame = DriverComs.LENGTH.pack(5) + b"hello"
+        for i in range(len(frame)):
+            driver_end.send(frame[i : i + 1])
+        self.assertEqual(remote.recv(), b"hello")
+
+        # the peer closing part way through a frame is an error, not a short frame.
+        driver_end.send(DriverComs.LENGTH.pack(10) + b"abc")
+        driver_end.close()
+        with self.assertRaises(ConnectionResetError):
+            remote.recv()
+        remote_end.close()
+
+    def test_no_copy(self):
+        """test that large frames are written as they are, and small ones in one write with their length."""
+        writes = []
+        comms = DriverComs(types.SimpleNamespace(sendall=writes.append))
+
+        data = random.randbytes(DriverComs.COALESCE_SIZE)
+        comms.send(data)
+        self.assertEqual(writes[0], DriverComs.LENGTH.pack(len(data)))
+        self.assertIs(writes[1], data)
+
+        writes.clear()
+        comms.send_message({"n": 1}, data)
+        self.assertIs(writes[1], data)
+
+        writes.clear()
+        comms.send(b"small")
+        self.assertEqual(writes, [DriverComs.LENGTH.pack(5) + b"small"])
+
+class TestArchive(unittest.TestCase):
+    """test the record/replay archive file format."""
+
+    def setUp(self):
+        self.path = "".join(random.sample("qwertyuiopasdfghjklzxcvbnm", 20)) + ".sqtarc"
+
+    def tearDown(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def test_round_trip(self):
+        body = os.urandom(1024 * 64)
+        with Archive(self.path, "w") as archive:
+            archive.add("GET", "http://localhost/", 200, "text/html", {}, b"<html></html>")
+            archive.add("get", "http://localhost/data#frag", 200, "application/octet-stream", {"x-test": "1"}, body)
+            archive.add("POST", "http://localhost/", 302, "text/html", {"location": "/data"}, b"")
+
+        with Archive(self.path) as archive:
+            self.assertEqual(len(archive), 3)
+            self.assertEqual(bytes(archive.get("GET", "http://localhost/").body), b"<html></html>")
+
+            entry = archive.get("GET", "http://localhost/data")
+            self.assertEqual(bytes(entry.body), body)
+            self.assertEqual(entry.headers, {"x-test": "1"})
+
+            self.assertEqual(archive.get("POST", "http://localhost/").status, 302)
+            self.assertIsNone(archive.get("PUT", "http://localhost/"))
+
+class TestMetrics(unittest.TestCase):
+    """test the command latency histograms."""
+
+    def test_histogram(self):
+        metrics = CommandMetrics()
+        for i in range(1, 101):
+            metrics.observe("js", "execute", i / 1000)
+        metrics.count("js", "ok")
+
+        execute = metrics.stats()["js"]["phases"]["execute"]
+        self.assertEqual(execute["count"], 100)
+        self.assertAlmostEqual(execute["max"], 0.1)
+        self.assertTrue(0.025 <= execute["p50"] <= 0.1, execute["p50"])
+        self.assertEqual(metrics.stats()["js"]["results"], {"ok": 1})
+
+        text = metrics.prometheus()
+        self.assertIn('seleniumqt_command_phase_seconds_count{command="js",phase="execute"} 100', text)
+        self.assertIn('le="+Inf"} 100', text)
+
+class TestTracer(unittest.TestCase):
+    """test the chrome trace recorder."""
+
+    def test_trace_file(self):
+        tracer = Tracer(process_name="driver")
+        with tracer.span("execute js", args={"id": 1}):
+            tracer.instant("loadFinished")
+        Tracer(enabled=False).complete("ignored", now(), now())
+
+        path = os.path.join(os.path.dirname(__file__), ".test_trace.json")
+        try:
+            tracer.dump(path, [{"name": "remote", "ph": "i", "ts": 0, "pid": 0, "tid": 0}])
+            with open(path) as f:
+                events = json.load(f)["traceEvents"]
+        finally:
+            os.remove(path)
+
+        spans = [event for event in events if event["ph"] == "X"]
+        self.assertEqual([span["name"] for span in spans], ["execute js"])
+        self.assertGreaterEqual(spans[0]["dur"], 0)
+        self.assertIn("loadFinished", [event["name"] for event in events])
+        self.assertIn("remote", [event["name"] for event in events])
+
+class TestLifecycle(unittest.TestCase):
+    """test the navigation states open waits for."""
+
+    def test_networkidle(self):
+        lifecycle = Lifecycle("http://localhost/", "networkidle", 1)
+        self.assertIsNone(lifecycle.remaining())
+
+        lifecycle.reach("load")
+        self.assertEqual(lifecycle.reached, {"commit", "domcontentloaded", "load"})
+
+        lifecycle.request_started("sqt-http://localhost/data.json#x")
+        start = lifecycle.last_activity
+        self.assertGreater(lifecycle.remaining(start), Lifecycle.NETWORK_IDLE_TIME)
+
+        lifecycle.requests_finished(["http://localhost/data.json"])
+        finished = lifecycle.last_activity
+        self.assertAlmostEqual(lifecycle.remaining(finished), Lifecycle.NETWORK_IDLE_TIME)
+        self.assertEqual(lifecycle.remaining(finished + Lifecycle.NETWORK_IDLE_TIME), 0.0)
+
+        # a request that never finishes stops counting once it is stale.
+        lifecycle.request_started("http://localhost/poll")
+        stale = lifecycle.last_activity + Lifecycle.REQUEST_STALE_AFTER + Lifecycle.NETWORK_IDLE_TIME
+        self.assertEqual(lifecycle.remaining(stale), 0.0)
+
+class TestSession(unittest.TestCase):
+    """test the session blob format."""
+
+    def test_blob(self):
+        snapshot = {
+            "version": session.SESSION_VERSION,
+            "cookies": [{"raw": "sid=abc; domain=localhost; path=/", "domain": "localhost"}] * 50,
+            "local_storage": {"http://localhost:8000": {"token": "x" * 1000}},
+            "session_storage": {},
+        }
+        blob = session.dumps(snapshot)
+        self.assertEqual(session.loads(blob), snapshot)
+        self.assertLess(len(blob), len(json.dumps(snapshot)) / 10)
+
+        with self.assertRaises(InvalidSession):
+            session.loads(b"not a session")
+        with self.assertRaises(InvalidSession):
+            session.loads(session.dumps({**snapshot, "version": session.SESSION_VERSION + 1}))
+
+class TestMemory(unittest.TestCase):
+    """test sampling memory from /proc."""
+
+    @unittest.skipUnless(memory.available(), "memory is read from /proc.")
+    def test_sample(self):
+        child = subprocess.Popen(["sleep", "5"])
+        try:
+            self.assertIn(child.pid, memory.descendants(os.getpid()))
+            taken = memory.sample(os.getpid(), pages=3)
+            self.assertEqual(set(taken.processes), {os.getpid(), *memory.descendants(os.getpid())})
+            self.assertGreater(taken.rss, 0)
+            self.assertEqual(taken.pages, 3)
+        finally:
+            child.kill()
+            child.wait()
+
+class TestCommands(unittest.TestCase):
+    """test the command registry."""
+
+    def test_opcodes(self):
+        self.addCleanup(commands.COMMANDS.clear)
+        commands.command("zz_test")(lambda context, arg: arg)
+        commands.command("aa_test", concurrent=True)(lambda context, arg: arg)
+
+        opcodes = commands.opcodes()
+        self.assertEqual(opcodes["js"], 0)
+        self.assertEqual(opcodes["frames"], commands.BUILTIN_COMMANDS.index("frames"))
+        self.assertEqual(opcodes["aa_test"], len(commands.BUILTIN_COMMANDS))
+        self.assertEqual(opcodes["zz_test"], len(commands.BUILTIN_COMMANDS) + 1)
+        self.assertTrue(commands.COMMANDS["aa_test"].concurrent)
+
+        with self.assertRaises(ValueError):
+            commands.command("js")
+
+class TestPerformance(unittest.TestCase):
+    """test resolving performance profiles with overrides."""
+
+    def test_resolve(self):
+        name, profile = performance.resolve(
+            {
+                "performance_profile": "minimal",
+                "web_settings": {"WebGLEnabled": True},
+                "chromium_flags": {"--mute-audio": False, "--renderer-process-limit": "2"},
+            }
+        )
+        self.assertEqual(name, "minimal")
+        self.assertTrue(profile.settings["WebGLEnabled"])
+        self.assertFalse(profile.settings["AutoLoadImages"])
+        self.assertNotIn("--mute-audio", profile.flags)
+        self.assertIn("--renderer-process-limit=2", performance.format_flags(profile.flags))
+
+        self.assertEqual(performance.resolve({}), ("default", performance.PerformanceProfile({}, {})))
+        with self.assertRaises(ValueError):
+            performance.resolve({"performance_profile": "fastest"})
+
+class TestTimings(unittest.TestCase):
+    """test reading performance entries incrementally from the timing buffer."""
+
+    def test_since(self):
+        buffer = TimingBuffer(size=5)
+        buffer.add({"entryType": "resource", "name": str(i)} for i in range(3))
+
+        first = buffer.since()
+        self.assertEqual((first.cursor, first.dropped), (3, 0))
+        self.assertEqual([entry["seq"] for entry in first.entries], [0, 1, 2])
+
+        buffer.add({"entryType": "paint", "name": str(i)} for i in range(4))
+        later = buffer.since(first.cursor)
+        self.assertEqual((later.cursor, later.dropped), (7, 0))
+        self.assertEqual([entry["name"] for entry in later.entries], ["0", "1", "2", "3"])
+
+        # the oldest were dropped, before they were read from the start.
+        self.assertEqual(buffer.since(0).dropped, 2)
+        self.assertEqual(len(buffer.since(0, types=["resource"]).entries), 1)
+        # a cursor of a restarted remote starts over.
+        self.assertEqual(buffer.since(100).cursor, 7)
+
+
+class TestPoliteness(unittest.TestCase):
+    """test the per host limits of the politeness scheduler."""
+
+    def test_limits(self):
+        scheduler = politeness.Scheduler(
+            politeness.HostPolicy(max_concurrency=1),
+            {"slow.test": politeness.HostPolicy(max_concurrency=2, rate=1.0, burst=1)},
+            backend=politeness.MemoryBackend(),
+        )
+        self.assertEqual(scheduler.try_acquire("http://a.test/1"), 0.0)
+        self.assertGreater(scheduler.try_acquire("http://a.test/2"), 0.0)
+        scheduler.release("http://a.test/1")
+        self.assertEqual(scheduler.try_acquire("http://a.test/2"), 0.0)
+
+        # the domain's policy applies to its subdomains, one token, then about a second.
+        self.assertEqual(scheduler.try_acquire("http://www.slow.test/"), 0.0)
+        self.assertAlmostEqual(scheduler.try_acquire("http://www.slow.test/"), 1.0, delta=0.1)
+
+        # a throttled host does not hold up the others.
+        urls = ["http://a.test/3", "http://www.slow.test/2", "http://b.test/"]
+        self.assertEqual(scheduler.try_acquire_any(urls), (2, 0.0))
+        with self.assertRaises(CommandTimeout):
+            scheduler.acquire("http://a.test/4", timeout=0.2)
+
+    @unittest.skipUnless(politeness._fcntl, "files are locked with fcntl.")
+    def test_file_backend(self):
+        directory = tempfile.mkdtemp()
+        policy = politeness.HostPolicy(max_concurrency=1)
+        first = politeness.Scheduler(policy, backend=politeness.FileBackend(directory))
+        second = politeness.Scheduler(policy, backend=politeness.FileBackend(directory))
+
+        self.assertEqual(first.try_acquire("http://a.test/"), 0.0)
+        self.assertGreater(second.try_acquire("http://a.test/"), 0.0)
+        first.release("http://a.test/")
+        self.assertEqual(second.try_acquire("http://a.test/"), 0.0)
+
+    def test_double_release(self):
+        for backend in [politeness.MemoryBackend()] + (
+            [politeness.FileBackend(tempfile.mkdtemp())] if politeness._fcntl else []
+        ):
+            scheduler = politeness.Scheduler(
+                politeness.HostPolicy(max_concurrency=1), backend=backend
+            )
+            scheduler.release("http://never.test/")
+
+            self.assertEqual(scheduler.try_acquire("http://a.test/"), 0.0)
+            scheduler.release("http://a.test/")
+            scheduler.release("http://a.test/")
+            self.assertEqual(scheduler.try_acquire("http://a.test/"), 0.0)
+            self.assertGreater(scheduler.try_acquire("http://a.test/"), 0.0)
+
+    def test_open_deadline(self):
+        scheduler = politeness.Scheduler(
+            politeness.HostPolicy(min_delay=0.3), backend=politeness.MemoryBackend()
+        )
+        driver = types.SimpleNamespace(
+            open=lambda url, wait_until, timeout: timeouts.append(timeout)
+        )
+        timeouts = []
+
+        scheduler.open(driver, "http://a.test/1", timeout=1.0)
+        # the second waits for min_delay, the open is given what is left of the timeout.
+        scheduler.open(driver, "http://a.test/2", timeout=1.0)
+        self.assertAlmostEqual(timeouts[0], 1.0, delta=0.05)
+        self.assertAlmostEqual(timeouts[1], 0.7, delta=0.1)
+
+
+class TestBackpressure(unittest.TestCase):
+    """test the policies of the bounded command queue."""
+
+    def test_policies(self):
+        lock = threading.Condition()
+        with lock:
+            failing = CommandQueue(lock, 2, "fail")
+            failing.put(1)
+            failing.put(2)
+            with self.assertRaises(QueueFull):
+                failing.put(3)
+
+            shedding = CommandQueue(lock, 2, "shed")
+            self.assertIsNone(shedding.put(1))
+            shedding.put(2)
+            self.assertEqual(shedding.put(3), 1)
+            self.assertEqual([shedding.get(), shedding.get()], [2, 3])
+
+            blocking = CommandQueue(lock, 1, "block")
+            blocking.put(1)
+            with self.assertRaises(CommandTimeout):
+                blocking.put(2, time.monotonic() + 0.1)
+            self.assertTrue(blocking.remove(1))
+            blocking.put(2)
+
+        self.assertEqual(failing.stats().rejected, 1)
+        self.assertEqual(shedding.stats().shed, 1)
+        self.assertEqual(blocking.stats(), (1, 0, 1, 1, 0, 1, 0))
+
+
+class TestQueryCache(unittest.TestCase):
+    """test the query cache's generations."""
+
+    def test_generation(self):
+        cache = QueryCache(max_entries=2)
+        found, _, generation = cache.get("title")
+        self.assertFalse(found)
+        self.assertTrue(cache.put("title", "a", generation))
+        self.assertEqual(cache.get("title")[:2], (True, "a"))
+
+        # a navigation while the query was in flight, its result is of the old page.
+        _, _, generation = cache.get("url")
+        cache.invalidate()
+        self.assertFalse(cache.put("url", "old", generation))
+        self.assertEqual(cache.stats(), (1, 2, 1, 0))
+
+
+def _sleeping_remote(config):
+    """Stand in for Remote.start_process, a process which only sleeps."""
+    import multiprocessing
+
+    proc = multiprocessing.Process(target=time.sleep, args=(60,), daemon=True)
+    proc.start()
+    return proc
+
+
+def _script_remote_main(config):
+    """A remote without qt, in an empty directory, js gives back its script, and whether a session was given."""
+    os.chdir(tempfile.mkdtemp())
+    opcodes = {
+        f"{opcode:0>2}": name for opcode, name in enumerate(commands.BUILTIN_COMMANDS)
+    }
+    comms = DriverComs(
+        socket.create_connection((config["connection_host"], config["connection_port"]))
+    )
+    comms.send_message(
+        {
+            "id": None,
+            "status": "hello",
+            "commands": {name: opcode for opcode, name in opcodes.items()},
+            "token": config["connection_token"],
+        }
+    )
+    while True:
+        header, arg = comms.recv_message()
+        name = opcodes[header["op"]]
+        if name == "close":
+            return
+
+        result = "done"
+        if name == "js":
+            result = json.dumps(
+                {
+                    "script": bytes(arg).decode("utf-8"),
+                    "session": isinstance(config.get("session"), bytes),
+                }
+            )
+        elif name == "export_session":
+            result = json.dumps(
+                {"version": session.SESSION_VERSION, "cookies": [], "local_storage": {}}
+            )
+        comms.send_message({"id": header["id"], "status": "ok"}, result)
+
+
+def _script_remote(config):
+    """Stand in for Remote.start_process, see _script_remote_main."""
+    import multiprocessing
+
+    proc = multiprocessing.Process(target=_script_remote_main, args=(config,), daemon=True)
+    proc.start()
+    return proc
+
+
+class TestBroker(unittest.TestCase):
+    """test handing out remotes of several workers on loopback."""
+
+    def __brokered_driver(self, config=None):
+        """give a Driver whose remote is a _script_remote, started by a worker of a broker."""
+        broker = Broker(token="secret").start()
+        self.addCleanup(broker.close)
+        worker = Worker(broker.address, "secret", 1, start_process=_script_remote)
+        self.addCleanup(worker.start().close)
+
+        driver = Driver(
+            {
+                "starting_url": "about:blank",
+                "broker": broker.address,
+                "broker_token": "secret",
+                **(config or {}),
+            }
+        )
+        self.addCleanup(driver.quit)
+        return driver
+
+    def test_script_source(self):
+        """test that scripts reach a remote without the driver's files, as their source."""
+        driver = self.__brokered_driver()
+        self.assertEqual(
+            json.loads(driver.execute_script("return 1;", timeout=10))["script"],
+            "return 1;",
+        )
+
+        with tempfile.NamedTemporaryFile("w", suffix=".js", delete=False) as script_file:
+            script_file.write("return 2;")
+        self.addCleanup(os.remove, script_file.name)
+        self.assertEqual(
+            json.loads(driver.execute_script_file(script_file.name, timeout=10))["script"],
+            "return 2;",
+        )
+
+    def test_recycle(self):
+        """test that a recycled brokered remote gives its session to the next one, as bytes."""
+        driver = self.__brokered_driver()
+        self.assertFalse(json.loads(driver.execute_script("return 1;", timeout=10))["session"])
+
+        driver.recycle()
+        self.assertTrue(json.loads(driver.execute_script("return 1;", timeout=30))["session"])
+        self.assertEqual(driver.restarts, 1)
+
+    def test_leases(self):
+        broker = Broker(token="secret").start()
+        self.addCleanup(broker.close)
+        for name in ("first", "second"):
+            worker = Worker(broker.address, "secret", 1, name, start_process=_sleeping_remote)
+            self.addCleanup(worker.start().close)
+
+        deadline = time.monotonic() + 10
+        while len(broker.workers()) < 2 and time.monotonic() < deadline:
+            time.sleep(0.05)
+
+        leases = [RemoteLease(broker.address, "secret", {}) for _ in range(2)]
+        self.assertEqual({lease.worker for lease in leases}, {"first", "second"})
+        with self.assertRaises(BrokerError):
+            RemoteLease(broker.address, "secret", {}, timeout=0.2)
+
+        leases[0].kill()
+        leases[0].join(10)
+        self.assertFalse(leases[0].is_alive())
+        self.assertTrue(leases[1].is_alive())
+
+        with self.assertRaises(BrokerError):
+            RemoteLease(broker.address, "wrong", {})
+
+
 class TestServerObject:
     """Store test server variables in one object."""
 
@@ -177,6 +685,15 @@ class Tests(unittest.TestCase):
                 """run if the button was on the home page."""
                 self.server.clicked = True
 
+            @self.server.app.route("/report.csv")
+            def _report():
+                """give a file which the browser downloads."""
+                return flask.Response(
+                    "a,b\n" * 100_000,
+                    mimetype="text/csv",
+                    headers={"Content-Disposition": "attachment; filename=report.csv"},
+                )
+
             self.server.flask_port = str(self.__find_free_port())
 
             self.server.thread = threading.Thread(
@@ -250,6 +767,332 @@ class Tests(unittest.TestCase):
         
         logger.success("Passed test_click_xpath")
 
+    def test_timeout(self):
+        """test that a command which times out is abandoned, and the driver is still usable after it."""
+        self.__ensure_driver()
+        self.__ensure_server()
+
+        flask_url = f"http://localhost:{self.server.flask_port}/"
+        self.driver.open(flask_url)
+
+        # runJavaScript doesn't wait for promises, only a busy page outlives the timeout.
+        with self.assertRaises(CommandTimeout):
+            self.driver.execute_script(
+                "const end = Date.now() + 3000; while (Date.now() < end) {} return 'late';",
+                timeout=1,
+            )
+
+        self.assertEqual(
+            Url(self.driver.current_url(timeout=10)),
+            Url(flask_url),
+            "driver was out of sync after a timeout.",
+        )
+        # the abandoned script's result comes after this is sent, it must not be given to it.
+        self.assertEqual(
+            self.driver.execute_script("return 'next';", timeout=10),
+            "next",
+            "driver was out of sync after a timeout.",
+        )
+
+        logger.success("Passed test_timeout")
+
+    def test_supervised_restart(self):
+        """test that a supervised driver restarts remote at the last url after it is killed."""
+        self.__ensure_server()
+
+        flask_url = f"http://localhost:{self.server.flask_port}/"
+        driver = Driver({"starting_url": flask_url, "supervised": True})
+
+        restarted = threading.Event()
+        driver.add_restart_listener(lambda event: restarted.set())
+
+        driver._remote_proc.kill()
+        self.assertTrue(restarted.wait(30), "remote was not restarted.")
+
+        self.assertEqual(Url(driver.current_url(timeout=30)), Url(flask_url))
+        self.assertFalse(driver.is_closed)
+        driver.close()
+
+        logger.success("Passed test_supervised_restart")
+
+    def test_recycle(self):
+        """test that a driver recycles remote after max_pages, at the last url."""
+        self.__ensure_server()
+
+        flask_url = f"http://localhost:{self.server.flask_port}/"
+        driver = Driver({"starting_url": flask_url, "max_pages": 2})
+
+        events = []
+        driver.add_restart_listener(events.append)
+        old_pid = driver._remote_proc.pid
+
+        driver.open(flask_url + "?page=1")
+        driver.open(flask_url + "?page=2")
+        self.assertEqual(Url(driver.current_url(timeout=30)), Url(flask_url + "?page=2"))
+        self.assertNotEqual(driver._remote_proc.pid, old_pid)
+        self.assertEqual(len(events), 1)
+        self.assertEqual(driver.pages, 0)
+        driver.close()
+
+        logger.success("Passed test_recycle")
+
+    def test_plugin(self):
+        """test that commands registered by a plugin run in remote, and are negotiated on connect."""
+        self.__ensure_server()
+
+        flask_url = f"http://localhost:{self.server.flask_port}/"
+        driver = Driver(
+            {"starting_url": flask_url, "plugins": ["seleniumqt.test_resources.plugin"]}
+        )
+
+        self.assertEqual(
+            json.loads(driver.command("test_url", "x")),
+            {"url": flask_url, "arg": "x"},
+        )
+        self.assertEqual(driver.command("test_sum", 41), "42")
+        with self.assertRaises(UnknownCommand):
+            driver.command("missing")
+        driver.close()
+
+        logger.success("Passed test_plugin")
+
+    def test_download(self):
+        """test that a download started by the page is saved to download_dir, and waited for."""
+        self.__ensure_server()
+
+        flask_url = f"http://localhost:{self.server.flask_port}/"
+        download_dir = tempfile.mkdtemp()
+        driver = Driver({"starting_url": flask_url, "download_dir": download_dir})
+
+        events = []
+        driver.add_event_listener(lambda name, data: events.append(name))
+        driver.execute_script("location.href = '/report.csv';")
+        path = driver.wait_for_download(timeout=30)
+
+        self.assertEqual(os.path.dirname(path), download_dir)
+        with open(path) as f:
+            self.assertEqual(f.read(), "a,b\n" * 100_000)
+        self.assertIn("download", events)
+        driver.close()
+
+        logger.success("Passed test_download")
+
+    def test_performance_timings(self):
+        """test that navigation timings, and remote's own load times, are collected."""
+        self.__ensure_server()
+
+        flask_url = f"http://localhost:{self.server.flask_port}/"
+        driver = Driver({"starting_url": "about:blank"})
+        driver.open(flask_url)
+
+        timings = driver.performance_timings(timeout=30)
+        types = {entry["entryType"] for entry in timings.entries}
+        self.assertIn("qt-load", types)
+        self.assertIn("navigation", types)
+
+        later = driver.performance_timings(since=timings.cursor, timeout=30)
+        self.assertTrue(all(entry["seq"] >= timings.cursor for entry in later.entries))
+        driver.close()
+
+        logger.success("Passed test_performance_timings")
+
+    def test_dom_changes(self):
+        """test that watch_dom gives a snapshot, and dom_changes only what changed after it."""
+        self.__ensure_server()
+
+        flask_url = f"http://localhost:{self.server.flask_port}/"
+        driver = Driver({"starting_url": "about:blank"})
+        driver.open(flask_url)
+
+        state = driver.watch_dom("body", timeout=30)
+        self.assertTrue(state.resync)
+        self.assertEqual(state.snapshot[1], "body")
+
+        driver.execute_script(
+            "document.body.setAttribute('data-x', '1');"
+            "document.body.setAttribute('data-x', '2');"
+            "document.body.appendChild(document.createElement('p'));"
+        )
+        changes = driver.dom_changes(state.cursor, timeout=30)
+        self.assertFalse(changes.resync)
+        self.assertIn(
+            {"type": "attributes", "target": state.snapshot[0], "name": "data-x", "value": "2"},
+            changes.changes,
+        )
+        self.assertEqual(
+            [change["added"][0][1][1] for change in changes.changes if change["type"] == "childList"],
+            ["p"],
+        )
+
+        self.assertEqual(driver.dom_changes(changes.cursor, timeout=30).changes, [])
+        driver.close()
+
+        logger.success("Passed test_dom_changes")
+
+    def test_query_cache(self):
+        """test that cached queries are answered until a navigation."""
+        self.__ensure_server()
+
+        flask_url = f"http://localhost:{self.server.flask_port}/"
+        # without dom events, so nothing the page does invalidates the cache while counting.
+        driver = Driver({"starting_url": "about:blank", "query_cache": True})
+        driver.open(flask_url)
+
+        title = "return document.title;"
+        for _ in range(5):
+            driver.current_url(timeout=30)
+            driver.execute_script(title, timeout=30, cache=True)
+        stats = driver.query_cache_stats()
+        self.assertEqual((stats.hits, stats.misses), (8, 2))
+
+        driver.open(f"{flask_url}?page=2")
+        self.assertEqual(Url(driver.current_url(timeout=30)), Url(f"{flask_url}?page=2"))
+        driver.close()
+
+        logger.success("Passed test_query_cache")
+
+    def test_query_cache_dom(self):
+        """test that cached queries are answered again once the dom changes, with query_cache_dom."""
+        self.__ensure_server()
+
+        flask_url = f"http://localhost:{self.server.flask_port}/"
+        driver = Driver(
+            {"starting_url": "about:blank", "query_cache": True, "query_cache_dom": True}
+        )
+        driver.open(flask_url)
+
+        title = "return document.title;"
+        driver.execute_script("setTimeout(() => { document.title = 'changed'; }, 200);")
+        self.assertNotEqual(driver.execute_script(title, timeout=30, cache=True), "changed")
+        time.sleep(1)
+        self.assertEqual(driver.execute_script(title, timeout=30, cache=True), "changed")
+        driver.close()
+
+        logger.success("Passed test_query_cache_dom")
+
+    def test_broker(self):
+        """test that a driver is given a remote by a worker of a broker, on loopback."""
+        self.__ensure_server()
+
+        broker = Broker(token="secret").start()
+        worker = Worker(broker.address, "secret", 2, config={"headless": True}).start()
+
+        flask_url = f"http://localhost:{self.server.flask_port}/"
+        driver = Driver(
+            {
+                "starting_url": flask_url,
+                "broker": broker.address,
+                "broker_token": "secret",
+            }
+        )
+        self.assertEqual(Url(driver.current_url(timeout=30)), Url(flask_url))
+        self.assertEqual(broker.workers()[0]["running"], 1)
+        driver.close()
+
+        worker.close()
+        broker.close()
+
+        logger.success("Passed test_broker")
+
+    def test_crawl(self):
+        """test that crawl gives one result per url, with the extractor's return value."""
+        self.__ensure_server()
+
+        flask_url = f"http://localhost:{self.server.flask_port}/"
+        urls = (f"{flask_url}?page={i}" for i in range(4))
+
+        results = list(crawl(urls, "return location.search;", concurrency=2, timeout=30))
+
+        self.assertEqual(sorted(result.index for result in results), [0, 1, 2, 3])
+        for result in results:
+            self.assertIsNone(result.error)
+            self.assertEqual(result.result, f"?page={result.index}")
+
+        logger.success("Passed test_crawl")
+
+    def test_concurrent_scripts(self):
+        """test that scripts given from many threads at once each get their own result."""
+        self.__ensure_driver()
+
+        results: dict[int, str] = {}
+
+        def run(i: int):
+            results[i] = self.driver.execute_script(f"return 'script ' + {i};", timeout=30)
+
+        threads = [threading.Thread(target=run, args=(i,)) for i in range(16)]
+        for thread in threads:
+            thread.start()
+        # current_url is not held up by the scripts in flight.
+        self.driver.current_url(timeout=30)
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results, {i: f"script {i}" for i in range(16)})
+
+        logger.success("Passed test_concurrent_scripts")
+
+    def test_init_script(self):
+        """test that an init script runs in the next document, before the page's own scripts."""
+        self.__ensure_server()
+
+        flask_url = f"http://localhost:{self.server.flask_port}/"
+        driver = Driver({"starting_url": "about:blank"})
+
+        driver.add_init_script("window.initialized = document.readyState;")
+        driver.open(flask_url)
+
+        self.assertEqual(driver.execute_script("return window.initialized;"), "loading")
+        driver.close()
+
+        logger.success("Passed test_init_script")
+
+    def test_session(self):
+        """test that a session exported from one driver starts another one with its cookies and storage."""
+        self.__ensure_server()
+
+        flask_url = f"http://localhost:{self.server.flask_port}/"
+        driver = Driver({"starting_url": flask_url})
+        driver.execute_script(
+            "document.cookie = 'sid=abc; path=/'; localStorage.setItem('token', 'xyz');"
+        )
+        blob = driver.export_session()
+        driver.close()
+
+        restored = Driver({"starting_url": flask_url, "session": blob})
+        self.assertEqual(restored.execute_script("return document.cookie;"), "sid=abc")
+        self.assertEqual(restored.execute_script("return localStorage.getItem('token');"), "xyz")
+        restored.close()
+
+        logger.success("Passed test_session")
+
+    def test_frames(self):
+        """test that scripts run in the frame switched to, and in the page again after the block."""
+        self.__ensure_driver()
+        self.__ensure_server()
+
+        self.driver.open(f"http://localhost:{self.server.flask_port}/")
+        self.driver.execute_script(
+            "const frame = document.createElement('iframe');"
+            "frame.name = 'inner'; frame.srcdoc = '<p id=where>frame</p>';"
+            "document.body.appendChild(frame);"
+        )
+        time.sleep(1)
+
+        frames = self.driver.frames()
+        self.assertEqual([frame.html_name for frame in frames], ["inner"])
+
+        with self.driver.frame(frames[0]):
+            self.assertEqual(
+                self.driver.execute_script("return document.getElementById('where').textContent;"),
+                "frame",
+            )
+        self.assertEqual(
+            self.driver.execute_script("return String(document.getElementById('where'));"),
+            "null",
+        )
+
+        logger.success("Passed test_frames")
+
     def test_hide_and_show_1(self):
         self.__ensure_driver()
 
@@ -0,0 +1,91 @@
+"""module containing the timing buffer, which keeps the performance entries of remote's pages for the driver."""
+
+# ---------------------------------------------------
+# author: Ansh Mathur
+# gtihub: https://github.com/Fakesum
+# repo: https://github.com/Fakesum/ TODO: THIS
+# ---------------------------------------------------
+
+# import python std library
+import typing as _typing
+import itertools as _itertools
+import collections as _collections
+
+
+# entry types collected in the page, see seleniumqt.page.JAVASCRIPT_TIMINGS.
+ENTRY_TYPES: tuple[str, ...] = (
+    "navigation",
+    "resource",
+    "paint",
+    "longtask",
+    "largest-contentful-paint",
+)
+
+# entry type of remote's own loadStarted to loadFinished durations.
+QT_LOAD = "qt-load"
+
+
+class PerformanceTimings(_typing.NamedTuple):
+    """Performance entries after a cursor, given by Driver.performance_timings."""
+
+    cursor: int  # give it as since, for the entries after these.
+    dropped: int  # entries after since which the full buffer dropped before they were read.
+    entries: list[dict]
+
+
+class TimingBuffer:
+    """The last performance entries, each numbered, so they can be read incrementally from a cursor.
+
+    # Entry
+    the entry's own toJSON(), with:
+    ```python
+    {
+        "seq": ..., # its number, the cursor after it is seq + 1.
+        "frameUrl": ..., # the document it was recorded in.
+        "timeOrigin": ..., # epoch milliseconds startTime is relative to.
+    }
+    ```
+    """
+
+    # entries kept, unless the "timings_buffer" config is given.
+    SIZE: int = 1000
+
+    def __init__(self, size: int = SIZE) -> None:
+        """Construct TimingBuffer.
+
+        Args:
+        ----
+            size (int, optional): entries kept, the oldest are dropped. Defaults to SIZE.
+
+        """
+        self.entries: _collections.deque[dict] = _collections.deque(maxlen=size)
+        self.cursor = 0  # seq of the next entry.
+
+    def add(self, entries: _typing.Iterable[dict]) -> None:
+        for entry in entries:
+            self.entries.append({**entry, "seq": self.cursor})
+            self.cursor += 1
+
+    def since(
+        self, since: int = 0, types: _typing.Iterable[str] | None = None
+    ) -> PerformanceTimings:
+        """Give the entries from since on, only of types if given.
+
+        a cursor past this buffer's, ex: of a remote which was restarted, starts over.
+        """
+        if since > self.cursor:
+            since = 0
+        first = self.cursor - len(self.entries)
+        types = None if types is None else set(types)
+        return PerformanceTimings(
+            self.cursor,
+            max(first - since, 0),
+            [
+                entry
+                for entry in _itertools.islice(self.entries, max(since - first, 0), None)
+                if (types is None) or (entry.get("entryType") in types)
+            ],
+        )
+
+
+__all__ = ["ENTRY_TYPES", "QT_LOAD", "PerformanceTimings", "TimingBuffer"]
@@ -0,0 +1,181 @@
+"""module containing the tracer, which records driver and remote spans in the chrome trace event format."""
+
+# ---------------------------------------------------
+# author: Ansh Mathur
+# gtihub: https://github.com/Fakesum
+# repo: https://github.com/Fakesum/ TODO: THIS
+# ---------------------------------------------------
+
+# import python std library
+import os as _os
+import json as _json
+import typing as _typing
+import threading as _threading
+import contextlib as _contextlib
+import collections as _collections
+
+# import logger
+from .logger import logger
+
+# clock shared by driver and remote.
+from .metrics import now as _now
+
+
+class Tracer:
+    """Record spans and instants as Chrome Trace Event json, which opens in perfetto or chrome://tracing.
+
+    driver and remote each have a tracer, both use the same clock (seleniumqt.metrics.now),
+    so their events can be merged into one file, see Driver.export_trace.
+
+    # Usage
+    ```python
+    tracer = Tracer(enabled=True, process_name="driver")
+    with tracer.span("open", args={"url": url}):
+        ...
+    tracer.instant("loadFinished")
+    tracer.dump("trace.json")
+    ```
+    """
+
+    # events kept at most, the oldest are dropped after that.
+    MAX_EVENTS: int = 1_000_000
+
+    def __init__(self, enabled: bool = True, process_name: str = "") -> None:
+        """Construct Tracer.
+
+        Args:
+        ----
+            enabled (bool, optional): when False nothing is recorded. Defaults to True.
+            process_name (str, optional): name shown for this process in the trace. Defaults to "".
+
+        """
+        self.enabled = enabled
+        self.process_name = process_name
+        self.pid = _os.getpid()
+        self._lock = _threading.Lock()
+        # the oldest are dropped in O(1) once it is full, it is appended to on the qt thread.
+        self._events: _collections.deque[dict] = _collections.deque(
+            maxlen=self.MAX_EVENTS
+        )
+        self._thread_names: dict[int, str] = {}
+
+    # -----------------------------------------utility functions------------------------------------------
+    @staticmethod
+    def _us(timestamp: float) -> float:
+        """Convert a seleniumqt.metrics.now timestamp to trace microseconds."""
+        return timestamp * 1_000_000
+
+    def __add(self, event: dict) -> None:
+        tid = _threading.get_native_id()
+        event.update(pid=self.pid, tid=tid)
+
+        with self._lock:
+            if tid not in self._thread_names:
+                self._thread_names[tid] = _threading.current_thread().name
+            self._events.append(event)
+
+    # ----------------------------------------------recording---------------------------------------------
+    def complete(
+        self,
+        name: str,
+        start: float,
+        end: float,
+        cat: str = "command",
+        args: dict | None = None,
+    ) -> None:
+        """Record a span on the current thread, that started and ended at the given timestamps.
+
+        Args:
+        ----
+            name (str): name of the span.
+            start (float): seleniumqt.metrics.now() when it started.
+            end (float): seleniumqt.metrics.now() when it ended.
+            cat (str, optional): category, ex: command, qt, javascript. Defaults to "command".
+            args (dict | None, optional): shown with the span. Defaults to None.
+
+        """
+        if not self.enabled:
+            return
+        self.__add(
+            {
+                "name": name,
+                "cat": cat,
+                "ph": "X",
+                "ts": self._us(start),
+                "dur": self._us(max(end - start, 0.0)),
+                "args": args or {},
+            }
+        )
+
+    def instant(
+        self, name: str, cat: str = "qt", args: dict | None = None
+    ) -> None:
+        """Record an instant event on the current thread, ex: a qt signal."""
+        if not self.enabled:
+            return
+        self.__add(
+            {
+                "name": name,
+                "cat": cat,
+                "ph": "i",
+                "s": "t",
+                "ts": self._us(_now()),
+                "args": args or {},
+            }
+        )
+
+    @_contextlib.contextmanager
+    def span(
+        self, name: str, cat: str = "command", args: dict | None = None
+    ) -> _typing.Iterator[None]:
+        """Record the body of the with statement as a span on the current thread."""
+        start = _now()
+        try:
+            yield
+        finally:
+            self.complete(name, start, _now(), cat, args)
+
+    # ----------------------------------------------exporting---------------------------------------------
+    def events(self) -> list[dict]:
+        """Give every recorded event, with the metadata events naming the process and its threads."""
+        with self._lock:
+            metadata = [
+                {
+                    "name": "process_name",
+                    "ph": "M",
+                    "pid": self.pid,
+                    "tid": 0,
+                    "args": {"name": f"{self.process_name} ({self.pid})"},
+                }
+            ] + [
+                {
+                    "name": "thread_name",
+                    "ph": "M",
+                    "pid": self.pid,
+                    "tid": tid,
+                    "args": {"name": thread_name},
+                }
+                for tid, thread_name in self._thread_names.items()
+            ]
+            return metadata + list(self._events)
+
+    def dump(self, path: str, other_events: list[dict] = []) -> None:
+        """Write the events, and events of other tracers, ex: remote's, to a trace file.
+
+        Args:
+        ----
+            path (str): the trace file.
+            other_events (list[dict], optional): events to add to the file. Defaults to [].
+
+        """
+        events = self.events() + list(other_events)
+        with open(path, "w") as f:
+            _json.dump(
+                {"traceEvents": events, "displayTimeUnit": "ms"},
+                f,
+                separators=(",", ":"),
+            )
+        logger.info(f"Wrote {len(events)} trace events to {path=}")
+
+
+__all__ = ["Tracer"]
@@ -0,0 +1,234 @@
+"""module containing the worker, which starts remotes for a broker, entry point of seleniumqt-remote."""
+
+# ---------------------------------------------------
+# author: Ansh Mathur
+# gtihub: https://github.com/Fakesum
+# repo: https://github.com/Fakesum/ TODO: THIS
+# ---------------------------------------------------
+
+# import python std library
+import json as _json
+import socket as _socket
+import typing as _typing
+import argparse as _argparse
+import threading as _threading
+import multiprocessing as _multiprocessing
+
+# import logger
+from .logger import logger
+
+# import exceptions
+from .exception import BrokerError, BrokerRefused
+
+# import the broker's client side.
+from .broker import (
+    connect as _connect,
+    loads_config as _loads_config,
+    parse_address as _parse_address,
+    TOKEN_ENV,
+)
+
+
+class Worker:
+    """Start remotes on this machine for the drivers of a broker, see seleniumqt.broker.Broker.
+
+    the remotes connect straight to their drivers, at the "connection_host" and
+    "connection_port" of their config. once the broker is lost, every remote is
+    killed, and the worker connects again.
+
+    # Usage
+        ```python
+        >>> Worker("broker.local:7700", token="secret", slots=4, config={"headless": True}).run()
+        ```
+    """
+
+    # seconds between trying to reach a lost broker, and checking if remotes exited.
+    RECONNECT_INTERVAL: float = 2.0
+    POLL_INTERVAL: float = 0.5
+
+    def __init__(
+        self,
+        broker: str | tuple[str, int],
+        token: str | None = None,
+        slots: int = 1,
+        name: str | None = None,
+        config: dict | None = None,
+        start_process: _typing.Callable[[dict], _multiprocessing.Process] | None = None,
+    ) -> None:
+        """Construct Worker, run connects it.
+
+        Args:
+        ----
+            broker (str | tuple[str, int]): the broker, "host:port".
+            token (str | None, optional): the broker's token. Defaults to SELENIUMQT_TOKEN.
+            slots (int, optional): remotes run at once. Defaults to 1.
+            name (str | None, optional): shown in the broker's logs. Defaults to the host name.
+            config (dict | None, optional): set over the config of every remote, ex: {"headless": True}. Defaults to None.
+            start_process (Callable[[dict], Process] | None, optional): starts a remote. Defaults to Remote.start_process.
+
+        """
+        self.broker = _parse_address(broker)
+        self.token = token
+        self.slots = slots
+        self.name = name or _socket.gethostname()
+        self.config = config or {}
+        self._start_process = start_process
+
+        self._remotes: dict[int, _multiprocessing.Process] = {}  # by lease.
+        self._lock = _threading.Lock()
+        self._send_lock = _threading.Lock()
+        self._closed = _threading.Event()
+        self._comms: _typing.Any = None
+
+    def __start(self, config: dict) -> _multiprocessing.Process:
+        if self._start_process is None:
+            # qt is only needed once a remote is started.
+            from .remote import Remote
+
+            self._start_process = Remote.start_process
+        return self._start_process({**config, **self.config})
+
+    def __send(self, comms: _typing.Any, header: dict) -> None:
+        with self._send_lock:
+            comms.send_message(header)
+
+    def __watch(self, comms: _typing.Any, lost: _threading.Event) -> None:
+        """Tell the broker of every remote which exited."""
+        while not lost.wait(self.POLL_INTERVAL):
+            with self._lock:
+                exited = {
+                    lease: proc
+                    for lease, proc in self._remotes.items()
+                    if not proc.is_alive()
+                }
+                for lease in exited:
+                    del self._remotes[lease]
+            for lease, proc in exited.items():
+                logger.info(f"Remote {lease=} exited, {proc.exitcode=}")
+                try:
+                    self.__send(
+                        comms, {"op": "exited", "lease": lease, "exitcode": proc.exitcode}
+                    )
+                except (ConnectionError, OSError):
+                    return
+
+    def __serve(self, comms: _typing.Any) -> None:
+        """Start and kill remotes as the broker says, until it is lost."""
+        lost = _threading.Event()
+        watcher = _threading.Thread(target=self.__watch, args=(comms, lost), daemon=True)
+        watcher.name = "worker-watch"
+        watcher.start()
+        try:
+            while True:
+                message, payload = comms.recv_message()
+                lease = message.get("lease")
+
+                if message.get("op") == "start":
+                    try:
+                        proc = self.__start(_loads_config(bytes(payload)))
+                    except Exception as e:
+                        logger.exception(f"Could not start remote {lease=}")
+                        self.__send(
+                            comms,
+                            {"op": "exited", "lease": lease, "exitcode": None, "error": repr(e)},
+                        )
+                        continue
+                    with self._lock:
+                        self._remotes[lease] = proc
+                    logger.info(f"Started remote {lease=} {proc.pid=}")
+                    self.__send(comms, {"op": "started", "lease": lease, "pid": proc.pid})
+
+                elif message.get("op") == "kill":
+                    with self._lock:
+                        proc = self._remotes.get(lease)
+                    if proc is not None:
+                        proc.kill()
+        except (ConnectionError, OSError, ValueError) as e:
+            if not self._closed.is_set():
+                logger.warning(f"Broker {self.broker=} was lost, {e!r}")
+        finally:
+            lost.set()
+            with self._lock:
+                remotes, self._remotes = self._remotes, {}
+            for proc in remotes.values():
+                proc.kill()
+
+    def run(self) -> None:
+        """Connect to the broker, and start remotes for it until close is called, connecting again if it is lost.
+
+        Raises:
+        ------
+            BrokerRefused: the broker refused this worker, ex: the token is wrong.
+
+        """
+        while not self._closed.is_set():
+            try:
+                self._comms = _connect(
+                    self.broker, "worker", self.token, name=self.name, slots=self.slots
+                )
+            except BrokerRefused:
+                raise
+            except (BrokerError, OSError) as e:
+                # ex: the broker is restarting, and dropped the connection during the hello.
+                logger.warning(f"Broker {self.broker=} can't be reached, {e!r}")
+                self._closed.wait(self.RECONNECT_INTERVAL)
+                continue
+
+            logger.info(f"Worker {self.name} connected to {self.broker=}, {self.slots=}")
+            self.__serve(self._comms)
+
+    def start(self) -> "Worker":
+        """Run in a thread, give self."""
+        thread = _threading.Thread(target=self.run, daemon=True)
+        thread.name = "worker"
+        thread.start()
+        return self
+
+    def close(self) -> None:
+        """Disconnect from the broker, the remotes are killed."""
+        self._closed.set()
+        if self._comms is not None:
+            try:
+                self._comms.conn.shutdown(_socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+
+def main() -> None:
+    """Run a worker, entry point of seleniumqt-remote."""
+    parser = _argparse.ArgumentParser(
+        prog="seleniumqt-remote",
+        description="start remotes on this machine for the drivers of a seleniumqt-broker.",
+    )
+    parser.add_argument("--host", default="localhost", help="the broker's address.")
+    parser.add_argument("--port", type=int, default=7700, help="the broker's port.")
+    parser.add_argument("--token", default=None, help=f"defaults to ${TOKEN_ENV}.")
+    parser.add_argument("--slots", type=int, default=1, help="remotes run at once.")
+    parser.add_argument("--name", default=None, help="defaults to the host name.")
+    parser.add_argument(
+        "--config",
+        default="{}",
+        help='json set over the config of every remote, ex: {"headless": true}.',
+    )
+    args = parser.parse_args()
+
+    worker = Worker(
+        (args.host, args.port),
+        args.token,
+        args.slots,
+        args.name,
+        _json.loads(args.config),
+    )
+    try:
+        worker.run()
+    except BrokerError as e:
+        raise SystemExit(str(e))
+    except KeyboardInterrupt:
+        worker.close()
+
+
+__all__ = ["Worker"]
+
+
+if __name__ == "__main__":
+    main()